@@ -1,18 +1,38 @@
 from manim import *
 from manim import Surface
 import numpy as np
-import argparse
 import os
 import json
-import argparse
-import shutil
-from generate_speech import generate_speech
-import subprocess
+from render_driver import run_from_command_line
+from tex_cache import enable_shared_tex_cache
+from glyph_cache import GlyphText
+from phase_render import PhasedSceneMixin
+from static_hold import StaticHoldMixin
+from depth_cache import DepthSortCacheMixin
+from stereographic import stereographic_projection
+from sphere_mesh import SphereGraticule, ProjectedCurves, LiftToSphere, plane_line, plane_circle
+from billboard import BillboardDot, BillboardLine
+from lod import lod
+from mobius import MobiusTransform, rotation, translation, scaling, inversion
+from readout import ComplexReadout
+
+enable_shared_tex_cache()
 
 # manim default output dir
 default_output_dir = "./media/"
 
-class RiemannSphere(ThreeDScene):
+class RiemannSphere(StaticHoldMixin, PhasedSceneMixin, DepthSortCacheMixin, ThreeDScene):
+    # 阶段边界，可以用 --parallel-phases 分进程并行渲染各阶段
+    phases = [
+        "phase1_2D_complex_plane",   # 第一阶段：复平面
+        "phase2_transition_to_3d",   # 第二阶段：过渡到3D
+        "phase3_riemann_sphere",     # 第三阶段：黎曼球面
+        "phase4_point_movement",     # 第四阶段：点的移动与投影变化
+        "phase5_infinity_point",     # 第五阶段：无穷远点映射
+        "phase6_mobius_transform",   # 第六阶段：莫比乌斯变换
+        "ending",                    # 结束
+    ]
+
     def __init__(self):
         super().__init__()
         
@@ -20,10 +40,12 @@ class RiemannSphere(ThreeDScene):
         self.animation_timer = 0.0
         self.subtitle_id = 0
         self.time_per_char = 0.28  # 单字符语音时间
+        self.subtitle_mode = os.environ.get("MANIM_SUBTITLE_MODE", "mobject")  # 字幕模式：mobject/sidecar/burn
 
         # 确保缓存目录存在
         os.makedirs(default_output_dir, exist_ok=True)
-        self.subtitle_file = os.path.join(default_output_dir, f"subtitles_{self.__class__.__name__}.jsonl")
+        # 字幕文件可以由 MANIM_SUBTITLE_FILE 指定（渲染部分阶段时不清空完整渲染的字幕）
+        self.subtitle_file = os.environ.get("MANIM_SUBTITLE_FILE") or os.path.join(default_output_dir, f"subtitles_{self.__class__.__name__}.jsonl")
 
         # 如果字幕文件存在，则清空文件，否则创建文件
         if os.path.exists(self.subtitle_file):
@@ -46,19 +68,22 @@ class RiemannSphere(ThreeDScene):
         if text_subtitle is None:
             text_subtitle = text_voice
             
-        # 创建新字幕
-        new_subtitle = Text(text_subtitle, font_size=fontsize)
-        new_subtitle.to_edge(DOWN)
-        
-        # 将字幕添加到场景中
-        self.add_fixed_in_frame_mobjects(new_subtitle)
-        self.subtitle = new_subtitle
+        # 字幕轨模式下只记录文字和时间，字幕在合并音视频时由 ffmpeg 处理
+        if self.subtitle_mode == "mobject":
+            # 创建新字幕，使用字形缓存避免重复生成相同汉字的轮廓
+            new_subtitle = GlyphText(text_subtitle, font_size=fontsize)
+            new_subtitle.to_edge(DOWN)
+            
+            # 将字幕添加到场景中
+            self.add_fixed_in_frame_mobjects(new_subtitle)
+            self.subtitle = new_subtitle
 
-        # 将字幕记录到 jsonl 文件，包括编号、开始时间、文本内容
+        # 将字幕记录到 jsonl 文件，包括编号、开始时间、语音文本和画面字幕文本
         self.subtitle_id += 1
         subtitle_json = {
             "id":           self.subtitle_id, 
             "text":         text_voice.strip(),  # 移除空白
+            "subtitle":     text_subtitle.strip(),
             "start_time":   self.animation_timer
             }
         
@@ -72,14 +97,10 @@ class RiemannSphere(ThreeDScene):
         
         # 等待语音播放并更新动画计时器
         self.wait(wait); self.animation_timer += float(wait)
-    
-    def format_complex_number(self, r, angle_index):
-        """格式化复数文本，确保使用两位整数表示分子"""
-        # 确保angle_index是两位整数
-        num_str = f"{angle_index:02d}"
-        den_str = f"{16}"  # 硬编码分母为16
-        
-        return f"z = {r}e^{{\\frac{{{num_str}}}{{{den_str}}}\\pi \\mathbf{{i}}}}"
+
+    def narration_wait(self, text_voice, following=0.0, minimum=0.5):
+        """字幕之后紧接着播放 following 秒的动画时，保证下一条字幕在本条语音读完后才出现的等待时间"""
+        return max(len(text_voice) * self.time_per_char - following, minimum)
     
     def construct(self):
         # 设置常量和初始化
@@ -88,23 +109,8 @@ class RiemannSphere(ThreeDScene):
         # 添加极坐标转笛卡尔坐标的方法
         self.setup_scene()
         
-        # 第一阶段：复平面
-        self.phase1_2D_complex_plane()
-        
-        # 第二阶段：过渡到3D
-        self.phase2_transition_to_3d()
-        
-        # 第三阶段：黎曼球面
-        self.phase3_riemann_sphere()
-        
-        # 第四阶段：点的移动与投影变化
-        self.phase4_point_movement()
-        
-        # 第五阶段：无穷远点映射
-        self.phase5_infinity_point()
-        
-        # 结束
-        self.ending()
+        # 依次执行 phases 中的各阶段
+        self.run_phases()
     
     def polar_to_cartesian(self, r, theta):
         """将极坐标转换为笛卡尔坐标"""
@@ -171,7 +177,9 @@ class RiemannSphere(ThreeDScene):
         z_dot = Dot(self.INITIAL_Z_POINT, color=YELLOW)
         
         # 将复数值添加到场景 - 增大字体
-        complex_num = MathTex("z = 1 + 0i", font_size=48).to_corner(UR).shift(LEFT*0.5)
+        # 复数值由缓存的字形拼成，数值改变时原地更新，不经过 LaTeX
+        complex_num = ComplexReadout("cartesian", font_size=48).to_corner(UR).shift(LEFT*0.5)
+        complex_num.set_cartesian(1, 0)
         self.add_fixed_in_frame_mobjects(complex_num)
         
         self.update_subtitle("复平面上的点对应于不同的复数", wait=1)
@@ -208,16 +216,19 @@ class RiemannSphere(ThreeDScene):
         # 角点位置索引
         corner_indices = [1, 2, 3, 4, 5]
         
+        # 复数值跟随点的位置连续变化（保留一位小数）
+        def update_cartesian(mob, alpha):
+            x, y = np.round(z_dot.get_center()[:2], 1)
+            mob.set_cartesian(x, y)
+
         for i, pos in enumerate(positions):
             if pos != positions[0]:  # 不是第一个位置才播放动画
-                # 更新复数值显示
-                new_complex = MathTex(f"z = {pos[0]} + {pos[1]}i", font_size=48).to_corner(UR).shift(LEFT*0.5)
                 
                 # 如果是角点，添加强调动画
                 if i in corner_indices:
                     self.play(
                         z_dot.animate.move_to(pos),
-                        FadeTransform(complex_num, new_complex),
+                        UpdateFromAlphaFunc(complex_num, update_cartesian),
                         run_time=1.5
                     )
                     self.animation_timer += 1.5
@@ -236,10 +247,9 @@ class RiemannSphere(ThreeDScene):
                 else:
                     self.play(
                         z_dot.animate.move_to(pos),
-                        FadeTransform(complex_num, new_complex),
+                        UpdateFromAlphaFunc(complex_num, update_cartesian),
                         run_time=1.5
                     ); self.animation_timer += 1.5
-                complex_num = new_complex
         
         self.update_subtitle("接下来我们使用极坐标表示复数", wait=3)
         # 6. 按极坐标系运动（半径不变，角度变化）
@@ -260,8 +270,8 @@ class RiemannSphere(ThreeDScene):
         ); self.animation_timer += 2
         
         # 创建极坐标表示的复数值
-        initial_complex = self.format_complex_number(radius, 0)
-        polar_complex = MathTex(initial_complex, font_size=48).to_corner(UR).shift(LEFT*0.5)
+        polar_complex = ComplexReadout("polar", font_size=48).to_corner(UR).shift(LEFT*0.5)
+        polar_complex.set_polar(radius, 0)
         self.add_fixed_in_frame_mobjects(polar_complex)
         
         self.update_subtitle("极坐标表示复数更适合描述旋转和缩放", wait=3)
@@ -291,10 +301,8 @@ class RiemannSphere(ThreeDScene):
             # 计算当前索引（0-32之间的值）
             current_index = int(32 * angle / (2*PI))
             
-            # 更新复数值显示 - 始终使用分数形式，确保两位整数
-            new_complex = self.format_complex_number(radius, current_index)
-            new_tex = MathTex(new_complex, font_size=48).to_corner(UR).shift(LEFT*0.5)
-            polar_complex.become(new_tex)
+            # 原地更新复数值显示 - 始终使用分数形式，确保两位整数
+            polar_complex.set_polar(radius, current_index)
         
         # 分四段播放动画，每段到达一个特殊角度后暂停并强调
         for i in range(4):
@@ -431,7 +439,7 @@ class RiemannSphere(ThreeDScene):
         y_label_3d = Tex("$\\mathrm{Im}(z)$").next_to(axes_3d.y_axis.get_end(), UP)
         
         # 将2D点转换为3D点
-        z_dot_3d = Dot3D(
+        z_dot_3d = BillboardDot(
             self.z_dot.get_center(),
             color=YELLOW,
             radius=0.08
@@ -487,49 +495,25 @@ class RiemannSphere(ThreeDScene):
         
         # 硬编码网格配置
         grid_config = {
-            'longitude_count': 120,
-            'latitude_count': 60,
+            'longitude_count': lod("c01_longitude_count"),
+            'latitude_count': lod("c01_latitude_count"),
+            'samples': lod("c01_graticule_samples"),
             'stroke_width': 1,
             'color': BLUE_D,
             'opacity': 0.6
         }
         
-        # 创建经线
-        longitudes = VGroup()
-        for phi in np.linspace(0, 2*PI, grid_config['longitude_count'], endpoint=False):
-            longitude = ParametricFunction(
-                lambda t: np.array([
-                    self.SPHERE_RADIUS * np.sin(t) * np.cos(phi),
-                    self.SPHERE_RADIUS * np.sin(t) * np.sin(phi),
-                    self.SPHERE_RADIUS * np.cos(t) + self.SPHERE_RADIUS
-                ]),
-                t_range=[0, PI],
-                stroke_width=grid_config['stroke_width'],
-                stroke_color=grid_config['color'],
-                stroke_opacity=grid_config['opacity']
-            )
-            longitudes.add(longitude)
-        
-        # 创建纬线
-        latitudes = VGroup()
-        for theta in np.linspace(0, PI, grid_config['latitude_count'], endpoint=True):
-            if theta == 0 or theta == PI:  # 跳过极点
-                continue
-            latitude = ParametricFunction(
-                lambda t: np.array([
-                    self.SPHERE_RADIUS * np.sin(theta) * np.cos(t),
-                    self.SPHERE_RADIUS * np.sin(theta) * np.sin(t),
-                    self.SPHERE_RADIUS * np.cos(theta) + self.SPHERE_RADIUS
-                ]),
-                t_range=[0, 2*PI],
-                stroke_width=grid_config['stroke_width'],
-                stroke_color=grid_config['color'],
-                stroke_opacity=grid_config['opacity']
-            )
-            latitudes.add(latitude)
-        
-        # 组合所有网格线
-        sphere_grid = VGroup(longitudes, latitudes)
+        # 所有经线和纬线的顶点一次算出，作为一个对象描边
+        sphere_grid = SphereGraticule(
+            radius=self.SPHERE_RADIUS,
+            longitude_count=grid_config['longitude_count'],
+            latitude_count=grid_config['latitude_count'],
+            longitude_samples=grid_config['samples'] // 2,
+            latitude_samples=grid_config['samples'],
+            stroke_width=grid_config['stroke_width'],
+            color=grid_config['color'],
+            opacity=grid_config['opacity']
+        )
         
         self.update_subtitle("这是黎曼球面，它将复平面映射到球面上", wait=1)
         self.play(Create(sphere_grid), run_time=2)
@@ -553,14 +537,14 @@ class RiemannSphere(ThreeDScene):
         
         # 添加北极点
         north_pole_pos = np.array([0, 0, 2*self.SPHERE_RADIUS])
-        north_pole = Dot3D(
+        north_pole = BillboardDot(
             north_pole_pos,
             color=visual_config['north_pole_color'],
             radius=visual_config['dot_radius']
         )
         
         # 北极点标签和箭头
-        north_pole_label = Text(
+        north_pole_label = GlyphText(
             "北极点",
             font_size=text_config['label_font_size']
         ).to_corner(UR).shift(DOWN)
@@ -598,80 +582,13 @@ class RiemannSphere(ThreeDScene):
         self.add_fixed_in_frame_mobjects(north_pole_label, north_pole_arrow)
         self.update_subtitle("黎曼球面的北极点对应复平面上的无穷远点", wait=6)
         
-        def get_projection_point(z_point):
-            """
-            立体投影函数：将复平面上的点投影到黎曼球面上
-            
-            参数:
-                z_point: 复平面上点的坐标，形式为 [x, y, 0]
-                
-            返回:
-                黎曼球面上对应的投影点坐标 [x', y', z']
-            """
-            # 获取复平面上点的坐标
-            x, y = z_point[0], z_point[1]
-            z = 0  # 复平面上的点z坐标为0
-            
-            # 北极点坐标
-            north_x, north_y, north_z = 0, 0, 2*self.SPHERE_RADIUS
-            
-            # 注意：输入的点是复平面上的点，z坐标为0，不可能接近北极点(0,0,2R)
-            # 这个条件实际上永远不会满足，因为z总是0而north_z是2*self.SPHERE_RADIUS
-            # 保留此检查只是为了代码的健壮性
-            if abs(x) < 1e-10 and abs(y) < 1e-10 and abs(z - north_z) < 1e-10:
-                return np.array([0, 0, 2*self.SPHERE_RADIUS - 0.01])
-            
-            # 如果点非常远，直接返回北极点
-            if x*x + y*y > 1000:
-                return np.array([0, 0, 2*self.SPHERE_RADIUS - 0.01])
-            
-            # 计算从北极点到复平面点的方向向量
-            direction = np.array([x - north_x, y - north_y, z - north_z])
-            
-            # 归一化方向向量
-            direction_length = np.sqrt(np.sum(direction**2))
-            if direction_length < 1e-10:
-                unit_direction = np.array([0, 0, -1])  # 默认向下
-            else:
-                unit_direction = direction / direction_length
-            
-            # 球心坐标
-            center_x, center_y, center_z = 0, 0, self.SPHERE_RADIUS
-
-            # 代入射线方程到球面方程，得到关于t的二次方程: at^2 + bt + c = 0
-            a = np.sum(unit_direction**2)  # 应该等于1
-            b = 2 * np.sum(unit_direction * np.array([north_x - center_x, north_y - center_y, north_z - center_z]))
-            c = np.sum((np.array([north_x, north_y, north_z]) - np.array([center_x, center_y, center_z]))**2) - self.SPHERE_RADIUS**2
-            
-            # 计算判别式
-            discriminant = b*b - 4*a*c
-            
-            # 如果没有交点（不应该发生），返回北极点
-            if discriminant < 0:
-                return np.array([north_x, north_y, north_z])
-            
-            # 计算t的两个解
-            t1 = (-b + np.sqrt(discriminant)) / (2*a)
-            t2 = (-b - np.sqrt(discriminant)) / (2*a)
-            
-            # 选择较小的正t值（第一个交点）
-            if t1 > 0 and (t2 <= 0 or t1 < t2):
-                t = t1
-            else:
-                t = t2
-            
-            # 计算交点坐标
-            intersection = np.array([north_x, north_y, north_z]) + t * unit_direction
-            
-            return intersection
-        
         # 创建从北极点到复平面点的连接线
         z_point = self.z_dot.get_center()
-        projection_point = get_projection_point(z_point)
-        projection_dot = Dot3D(projection_point, color=RED, radius=0.08)
+        projection_point = stereographic_projection(z_point, self.SPHERE_RADIUS)
+        projection_dot = BillboardDot(projection_point, color=RED, radius=0.08)
         
         # 连接线：北极点到复平面点
-        north_to_z_line = Line3D(
+        north_to_z_line = BillboardLine(
             north_pole_pos,
             z_point,
             color=YELLOW,
@@ -690,7 +607,7 @@ class RiemannSphere(ThreeDScene):
         
         # 在计算投影点后，修正投影点箭头
         # 添加投影标签和箭头
-        proj_label = Text("投影点", font_size=24).to_corner(UL).shift(DOWN)
+        proj_label = GlyphText("投影点", font_size=24).to_corner(UL).shift(DOWN)
         
         # 获取投影点在屏幕上的2D位置
         projection_screen_pos = self.camera.project_point(projection_point)
@@ -723,8 +640,8 @@ class RiemannSphere(ThreeDScene):
         self.animation_timer += 0.5
         
         # 创建复数值显示，供后续阶段使用
-        initial_complex = self.format_complex_number(2, 0)
-        self.complex_num = MathTex(initial_complex, font_size=48).to_corner(UR).shift(LEFT*0.5)
+        self.complex_num = ComplexReadout("polar", font_size=48).to_corner(UR).shift(LEFT*0.5)
+        self.complex_num.set_polar(2, 0)
         self.add_fixed_in_frame_mobjects(self.complex_num)
         
         # 保存引用以在后续阶段使用 - 删除sphere引用，只保留sphere_grid
@@ -732,7 +649,6 @@ class RiemannSphere(ThreeDScene):
         self.north_pole = north_pole
         self.projection_dot = projection_dot
         self.north_to_z_line = north_to_z_line
-        self.get_projection_point = get_projection_point
     
     def phase4_point_movement(self):
         """第四阶段：点的移动与投影变化"""
@@ -755,19 +671,19 @@ class RiemannSphere(ThreeDScene):
         start_angle = 0
         start_r = 2
         z_point = self.polar_to_cartesian(start_r, start_angle)
-        z_dot = Dot3D(np.array([z_point[0], z_point[1], 0]), color=RED)
+        z_dot = BillboardDot(np.array([z_point[0], z_point[1], 0]), color=RED)
         self.z_dot = z_dot  # 保存引用供phase5使用
         
         # 获取投影点位置
-        projection_pos = self.get_projection_point(z_point)
-        projection_dot = Dot3D(projection_pos, color=RED)
+        projection_pos = stereographic_projection(z_point, self.SPHERE_RADIUS)
+        projection_dot = BillboardDot(projection_pos, color=RED)
         self.projection_dot = projection_dot  # 保存引用供phase5使用
         
         # 北极点位置
         north_pole_pos = np.array([0, 0, 2*self.SPHERE_RADIUS])
         
         # 创建连接线
-        north_to_z_line = Line3D(
+        north_to_z_line = BillboardLine(
             north_pole_pos,
             np.array([z_point[0], z_point[1], 0]),
             color=YELLOW
@@ -782,8 +698,8 @@ class RiemannSphere(ThreeDScene):
         )
         self.animation_timer += 0.3
         # 创建初始复数值显示，使用极坐标格式
-        initial_complex = self.format_complex_number(start_r, 0)
-        complex_text = MathTex(initial_complex, font_size=48).to_corner(UR)
+        complex_text = ComplexReadout("polar", font_size=48).to_corner(UR)
+        complex_text.set_polar(start_r, 0)
         
         # 移除旧的complex_num并添加新的
         self.remove(self.complex_num)
@@ -798,14 +714,15 @@ class RiemannSphere(ThreeDScene):
         angles = [i * PI/8 for i in range(1, 17)]  # 从PI/4到2PI，每PI/4一个点
         
         # 对每个角度执行一次更新
+        previous_index = 0
         for i, angle in enumerate(angles):
             # 计算新位置
             r = start_r
             z_new = self.polar_to_cartesian(r, angle)
-            projection_new = self.get_projection_point(z_new)
+            projection_new = stereographic_projection(z_new, self.SPHERE_RADIUS)
             
             # 创建新连接线
-            new_line = Line3D(
+            new_line = BillboardLine(
                 north_pole_pos,
                 np.array([z_new[0], z_new[1], 0]),
                 color=YELLOW
@@ -814,15 +731,16 @@ class RiemannSphere(ThreeDScene):
             # 计算当前索引（0-32之间的值）
             current_index = round(32 * angle / (2*PI))
             
-            # 更新复数值显示，使用极坐标格式
-            new_complex = self.format_complex_number(r, current_index)
-            new_tex = MathTex(new_complex, font_size=48).to_corner(UR)
+            # 复数值在动画过程中逐步变到新的辐角，原地更新，不生成新的公式
+            def update_polar(mob, alpha, r=r, start=previous_index, end=current_index):
+                mob.set_polar(r, round(start + alpha * (end - start)))
+            previous_index = current_index
             
             # 播放动画
             self.play(
                 z_dot.animate.move_to(np.array([z_new[0], z_new[1], 0])),
                 projection_dot.animate.move_to(projection_new),
-                Transform(self.complex_num, new_tex),
+                UpdateFromAlphaFunc(self.complex_num, update_polar),
                 Create(new_line),
                 run_time=1.0  # 减少每段动画的时间
             )
@@ -861,7 +779,7 @@ class RiemannSphere(ThreeDScene):
         # 计算r_values起始点的位置
         initial_r = r_values[0]  # 获取r_values的第一个值
         z_point = self.polar_to_cartesian(initial_r, 0)
-        projection_pos = self.get_projection_point(z_point)
+        projection_pos = stereographic_projection(z_point, self.SPHERE_RADIUS)
         # 移动z_dot和projection_dot到新位置
         self.z_dot.move_to(np.array([z_point[0], z_point[1], 0]))
         self.projection_dot.move_to(projection_pos)
@@ -874,7 +792,7 @@ class RiemannSphere(ThreeDScene):
 
         # 创建轨迹对象 - 使用TracedPath跟踪投影点的移动
         # 注意：我们需要先创建一个新的投影点，因为TracedPath会跟踪这个点的移动
-        tracing_dot = Dot3D(north_pole_pos, color=RED, radius=0.08)
+        tracing_dot = BillboardDot(north_pole_pos, color=RED, radius=0.08)
         tracing_dot.set_z_index(10)  # 确保点在轨迹上方
         
         # 创建TracedPath对象，它会自动跟踪点的移动并生成轨迹
@@ -882,6 +800,8 @@ class RiemannSphere(ThreeDScene):
         
         # 将轨迹和跟踪点添加到场景
         self.add(trajectory, tracing_dot)
+        self.trajectory = trajectory
+        self.tracing_dot = tracing_dot
         
         # 遍历r值序列，使点沿着轨迹移动
         for i, r in enumerate(r_values):
@@ -889,10 +809,10 @@ class RiemannSphere(ThreeDScene):
             z_new = self.polar_to_cartesian(r, 0)
             
             # 计算投影点位置
-            projection_new = self.get_projection_point(z_new)
+            projection_new = stereographic_projection(z_new, self.SPHERE_RADIUS)
             
             # 创建从北极点到复平面点的连接线
-            new_line = Line3D(
+            new_line = BillboardLine(
                 north_pole_pos,
                 np.array([z_new[0], z_new[1], 0]),
                 color=YELLOW
@@ -918,6 +838,82 @@ class RiemannSphere(ThreeDScene):
         self.update_subtitle("大圆经过北极点，意味着黎曼球面北极点对应的是复平面上的无穷远点", wait=7)
         
         self.update_subtitle("复平面上的直线对应于黎曼球面上的圆，它们全都经过北极点，但未必都是大圆", wait=7)
+        self.lift_curve_families()
+
+    def lift_curve_families(self):
+        """把复平面上的一族直线和一族圆整体抬升到黎曼球面上"""
+        # 每条曲线的采样点只投影一次，抬升过程中原地更新点坐标
+        samples = lod("c01_curve_samples")
+        lines = ProjectedCurves(
+            [plane_line(k * 1j, 0, self.SPHERE_RADIUS, samples) for k in range(-3, 4)]
+            + [plane_line(k, PI / 2, self.SPHERE_RADIUS, samples) for k in range(-3, 4)],
+            radius=self.SPHERE_RADIUS, stroke_color=YELLOW, stroke_width=2,
+        )
+        circles = ProjectedCurves(
+            [plane_circle(0, r, samples) for r in (0.5, 1, 2, 3)]
+            + [plane_circle(c, 0.8, samples) for c in (2 + 2j, -2 + 2j, -2 - 2j, 2 - 2j)],
+            radius=self.SPHERE_RADIUS, stroke_color=GREEN, stroke_width=2,
+        )
+
+        self.play(Create(lines), run_time=1.5)
+        self.animation_timer += 1.5
+        self.play(LiftToSphere(lines), run_time=3)
+        self.animation_timer += 3
+        self.update_subtitle("每一条直线都被抬升成经过北极点的圆，过原点的直线对应大圆", wait=5)
+
+        self.play(Create(circles), run_time=1.5)
+        self.animation_timer += 1.5
+        self.play(LiftToSphere(circles), run_time=3)
+        self.animation_timer += 3
+        self.update_subtitle("而复平面上的圆对应于球面上不经过北极点的圆", wait=5)
+
+        self.play(FadeOut(lines), FadeOut(circles), run_time=0.5)
+        self.animation_timer += 0.5
+
+    def phase6_mobius_transform(self):
+        """第六阶段：莫比乌斯变换同时作用于复平面和黎曼球面"""
+        self.play(
+            FadeOut(self.z_dot), FadeOut(self.projection_dot),
+            FadeOut(self.trajectory), FadeOut(self.tracing_dot),
+            run_time=0.5
+        )
+        self.animation_timer += 0.5
+
+        # 复平面上的网格线，与球面网格一起变换
+        samples = lod("c01_curve_samples")
+        plane_grid = ProjectedCurves(
+            [plane_line(k * 1j, 0, self.SPHERE_RADIUS, samples) for k in range(-3, 4)]
+            + [plane_line(k, PI / 2, self.SPHERE_RADIUS, samples) for k in range(-3, 4)],
+            radius=self.SPHERE_RADIUS, stroke_color=YELLOW, stroke_width=2,
+        )
+        intro = "最后我们来看莫比乌斯变换，它同时作用于复平面和黎曼球面"
+        self.update_subtitle(intro, wait=self.narration_wait(intro, following=1.5))
+        self.play(Create(plane_grid), run_time=1.5)
+        self.animation_timer += 1.5
+
+        # (变换, 字幕)，每个变换都从当前状态出发
+        transforms = [
+            (rotation(PI / 2), "旋转：复平面绕原点转动，球面绕竖直轴转动"),
+            (scaling(2), "伸缩：复平面放大，球面上的点向北极点聚集"),
+            (scaling(0.5), "再缩小回来"),
+            (translation(1 + 1j), "平移：球面上的点沿着经过北极点的圆流动"),
+            (translation(-1 - 1j), "再平移回来"),
+            (inversion(), "反演 w → 1/w：零点与无穷远点互换，球面翻转了半周"),
+            (inversion(), "再做一次反演，回到原来的位置"),
+        ]
+        for matrix, text in transforms:
+            # 变换和之后的停顿共 4 秒，语音更长时先等待
+            self.update_subtitle(text, wait=self.narration_wait(text, following=4))
+            self.play(
+                MobiusTransform(self.sphere_grid, matrix, surface="sphere", radius=self.SPHERE_RADIUS),
+                MobiusTransform(plane_grid, matrix, surface="plane"),
+                run_time=3
+            )
+            self.animation_timer += 3
+            self.wait(1); self.animation_timer += 1
+
+        self.play(FadeOut(plane_grid), run_time=0.5)
+        self.animation_timer += 0.5
 
     def ending(self):
         """动画结束阶段"""
@@ -928,64 +924,5 @@ class RiemannSphere(ThreeDScene):
 
 
 if __name__ == "__main__":
-    # 解析命令行参数
-    # 命令行参数配置
-    parser = argparse.ArgumentParser(description="运行黎曼球面动画")
-    parser.add_argument("--quality", "-q", type=str, choices=["l", "m", "h", "k"], default="l",
-                        help="动画质量：l(低), m(中), h(高), k(4K)")
-    parser.add_argument("--preview", "-p", action="store_true",
-                        help="是否自动预览")
-    parser.add_argument("--force", "-f", action="store_true",
-                        help="是否强制重新渲染")
-    parser.add_argument("--keep-cache", "-k", action="store_true",
-                        help="是否保留缓存文件不清除")
-    args = parser.parse_args()
-
-    # 创建一个临时对象用于获取字幕文件路径
-    buff = RiemannSphere()
-    class_name = buff.__class__.__name__
-    script_filename = os.path.splitext(os.path.basename(__file__))
-
-    # 将质量参数转换为 manim 的输出质量
-    quality = args.quality
-    voice_name = "longlaotie"  # 使用龙老铁音色
-    quality_to_str = {
-        "l": "480p15",
-        "m": "720p30",
-        "h": "1080p60",
-        "k": "2160p60"
-    }
-    quality_str = quality_to_str.get(quality)
-
-    # 构建并执行命令
-    preview_flag = "-p" if args.preview else ""
-    force_flag = "-f" if args.force else ""
-    cmd = f"manim -q{quality} {preview_flag} {force_flag} {__file__} {class_name}"
-    print(f"执行命令: {cmd}")
-    print("正在渲染动画，请耐心等待...")
-    result = subprocess.run(cmd, shell=True)
-
-    # 根据 manim 的输出结构确定文件路径
-    # 视频文件路径：media/videos/script_name/quality_str/class_name.mp4
-    video_file = f"media/videos/{script_filename[0]}/{quality_str}/{class_name}.mp4"
-
-    # 在字幕文件第一行插入视频文件和音色信息
-    with open(buff.subtitle_file, 'r+', encoding='utf-8') as f:
-        content = f.read()
-        f.seek(0, 0)
-        f.write(json.dumps({"video_file": video_file, "voice_name": voice_name}, ensure_ascii=False) + '\n' + content)
-    
-    # 调用语音生成函数
-    generate_speech(buff.subtitle_file)
-    
-    print(f"动画已通过命令行渲染完成，带配音的文件为：{video_file.replace('.mp4', '_WithAudio.mp4')}")
-    
-    # 清理缓存文件（仅当未指定保留缓存时）
-    if not args.keep_cache:
-        partial_dir = f"media/videos/{script_filename[0]}/{quality_str}/partial_movie_files"
-        if os.path.exists(partial_dir):
-            shutil.rmtree(partial_dir)
-            print(f"已清除部分电影文件缓存: {partial_dir}")
-        print("缓存清理完成！")
-    else:
-        print("根据设置保留了缓存文件")
\ No newline at end of file
+    # 在当前进程内渲染并配音，命令行参数见 render_driver.build_parser
+    run_from_command_line(RiemannSphere, __file__, "运行黎曼球面动画")
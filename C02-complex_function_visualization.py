@@ -1,12 +1,15 @@
 from manim import *
 import json
 import os
-import shutil
-import argparse
 import numpy as np
-import matplotlib.cm as cm
-import subprocess
-from generate_speech import generate_speech
+from render_driver import run_from_command_line
+from tex_cache import enable_shared_tex_cache
+from glyph_cache import GlyphText
+from static_hold import StaticHoldMixin
+from lod import lod, parametric_step
+from segment_ring import SegmentRing, GrowSegmentRing
+
+enable_shared_tex_cache()
 
 # 定义复函数
 def complex_function1(z):
@@ -27,14 +30,14 @@ latex_formula2 = "f(z) = z^3/4 - z^2/2 + z"
 latex_formula3 = "f(z) = (x+y) + \mathbf{i}(x^2+y^2)/2"
 # 定义复函数自变量的范围
 z_scale = 1.0
-num_segments = 2880
 
 # 使用数值方法计算函数值的微分（注意不是导数）
-def numerical_derivative(z, function):
+def numerical_derivative(z, function, num_segments=None):
     """使用数值微分计算复数函数在点z处的导数
-    返回一个列表，包含不同方向上的导数值
+    返回一个列表，包含不同方向上的导数值，方向数默认按当前质量取 lod("c02_num_segments")
     """
     epsilon = 1e-5
+    num_segments = num_segments or lod("c02_num_segments")
 
     # 生成dz的角度
     dz_angles = np.linspace(0, 2 * np.pi, num_segments, endpoint=False)
@@ -49,33 +52,21 @@ def numerical_derivative(z, function):
     return dz_angles, dfs
 
 
-# 获取 viridis 颜色映射
-def get_viridis_color(t):
-    """获取 viridis 颜色映射中对应 t 的颜色
-    
-    参数:
-        t: 0到1之间的值
-        
-    返回:
-        RGB颜色值
-    """
-    rgba = cm.viridis(t)
-    return rgb_to_color(rgba[:3])
-
-
 # 复函数可视化演示
-class ComplexFunctionVisualization(Scene):
+class ComplexFunctionVisualization(StaticHoldMixin, Scene):
     def __init__(self):
         super().__init__()
         # 初始化总时间计数器
         self.animation_timer = 0.0
         self.subtitle_id = 0
         self.time_per_char = 0.28      # 单字符语音时间
+        self.subtitle_mode = os.environ.get("MANIM_SUBTITLE_MODE", "mobject")  # 字幕模式：mobject/sidecar/burn
         self.default_output_dir = 'media'
 
         # 确保缓存目录存在
         os.makedirs(self.default_output_dir, exist_ok=True)
-        self.subtitle_file = os.path.join(self.default_output_dir, f"subtitles_{self.__class__.__name__}.jsonl")
+        # 字幕文件可以由 MANIM_SUBTITLE_FILE 指定（渲染部分阶段时不清空完整渲染的字幕）
+        self.subtitle_file = os.environ.get("MANIM_SUBTITLE_FILE") or os.path.join(self.default_output_dir, f"subtitles_{self.__class__.__name__}.jsonl")
 
         # 如果字幕文件存在，则清空文件，否则创建文件
         if os.path.exists(self.subtitle_file):
@@ -99,20 +90,23 @@ class ComplexFunctionVisualization(Scene):
             text_voice = text_subtitle
             
         if text_subtitle:
-            # 创建新字幕
-            new_subtitle = Text(text_subtitle, font_size=fontsize)
-            new_subtitle.to_edge(DOWN)
-
-            # 将字幕添加到场景中
-            # self.add_fixed_in_frame_mobjects(new_subtitle) # 3D 模式下
-            self.add(new_subtitle) # 2D 模式下
-            self.subtitle = new_subtitle
-
-            # 将字幕记录到 jsonl 文件，包括编号、开始时间、文本内容
+            # 字幕轨模式下只记录文字和时间，字幕在合并音视频时由 ffmpeg 处理
+            if self.subtitle_mode == "mobject":
+                # 创建新字幕，使用字形缓存避免重复生成相同汉字的轮廓
+                new_subtitle = GlyphText(text_subtitle, font_size=fontsize)
+                new_subtitle.to_edge(DOWN)
+
+                # 将字幕添加到场景中
+                # self.add_fixed_in_frame_mobjects(new_subtitle) # 3D 模式下
+                self.add(new_subtitle) # 2D 模式下
+                self.subtitle = new_subtitle
+
+            # 将字幕记录到 jsonl 文件，包括编号、开始时间、语音文本和画面字幕文本
             self.subtitle_id += 1
             subtitle_json = {
                 "id":           self.subtitle_id, 
                 "text":         text_voice.strip(),  # 移除空白
+                "subtitle":     text_subtitle.strip(),
                 "start_time":   self.animation_timer
                 }
         
@@ -286,63 +280,17 @@ class ComplexFunctionVisualization(Scene):
             # 创建 dz 圆环和 df 圆环
             dz_radius = 0.5
             
-            # 创建彩色环的新方法
-            dz_segments = VGroup()
-            df_segments = VGroup()
+            # 每个方向一条线段，颜色由角度的归一化值决定，整个圆环按颜色分组一次性构建
+            t = dz_angles / (2 * np.pi)
+            dz_segments = SegmentRing(complex_plane.n2p(z_point), dz_radius * np.exp(1j * dz_angles), t,
+                                      cmap="viridis", stroke_width=3)
             
-            # 为每个方向创建一个线段
-            for j in range(num_segments):
-                # 计算当前段的角度
-                angle = dz_angles[j]
-                
-                # 计算颜色（基于角度的归一化值）
-                t = angle / (2 * np.pi)
-                color = get_viridis_color(t)
-                
-                # 计算 dz 线段的起点和终点
-                start_point = complex_plane.n2p(z_point)
-                end_point = start_point + np.array([
-                    dz_radius * np.cos(angle),
-                    dz_radius * np.sin(angle),
-                    0
-                ])
-                start_point = (start_point + 3*end_point)/4
-                
-                # 创建 dz 线段
-                dz_line = Line(
-                    start=start_point,
-                    end=end_point,
-                    stroke_width=3,
-                    color=color
-                )
-                dz_segments.add(dz_line)
-                
-                # 获取对应角度的导数值
-                df_value = dfs[j]
-                
-                # 将复数导数值转换为向量
-                df_vector = np.array([df_value.real, df_value.imag, 0])
-                
-                # 缩放导数向量，使其与 dz_radius 成比例
-                df_vector = df_vector * dz_radius if abs(df_value) > 0 else np.zeros(3)
-                
-                # 计算 df 线段的起点和终点
-                start_point = complex_plane.n2p(f_z)
-                end_point = start_point + df_vector
-                start_point = (start_point + 3*end_point)/4
-                
-                # 创建 df 线段，使用与 dz 相同的颜色
-                df_line = Line(
-                    start=start_point,
-                    end=end_point,
-                    stroke_width=3,
-                    color=color  # 使用与 dz 相同的颜色
-                )
-                df_segments.add(df_line)
+            # df 线段的方向和长度由对应角度的导数值决定，缩放到与 dz_radius 成比例，使用与 dz 相同的颜色
+            df_segments = SegmentRing(complex_plane.n2p(f_z), dz_radius * dfs, t, cmap="viridis", stroke_width=3)
             
             # 显示 dz 线段组
             self.play(
-                Create(dz_segments),
+                GrowSegmentRing(dz_segments),
                 run_time=2
             )
             self.animation_timer += 2
@@ -351,7 +299,7 @@ class ComplexFunctionVisualization(Scene):
             
             # 显示 df 线段组
             self.play(
-                Create(df_segments),
+                GrowSegmentRing(df_segments),
                 run_time=2
             )
             self.animation_timer += 2
@@ -464,7 +412,7 @@ class ComplexFunctionVisualization(Scene):
         # 创建螺线路径 - 修复 scaling 参数问题
         spiral = ParametricFunction(
             spiral_func,
-            t_range=[0, 1, 0.01],  # 使用三元组格式 [t_min, t_max, t_step]
+            t_range=[0, 1, parametric_step(0.01)],  # 使用三元组格式 [t_min, t_max, t_step]
         )
         
         # 起始点 (t=0)
@@ -564,68 +512,5 @@ class ComplexFunctionVisualization(Scene):
 
 # 主函数更新
 if __name__ == "__main__":
-    # 从命令行输入质量参数
-    parser = argparse.ArgumentParser(description="运行复函数可视化动画")
-    parser.add_argument("--quality", "-q", type=str, choices=["l", "m", "h", "k"], default="l",
-                        help="动画质量：l(低), m(中), h(高), k(4K)")
-    parser.add_argument("--preview", "-p", action="store_true",
-                        help="是否自动预览")
-    parser.add_argument("--force", "-f", action="store_true",
-                        help="是否强制重新渲染")
-    parser.add_argument("--keep-cache", "-k", action="store_true",
-                        help="是否保留缓存文件不清除")
-    args = parser.parse_args()
-
-    # 创建一个临时对象用于获取字幕文件路径
-    buff = ComplexFunctionVisualization()
-    class_name = buff.__class__.__name__
-    script_filename = os.path.splitext(os.path.basename(__file__))
-
-    # 将质量参数转换为 manim 的输出质量
-    quality = args.quality
-    voice_name = "longlaotie"  # 使用龙老铁音色
-    quality_to_str = {
-        "l": "480p15",
-        "m": "720p30",
-        "h": "1080p60",
-        "k": "2160p60"
-    }
-    quality_str = quality_to_str.get(quality)
-
-    # 构建并执行命令
-    preview_flag = "-p" if args.preview else ""
-    force_flag = "-f" if args.force else ""
-    cmd = f"manim -q{quality} {preview_flag} {force_flag} {__file__} {class_name}"
-    print(f"执行命令: {cmd}")
-    print("正在渲染动画，请耐心等待...")
-    
-    # 计时
-    import time
-    start_time = time.time()
-    result = subprocess.run(cmd, shell=True)
-    render_time = time.time() - start_time
-    print(f"渲染完成！总耗时：{render_time:.2f}秒")
-
-    # 视频文件路径
-    video_file = f"media/videos/{script_filename[0]}/{quality_str}/{class_name}.mp4"
-    
-    # 在字幕文件第一行插入视频文件和音色信息
-    with open(buff.subtitle_file, 'r+', encoding='utf-8') as f:
-        content = f.read()
-        f.seek(0, 0)
-        f.write(json.dumps({"video_file": video_file, "voice_name": voice_name}, ensure_ascii=False) + '\n' + content)
-    
-    # 调用语音生成函数
-    generate_speech(buff.subtitle_file)
-    
-    print(f"动画已通过命令行渲染完成，带配音的文件为：{video_file.replace('.mp4', '_WithAudio.mp4')}")
-    
-    # 清理缓存文件（仅当未指定保留缓存时）
-    if not args.keep_cache:
-        partial_dir = f"media/videos/{script_filename[0]}/{quality_str}/partial_movie_files"
-        if os.path.exists(partial_dir):
-            shutil.rmtree(partial_dir)
-            print(f"已清除部分电影文件缓存: {partial_dir}")
-        print("缓存清理完成！")
-    else:
-        print("根据设置保留了缓存文件") 
\ No newline at end of file
+    # 在当前进程内渲染并配音，命令行参数见 render_driver.build_parser
+    run_from_command_line(ComplexFunctionVisualization, __file__, "运行复函数可视化动画")
@@ -1,10 +1,10 @@
 import json
 import os
-import shutil
-import subprocess
 import numpy as np
-import argparse
-from generate_speech import generate_speech
+from render_driver import run_from_command_line
+from tex_cache import enable_shared_tex_cache
+from static_hold import StaticHoldMixin
+from lod import parametric_step
 from manim import *
 
 config.tex_template.add_to_preamble(r"""
@@ -13,8 +13,18 @@ config.tex_template.add_to_preamble(r"""
 \usepackage{amssymb}
 """)
 
+enable_shared_tex_cache()
+
+# x^2 在 [-π, π] 上傅里叶级数的前 n 项
+def fourier_x2(x, n):
+    a0 = 2 * np.pi**2 / 3
+    result = a0 / 2
+    for k in range(1, n + 1):
+        result += 4 * (-1)**k * np.cos(k * x) / (k**2)
+    return result
+
 # 幂函数向傅里叶级数展开动画类
-class PowerFunctionFourierSeries(Scene): 
+class PowerFunctionFourierSeries(StaticHoldMixin, Scene): 
     # 初始化代码
     def __init__(self):
         super().__init__()
@@ -22,11 +32,13 @@ class PowerFunctionFourierSeries(Scene):
         self.animation_timer = 0.0      # 动画计时器
         self.subtitle_id = 0            # 字幕序号
         self.time_per_char = 0.28       # 单字符语音时间
+        self.subtitle_mode = os.environ.get("MANIM_SUBTITLE_MODE", "mobject") # 字幕模式：mobject/sidecar/burn
         self.default_output_dir = 'media'
 
         # 确保缓存目录存在
         os.makedirs(self.default_output_dir, exist_ok=True)
-        self.subtitle_file = os.path.join(self.default_output_dir, f"subtitles_{self.__class__.__name__}.jsonl")
+        # 字幕文件可以由 MANIM_SUBTITLE_FILE 指定（渲染部分阶段时不清空完整渲染的字幕）
+        self.subtitle_file = os.environ.get("MANIM_SUBTITLE_FILE") or os.path.join(self.default_output_dir, f"subtitles_{self.__class__.__name__}.jsonl")
 
         # 如果字幕文件存在，则清空文件，否则创建文件
         if os.path.exists(self.subtitle_file):
@@ -52,18 +64,21 @@ class PowerFunctionFourierSeries(Scene):
             
         # 如果文本不为空，则创建新字幕
         if text_subtitle:
-            new_subtitle = MathTex(text_subtitle, font_size=fontsize)
-            new_subtitle.to_edge(DOWN)
+            # 字幕轨模式下只记录文字和时间，字幕在合并音视频时由 ffmpeg 处理
+            if self.subtitle_mode == "mobject":
+                new_subtitle = MathTex(text_subtitle, font_size=fontsize)
+                new_subtitle.to_edge(DOWN)
 
-            # 将字幕添加到场景中
-            self.add(new_subtitle)  # 2D 模式下用这个
-            self.subtitle = new_subtitle
+                # 将字幕添加到场景中
+                self.add(new_subtitle)  # 2D 模式下用这个
+                self.subtitle = new_subtitle
 
-            # 将字幕记录到 jsonl 文件，包括编号、开始时间、文本内容
+            # 将字幕记录到 jsonl 文件，包括编号、开始时间、语音文本和画面字幕文本
             self.subtitle_id += 1
             subtitle_json = {
                 "id":           self.subtitle_id, 
                 "text":         text_voice.strip(),  # 移除空白
+                "subtitle":     text_subtitle.strip(),
                 "start_time":   self.animation_timer
                 }
             with open(self.subtitle_file, 'a', encoding='utf-8') as f:
@@ -185,7 +200,7 @@ class PowerFunctionFourierSeries(Scene):
         colors = [BLUE, GREEN, RED]
         
         for i, n in enumerate([1, 2, 3]):
-            func = axes[0].plot(lambda x: x**n, x_range=[-3, 3], color=colors[i])
+            func = axes[0].plot(lambda x: x**n, x_range=[-3, 3, parametric_step(0.1)], color=colors[i])
             label = MathTex(f"f(x) = x^{n}", color=colors[i])
             label.next_to(func, UP)
             power_funcs.append(func)
@@ -271,7 +286,7 @@ class PowerFunctionFourierSeries(Scene):
                 x = x - 2 * np.pi
             return x**2
         
-        periodic_func = axes_periodic[0].plot(periodic_x_squared, x_range=[-4*np.pi, 4*np.pi], color=BLUE)
+        periodic_func = axes_periodic[0].plot(periodic_x_squared, x_range=[-4*np.pi, 4*np.pi, parametric_step(0.1)], color=BLUE)
         periodic_label = MathTex(r"f(x) = x^2 \text{ 的 } 2\pi \text{ 周期延拓}", color=BLUE)
         periodic_label.next_to(periodic_func, UP)
         
@@ -330,7 +345,7 @@ class PowerFunctionFourierSeries(Scene):
         self.animation_timer += 2
         
         # 创建原函数 x^2
-        original_func = axes_approx[0].plot(lambda x: x**2, x_range=[-np.pi, np.pi], color=BLUE)
+        original_func = axes_approx[0].plot(lambda x: x**2, x_range=[-np.pi, np.pi, parametric_step(0.1)], color=BLUE)
         original_label = MathTex(r"f(x) = x^2", color=BLUE)
         original_label.next_to(original_func, UP)
         
@@ -343,18 +358,9 @@ class PowerFunctionFourierSeries(Scene):
         approx_funcs = []
         approx_labels = []
         
-        # 计算 x^2 的傅里叶系数
-        a0 = 2 * np.pi**2 / 3
-        
-        def fourier_x2(x, n):
-            result = a0 / 2
-            for k in range(1, n + 1):
-                result += 4 * (-1)**k * np.cos(k * x) / (k**2)
-            return result
-        
         n_list = [1, 2, 3, 4, 8, 12, 20]
         for n in n_list:
-            func = axes_approx[0].plot(lambda x: fourier_x2(x, n), x_range=[-np.pi, np.pi], color=RED)
+            func = axes_approx[0].plot(lambda x: fourier_x2(x, n), x_range=[-np.pi, np.pi, parametric_step(0.1)], color=RED)
             n_str = str(n)
             label = MathTex(r"S_{" + n_str + r"}(x) \text{ (n = " + n_str + r")}", color=RED)
             label.next_to(func, LEFT, buff=-1.5)
@@ -458,68 +464,5 @@ class PowerFunctionFourierSeries(Scene):
 
 # 主函数
 if __name__ == "__main__":
-    # 从命令行输入质量参数
-    parser = argparse.ArgumentParser(description="运行幂函数傅里叶级数展开动画")
-    parser.add_argument("--quality", "-q", type=str, choices=["l", "m", "h", "k"], default="l",
-                        help="动画质量：l(低), m(中), h(高), k(4K)")
-    parser.add_argument("--preview", "-p", action="store_true",
-                        help="是否自动预览")
-    parser.add_argument("--force", "-f", action="store_true",
-                        help="是否强制重新渲染")
-    parser.add_argument("--keep-cache", "-k", action="store_true",
-                        help="是否保留缓存文件不清除")
-    args = parser.parse_args()
-
-    # 创建一个临时对象用于获取字幕文件路径
-    buff = PowerFunctionFourierSeries()
-    class_name = buff.__class__.__name__
-    script_filename = os.path.splitext(os.path.basename(__file__))
-
-    # 将质量参数转换为 manim 的输出质量
-    quality = args.quality
-    voice_name = "longlaotie"  # 使用龙老铁音色
-    quality_to_str = {
-        "l": "480p15",
-        "m": "720p30",
-        "h": "1080p60",
-        "k": "2160p60"
-    }
-    quality_str = quality_to_str.get(quality)
-
-    # 构建并执行命令
-    preview_flag = "-p" if args.preview else ""
-    force_flag = "-f" if args.force else ""
-    cmd = f"manim -q{quality} {preview_flag} {force_flag} {__file__} {class_name}"
-    print(f"执行命令: {cmd}")
-    print("正在渲染动画，请耐心等待...")
-    
-    # 计时
-    import time
-    start_time = time.time()
-    result = subprocess.run(cmd, shell=True)
-    render_time = time.time() - start_time
-    print(f"渲染完成！总耗时：{render_time:.2f}秒")
-
-    # 视频文件路径
-    video_file = f"media/videos/{script_filename[0]}/{quality_str}/{class_name}.mp4"
-    
-    # 在字幕文件第一行插入视频文件和音色信息
-    with open(buff.subtitle_file, 'r+', encoding='utf-8') as f:
-        content = f.read()
-        f.seek(0, 0)
-        f.write(json.dumps({"video_file": video_file, "voice_name": voice_name}, ensure_ascii=False) + '\n' + content)
-    
-    # 调用语音生成函数
-    generate_speech(buff.subtitle_file)
-    
-    print(f"动画已通过命令行渲染完成，带配音的文件为：{video_file.replace('.mp4', '_WithAudio.mp4')}")
-    
-    # 清理缓存文件（仅当未指定保留缓存时）
-    if not args.keep_cache:
-        partial_dir = f"media/videos/{script_filename[0]}/{quality_str}/partial_movie_files"
-        if os.path.exists(partial_dir):
-            shutil.rmtree(partial_dir)
-            print(f"已清除部分电影文件缓存: {partial_dir}")
-        print("缓存清理完成！")
-    else:
-        print("根据设置保留了缓存文件")
+    # 在当前进程内渲染并配音，命令行参数见 render_driver.build_parser
+    run_from_command_line(PowerFunctionFourierSeries, __file__, "运行幂函数傅里叶级数展开动画")
@@ -1,10 +1,10 @@
 import json
 import os
-import subprocess
-import argparse
 import numpy as np
-import shutil
-from generate_speech import generate_speech
+from render_driver import run_from_command_line
+from tex_cache import enable_shared_tex_cache
+from static_hold import StaticHoldMixin
+from lod import lod, parametric_step
 from manim import *
 
 config.tex_template.add_to_preamble(r"""
@@ -13,17 +13,29 @@ config.tex_template.add_to_preamble(r"""
 \usepackage{amssymb}
 """)
 
-class TopologyTransformation(Scene):
+enable_shared_tex_cache()
+
+# 阿基米德螺线，k 从 1 减小到 0 时螺线逐渐展开成直线
+def spiral_func(t, k=1.0):
+    return np.array([
+        t/4 * np.cos(k*t),
+        t/4 * np.sin(k*t),
+        0
+    ])
+
+class TopologyTransformation(StaticHoldMixin, Scene):
     def __init__(self):
         super().__init__()
         self.manim_output_dir = 'media'      # manim 默认输出文件夹
         self.animation_timer = 0.0            # 动画计时器
         self.subtitle_id = 0                  # 字幕序号
         self.time_per_char = 0.28             # 单字符语音时间
+        self.subtitle_mode = os.environ.get("MANIM_SUBTITLE_MODE", "mobject")  # 字幕模式：mobject/sidecar/burn
         
         # 确保缓存目录存在
         os.makedirs(self.manim_output_dir, exist_ok=True)
-        self.subtitle_file = os.path.join(self.manim_output_dir, f"subtitles_{self.__class__.__name__}.jsonl")
+        # 字幕文件可以由 MANIM_SUBTITLE_FILE 指定（渲染部分阶段时不清空完整渲染的字幕）
+        self.subtitle_file = os.environ.get("MANIM_SUBTITLE_FILE") or os.path.join(self.manim_output_dir, f"subtitles_{self.__class__.__name__}.jsonl")
         
         # 初始化字幕文件
         if os.path.exists(self.subtitle_file):
@@ -46,17 +58,19 @@ class TopologyTransformation(Scene):
         if text_voice is None:
             text_voice = text_subtitle
             
-        # 创建新字幕
-        new_subtitle = MathTex(text_subtitle, font_size=fontsize)
-        new_subtitle.to_edge(DOWN)
-        self.add(new_subtitle)
-        self.subtitle = new_subtitle
+        # 创建新字幕，字幕轨模式下只记录文字和时间
+        if self.subtitle_mode == "mobject":
+            new_subtitle = MathTex(text_subtitle, font_size=fontsize)
+            new_subtitle.to_edge(DOWN)
+            self.add(new_subtitle)
+            self.subtitle = new_subtitle
 
-        # 将字幕记录到 jsonl 文件，包括编号、开始时间、文本内容
+        # 将字幕记录到 jsonl 文件，包括编号、开始时间、语音文本和画面字幕文本
         self.subtitle_id += 1
         subtitle_json = {
             "id": self.subtitle_id,
             "text": text_voice.strip(),
+            "subtitle": text_subtitle.strip(),
             "start_time": self.animation_timer
         }
         with open(self.subtitle_file, 'a', encoding='utf-8') as f:
@@ -164,16 +178,9 @@ class TopologyTransformation(Scene):
         self.update_subtitle(r"\text{阿基米德螺线区域}", "现在是一个阿基米德螺线区域")
         
         # 创建螺线区域（带宽度的闭合区域）
-        def spiral_func(t, k=1.0):
-            return np.array([
-                t/4 * np.cos(k*t),
-                t/4 * np.sin(k*t),
-                0
-            ])
-            
         spiral_region = ParametricFunction(
             lambda t: spiral_func(t),
-            t_range=[0, 6*PI],
+            t_range=[0, 6*PI, parametric_step(0.01)],
             color=PURPLE
         ).set_stroke(width=30)
         
@@ -187,16 +194,17 @@ class TopologyTransformation(Scene):
         self.update_subtitle(r"\text{首先要把螺线打开}", 
                              "这个区域不能直接撑开成圆形，但是可以先把螺线打开，然后再变形", wait=1)
         
-        # 为了提高效率，这里可以合并一些帧
-        step_count = 200
+        # 为了提高效率，这里可以合并一些帧；步数随质量变化，展开的总时长固定为 10 秒（原来 200 步 × 0.05 秒）
+        step_count = lod("c04_step_count")
+        step_time = 10.0 / step_count
         for k in np.linspace(1.0, 0.0, step_count):
             new_spiral = ParametricFunction(
                 lambda t: spiral_func(t, k),
-                t_range=[0, 6*PI],
+                t_range=[0, 6*PI, parametric_step(0.01)],
                 color=PURPLE
             ).set_stroke(width=30)
-            self.play(Transform(spiral_region, new_spiral), run_time=0.05)
-            self.animation_timer += 0.05  # 更新计时器
+            self.play(Transform(spiral_region, new_spiral), run_time=step_time)
+            self.animation_timer += step_time  # 更新计时器
         
         # 获取展开后螺线的实际长度和位置信息
         points = np.array(spiral_region.points)
@@ -262,68 +270,5 @@ class TopologyTransformation(Scene):
 
 # 主函数
 if __name__ == "__main__":
-    # 从命令行输入质量参数
-    parser = argparse.ArgumentParser(description="运行单连通区域变换动画")
-    parser.add_argument("--quality", "-q", type=str, choices=["l", "m", "h", "k"], default="l",
-                        help="动画质量：l(低), m(中), h(高), k(4K)")
-    parser.add_argument("--preview", "-p", action="store_true",
-                        help="是否自动预览")
-    parser.add_argument("--force", "-f", action="store_true",
-                        help="是否强制重新渲染")
-    parser.add_argument("--keep-cache", "-k", action="store_true",
-                        help="是否保留缓存文件不清除")
-    args = parser.parse_args()
-
-    # 创建一个临时对象用于获取字幕文件路径
-    buff = TopologyTransformation()
-    class_name = buff.__class__.__name__
-    script_filename = os.path.splitext(os.path.basename(__file__))
-
-    # 将质量参数转换为 manim 的输出质量
-    quality = args.quality
-    voice_name = "longlaotie"  # 使用龙老铁音色
-    quality_to_str = {
-        "l": "480p15",
-        "m": "720p30",
-        "h": "1080p60",
-        "k": "2160p60"
-    }
-    quality_str = quality_to_str.get(quality)
-
-    # 构建并执行命令
-    preview_flag = "-p" if args.preview else ""
-    force_flag = "-f" if args.force else ""
-    cmd = f"manim -q{quality} {preview_flag} {force_flag} {__file__} {class_name}"
-    print(f"执行命令: {cmd}")
-    print("正在渲染动画，请耐心等待...")
-    
-    # 计时
-    import time
-    start_time = time.time()
-    result = subprocess.run(cmd, shell=True)
-    render_time = time.time() - start_time
-    print(f"渲染完成！总耗时：{render_time:.2f}秒")
-
-    # 视频文件路径
-    video_file = f"media/videos/{script_filename[0]}/{quality_str}/{class_name}.mp4"
-    
-    # 在字幕文件第一行插入视频文件和音色信息
-    with open(buff.subtitle_file, 'r+', encoding='utf-8') as f:
-        content = f.read()
-        f.seek(0, 0)
-        f.write(json.dumps({"video_file": video_file, "voice_name": voice_name}, ensure_ascii=False) + '\n' + content)
-    
-    # 调用语音生成函数
-    generate_speech(buff.subtitle_file)
-    
-    print(f"动画已通过命令行渲染完成，带配音的文件为：{video_file.replace('.mp4', '_WithAudio.mp4')}")
-    
-    # 清理缓存文件（仅当未指定保留缓存时）
-    if not args.keep_cache:
-        partial_dir = f"media/videos/{script_filename[0]}/{quality_str}/partial_movie_files"
-        if os.path.exists(partial_dir):
-            shutil.rmtree(partial_dir)
-            print(f"已清除部分电影文件缓存: {partial_dir}")
-        print("缓存清理完成！")
-    else:
-        print("根据设置保留了缓存文件") 
\ No newline at end of file
+    # 在当前进程内渲染并配音，命令行参数见 render_driver.build_parser
+    run_from_command_line(TopologyTransformation, __file__, "运行单连通区域变换动画")
@@ -1,9 +1,10 @@
 import json
 import os
-import subprocess
-import argparse
 import numpy as np
-from generate_speech import generate_speech
+from render_driver import run_from_command_line
+from tex_cache import enable_shared_tex_cache
+from static_hold import StaticHoldMixin
+from lod import lod
 from manim import *
 
 config.tex_template.add_to_preamble(r"""
@@ -12,6 +13,8 @@ config.tex_template.add_to_preamble(r"""
 \usepackage{amssymb}
 """)
 
+enable_shared_tex_cache()
+
 scaler = 2
 
 # 参数方程的定义
@@ -28,7 +31,7 @@ def param_b(k):
     term2 = np.cos(np.pi/2 * (k/10**4)**7) * (1 + 1.5 * np.cos(k*np.pi/(2*10**4))**6 * np.cos(3*k*np.pi/(2*10**4))**6) * np.cos(41*k*np.pi/10**4)**6
     return scaler * (term1 - term2 + 0.5)
 
-class LineArtAnimation(Scene):
+class LineArtAnimation(StaticHoldMixin, Scene):
     # 初始化代码
     def __init__(self):
         super().__init__()
@@ -36,12 +39,14 @@ class LineArtAnimation(Scene):
         self.animation_timer = 0.0      # 动画计时器
         self.subtitle_id = 0            # 字幕序号
         self.time_per_char = 0.28       # 单字符语音时间
+        self.subtitle_mode = os.environ.get("MANIM_SUBTITLE_MODE", "mobject") # 字幕模式：mobject/sidecar/burn
 
         # 确保缓存目录存在
         os.makedirs(self.manim_output_dir, exist_ok=True)
         
         # 设定字幕文件
-        self.subtitle_file = os.path.join(self.manim_output_dir, f"subtitles_{self.__class__.__name__}.jsonl")
+        # 字幕文件可以由 MANIM_SUBTITLE_FILE 指定（渲染部分阶段时不清空完整渲染的字幕）
+        self.subtitle_file = os.environ.get("MANIM_SUBTITLE_FILE") or os.path.join(self.manim_output_dir, f"subtitles_{self.__class__.__name__}.jsonl")
 
         # 如果字幕文件存在，则清空文件，否则创建文件
         if os.path.exists(self.subtitle_file):
@@ -61,19 +66,22 @@ class LineArtAnimation(Scene):
         if hasattr(self, 'subtitle') and self.subtitle is not None:
             self.remove(self.subtitle)
         
-        new_subtitle = MathTex(text_subtitle, font_size=fontsize)
-        new_subtitle.to_edge(DOWN)
+        # 字幕轨模式下只记录文字和时间，字幕在合并音视频时由 ffmpeg 处理
+        if self.subtitle_mode == "mobject":
+            new_subtitle = MathTex(text_subtitle, font_size=fontsize)
+            new_subtitle.to_edge(DOWN)
 
-        # 将字幕添加到场景中
-        # self.add_fixed_in_frame_mobjects(new_subtitle) # 3D 模式下用这个
-        self.add(new_subtitle) # 2D 模式下用这个
-        self.subtitle = new_subtitle
+            # 将字幕添加到场景中
+            # self.add_fixed_in_frame_mobjects(new_subtitle) # 3D 模式下用这个
+            self.add(new_subtitle) # 2D 模式下用这个
+            self.subtitle = new_subtitle
 
-        # 将字幕记录到 jsonl 文件，包括编号、开始时间、文本内容
+        # 将字幕记录到 jsonl 文件，包括编号、开始时间、语音文本和画面字幕文本
         self.subtitle_id += 1
         subtitle_json = {
             "id":           self.subtitle_id, 
             "text":         text_voice.strip(),  # 移除空白
+            "subtitle":     text_subtitle.strip(),
             "start_time":   self.animation_timer
             }
         with open(self.subtitle_file, 'a', encoding='utf-8') as f:
@@ -150,7 +158,7 @@ class LineArtAnimation(Scene):
         self.play(Create(axes), run_time=2)
 
         # 生成参数点并创建曲线
-        k_values = np.linspace(-10000, 10000, 10000)
+        k_values = np.linspace(-10000, 10000, lod("c05_k_values"))
         points = []
         for k in k_values:
             a = param_a(k)
@@ -238,44 +246,6 @@ class LineArtAnimation(Scene):
 
 # 主函数
 if __name__ == "__main__":
-    # 从命令行输入质量参数，例如 -ql 表示低质量
-    parser = argparse.ArgumentParser(description="参数方程线条画动画")
-    parser.add_argument("--quality", "-q", type=str, choices=["l", "m", "h", "k"], default="l",
-                        help="动画质量：l(低), m(中), h(高), k(4K)")
-    args = parser.parse_args()
-
-    buff = LineArtAnimation() # 创建一个虚的对象用于获取字幕文件路径
-    class_name = buff.__class__.__name__
-    script_filename = os.path.splitext(os.path.basename(__file__))
-
-    # 定义 manim 命令行参数
-    quality = args.quality  # 从命令行参数获取质量设置
-    voice_name = "longlaotie"  # 可选的有 longlaotie, longbella 等
-
-    # 将质量参数转换为 manim 的输出质量
-    quality_to_str = {
-        "l": "480p15",
-        "m": "720p30",
-        "h": "1080p60",
-        "k": "2160p60"
-    }; quality_str = quality_to_str.get(quality)
-
-    # 构建并执行 manim 命令，-q 指定渲染质量，-p 指定预览，__file__ 指定当前文件，class_name 指定类名
-    cmd = f"manim -q{quality} {__file__} {class_name}"
-    result = subprocess.run(cmd, shell=True)
-
-    # 根据 manim 的输出结构确定文件路径
-    # 视频文件路径：media/videos/类名/质量标识/类名.mp4
-    # 字幕文件在类初始化时会自动设定。
-    video_file = f"media/videos/{script_filename[0]}/{quality_str}/{class_name}.mp4"
-
-    # 在字幕文件第一行插入视频文件和音色信息
-    with open(buff.subtitle_file, 'r+', encoding='utf-8') as f:
-        content = f.read()
-        f.seek(0, 0)
-        f.write(json.dumps({"video_file": video_file, "voice_name": voice_name}, ensure_ascii=False) + '\n' + content)
-    
-    # 调用语音生成函数，使用阿里云的龙老铁音色，因其断句一般较好
-    # generate_speech(buff.subtitle_file)
-    
-    print(f"动画已通过命令行渲染完成，带配音的文件为：{video_file.replace('.mp4', '_WithAudio.mp4')}") 
\ No newline at end of file
+    # 在当前进程内渲染并配音，命令行参数见 render_driver.build_parser
+    # 该动画默认不配音
+    run_from_command_line(LineArtAnimation, __file__, "参数方程线条画动画", dub=False)
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""批量渲染和配音
+
+把每个任务（脚本、场景、质量、音色）拆成 渲染 → 语音合成 → 混音 → 合并 四个节点，组成依赖图，
+用与 CPU 核数相同数量的进程并行执行互不依赖的节点（每个节点一个新进程）。每个节点记录输入的指纹，输入没有变化且输出存在时直接跳过。
+运行结束后打印总耗时和 CPU 利用率。
+
+只有音色不同的任务渲染出的视频完全相同，因此（脚本、场景、质量、字幕模式）相同的任务共用一个渲染节点，
+各音色的语音合成节点都依赖它，配音后的视频和字幕文件名带有音色后缀（如 Scene_WithAudio_longlaotie.mp4）。
+同一个场景的不同质量会写同一个字幕文件，因此这些渲染节点之间额外加了先后顺序。
+
+任务文件为 JSON 列表，例如：
+[
+    {"script": "C01-Riemann_sphere.py", "scene": "RiemannSphere", "quality": "l", "voice": "longlaotie"},
+    {"script": "C04-TopologyTransformation.py", "quality": "m"}
+]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import queue
+import threading
+import importlib.util
+import multiprocessing
+import multiprocessing.connection
+from collections import deque
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+
+# 批量任务的工作目录，每个任务一个子目录
+batch_dir = os.path.join("media", "batch")
+
+stage_names = ["render", "synthesize", "mix", "mux"]
+
+
+def load_script(script_file):
+    """按文件路径导入场景脚本（脚本名中可能含有连字符，不能直接 import）"""
+    module_name = os.path.splitext(os.path.basename(script_file))[0].replace("-", "_")
+    spec = importlib.util.spec_from_file_location(module_name, script_file)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def find_scene_class(module, scene_name=None):
+    """返回脚本中的场景类，未指定名称时要求脚本中恰好定义了一个场景"""
+    from manim import Scene
+
+    if scene_name is not None:
+        return getattr(module, scene_name)
+    scenes = [obj for obj in vars(module).values()
+              if isinstance(obj, type) and issubclass(obj, Scene) and obj.__module__ == module.__name__]
+    if len(scenes) != 1:
+        raise ValueError(f"{module.__name__} 中有 {len(scenes)} 个场景类，请在任务中指定 scene")
+    return scenes[0]
+
+
+def file_digest(path):
+    """文件内容的哈希，文件不存在时返回空字符串"""
+    if not os.path.exists(path):
+        return ""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def file_signature(path):
+    """大文件（视频、音频）只比较大小和修改时间"""
+    if not os.path.exists(path):
+        return ""
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def _process_entry(conn, func, args):
+    """子进程入口：执行 func 并把 (是否成功, 结果或异常) 发回父进程"""
+    try:
+        result = (True, func(*args))
+    except BaseException as e:
+        result = (False, e)
+    try:
+        conn.send(result)
+    except Exception:
+        # 异常对象无法序列化时只传回文字
+        conn.send((False, RuntimeError(f"{type(result[1]).__name__}: {result[1]}")))
+    conn.close()
+
+
+class FreshProcessPool:
+    """每个任务都在新的 spawn 进程中执行，最多同时运行 max_workers 个进程
+
+    脚本在导入时会修改全局的 manim 配置（如 TeX 导言区），不能在同一进程中重复导入，
+    因此不能复用工作进程（ProcessPoolExecutor 的 max_tasks_per_child 需要 Python 3.11，
+    Docker 镜像中的 Python 为 3.10）。submit 返回 concurrent.futures.Future，可以直接使用 wait。
+    """
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self.ctx = multiprocessing.get_context("spawn")
+        self.tasks = queue.Queue()
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def submit(self, func, *args):
+        future = Future()
+        self.tasks.put((future, func, args))
+        return future
+
+    def shutdown(self):
+        self.tasks.put(None)
+        self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def _loop(self):
+        pending, running, closing = deque(), {}, False
+        while not closing or pending or running:
+            # 取出新提交的任务，没有正在运行的进程时阻塞等待
+            try:
+                while True:
+                    item = self.tasks.get(block=not (running or pending or closing))
+                    if item is None:
+                        closing = True
+                    else:
+                        pending.append(item)
+                    if self.tasks.empty():
+                        break
+            except queue.Empty:
+                pass
+
+            while pending and len(running) < self.max_workers:
+                future, func, args = pending.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                parent_conn, child_conn = self.ctx.Pipe(duplex=False)
+                process = self.ctx.Process(target=_process_entry, args=(child_conn, func, args))
+                process.start()
+                child_conn.close()
+                running[parent_conn] = (future, process)
+
+            if not running:
+                continue
+            # 定时返回，以便接收新提交的任务
+            for conn in multiprocessing.connection.wait(list(running), timeout=0.1):
+                future, process = running.pop(conn)
+                try:
+                    ok, value = conn.recv()
+                except EOFError:
+                    ok, value = False, None
+                conn.close()
+                process.join()
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value or RuntimeError(f"工作进程异常退出（退出码 {process.exitcode}）"))
+
+
+class Job:
+    """一个批量任务及其各阶段的文件路径"""
+
+    def __init__(self, script, scene=None, quality="l", voice="longlaotie", subtitle_mode="mobject"):
+        self.script = script
+        self.scene = scene
+        self.quality = quality
+        self.voice = voice
+        self.subtitle_mode = subtitle_mode
+
+        script_name = os.path.splitext(os.path.basename(script))[0]
+        self.name = f"{script_name}_{scene or 'auto'}_{quality}_{voice}"
+        self.work_dir = os.path.join(batch_dir, self.name)
+        # 渲染结果与音色无关，放在按渲染参数命名的目录中，由音色不同的任务共用
+        self.render_key = (os.path.abspath(script), scene, quality, subtitle_mode)
+        self.render_dir = os.path.join(batch_dir, "render", f"{script_name}_{scene or 'auto'}_{quality}_{subtitle_mode}")
+        self.timeline_file = os.path.join(self.render_dir, "timeline.jsonl")
+        self.info_file = os.path.join(self.render_dir, "render.json")
+        self.audio_list_file = os.path.join(self.work_dir, "audio_files.json")
+        self.full_audio_file = os.path.join(self.work_dir, "full_audio.mp3")
+
+    @property
+    def video_file(self):
+        with open(self.info_file, 'r', encoding='utf-8') as f:
+            return json.load(f)["video_file"]
+
+    def dubbed_file(self, ext=".mp4"):
+        """配音后的输出文件，带音色后缀"""
+        return self.video_file.replace('.mp4', f'_WithAudio_{self.voice}{ext}')
+
+    def stamp_file(self, stage):
+        return os.path.join(self.render_dir if stage == "render" else self.work_dir, f"{stage}.stamp")
+
+    def fingerprint(self, stage):
+        """节点输入的指纹"""
+        hasher = hashlib.sha256()
+        if stage == "render":
+            # 脚本导入的本地辅助模块变化时也要重新渲染
+            from render_cache import local_source_files
+            parts = [file_digest(path) for path in local_source_files(self.script)]
+            parts += [self.scene, self.quality, self.subtitle_mode]
+        elif stage == "synthesize":
+            parts = [file_digest(self.timeline_file), self.voice]
+        elif stage == "mix":
+            parts = [file_digest(self.timeline_file), file_digest(self.audio_list_file),
+                     file_signature(self.video_file)]
+        else:
+            parts = [file_signature(self.video_file), file_signature(self.full_audio_file), self.subtitle_mode]
+        for part in parts:
+            hasher.update(str(part).encode("utf-8"))
+            hasher.update(b"\0")
+        return hasher.hexdigest()
+
+    def outputs_exist(self, stage):
+        if stage == "render":
+            return os.path.exists(self.info_file) and os.path.exists(self.video_file)
+        if stage == "synthesize":
+            return os.path.exists(self.audio_list_file)
+        if stage == "mix":
+            return os.path.exists(self.full_audio_file)
+        return os.path.exists(self.dubbed_file())
+
+    def is_up_to_date(self, stage):
+        stamp = self.stamp_file(stage)
+        if not os.path.exists(stamp) or not self.outputs_exist(stage):
+            return False
+        with open(stamp, 'r') as f:
+            return f.read().strip() == self.fingerprint(stage)
+
+
+def _cpu_time():
+    """当前进程及其子进程（如 ffmpeg）累计的 CPU 时间"""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def run_stage(job, stage):
+    """在工作进程中执行一个节点，返回 (是否跳过, 耗时, CPU 时间)"""
+    start_wall, start_cpu = time.time(), _cpu_time()
+    os.makedirs(job.render_dir if stage == "render" else job.work_dir, exist_ok=True)
+
+    if job.is_up_to_date(stage):
+        return True, time.time() - start_wall, _cpu_time() - start_cpu
+
+    import generate_speech as gs
+    # 每个任务使用自己的音频目录，避免并行任务互相覆盖
+    gs.cache_dir = job.work_dir
+
+    if stage == "render":
+        from render_driver import render_scene
+        os.environ["MANIM_SUBTITLE_MODE"] = job.subtitle_mode
+        scene_class = find_scene_class(load_script(job.script), job.scene)
+        scene, video_file = render_scene(scene_class, job.script, job.quality)
+        shutil.copyfile(scene.subtitle_file, job.timeline_file)
+        with open(job.info_file, 'w', encoding='utf-8') as f:
+            json.dump({"video_file": video_file, "scene": scene_class.__name__}, f, ensure_ascii=False)
+
+    elif stage == "synthesize":
+        from render_driver import read_timeline
+        audio_files, durations = gs.run_tts_4all(read_timeline(job.timeline_file), job.voice)
+        with open(job.audio_list_file, 'w', encoding='utf-8') as f:
+            json.dump({"audio_files": audio_files, "durations": durations}, f)
+
+    elif stage == "mix":
+        from render_driver import read_timeline
+        subtitles = read_timeline(job.timeline_file)
+        with open(job.audio_list_file, 'r', encoding='utf-8') as f:
+            audio_files = json.load(f)["audio_files"]
+        total_time = gs.get_video_duration(job.video_file)
+        gs.make_final_audio(subtitles, audio_files, total_time)
+        if job.subtitle_mode in ("sidecar", "burn"):
+            gs.write_subtitle_file(subtitles, os.path.join(job.work_dir, "subtitles.srt"), total_time)
+            gs.write_subtitle_file(subtitles, job.dubbed_file(".vtt"), total_time)
+
+    else:
+        gs.verify_time(job.video_file)
+        if not gs.merge_video_audio(job.video_file, verbose=False, subtitle_mode=job.subtitle_mode,
+                                    output_file=job.dubbed_file()):
+            raise RuntimeError(f"合并失败: {job.video_file}")
+
+    with open(job.stamp_file(stage), 'w') as f:
+        f.write(job.fingerprint(stage))
+    return False, time.time() - start_wall, _cpu_time() - start_cpu
+
+
+def render_owners(jobs):
+    """每个任务的渲染由哪个任务执行：渲染参数相同的任务中的第一个"""
+    first, owners = {}, []
+    for i, job in enumerate(jobs):
+        owners.append(first.setdefault(job.render_key, i))
+    return owners
+
+
+def build_graph(jobs):
+    """构建依赖图，返回 {节点: 前置节点集合}，节点为 (任务序号, 阶段)"""
+    deps = {}
+    last_render_of_scene = {}
+    for i, (job, owner) in enumerate(zip(jobs, render_owners(jobs))):
+        for k, stage in enumerate(stage_names):
+            deps[(i, stage)] = {(i, stage_names[k - 1])} if k > 0 else set()
+        if owner != i:
+            # 只有音色不同，直接使用第一个任务的渲染结果
+            del deps[(i, "render")]
+            deps[(i, "synthesize")] = {(owner, "render")}
+            continue
+        # 同一场景的渲染共用字幕文件，需要依次进行
+        key = (os.path.abspath(job.script), job.scene)
+        if key in last_render_of_scene:
+            deps[(i, "render")].add(last_render_of_scene[key])
+        last_render_of_scene[key] = (i, "render")
+    return deps
+
+
+def run_batch(jobs, workers=None):
+    """按依赖图并行执行所有节点，返回每个节点的结果"""
+    workers = workers or os.cpu_count() or 1
+    deps = build_graph(jobs)
+    done, failed, results = set(), set(), {}
+    running = {}
+
+    start_wall = time.time()
+    # 每个节点使用新进程：脚本在导入时会修改全局的 manim 配置（如 TeX 导言区），不能在同一进程中重复导入
+    with FreshProcessPool(workers) as pool:
+        while len(done) + len(failed) < len(deps):
+            # 前置节点失败的节点直接标记为失败
+            for node, pre in deps.items():
+                if node not in done and node not in failed and pre & failed:
+                    failed.add(node)
+                    results[node] = ("blocked", 0.0, 0.0)
+
+            # 提交所有前置节点已完成的节点
+            for node, pre in deps.items():
+                if node in done or node in failed or node in running.values():
+                    continue
+                if pre <= done:
+                    i, stage = node
+                    running[pool.submit(run_stage, jobs[i], stage)] = node
+
+            if not running:
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                node = running.pop(future)
+                i, stage = node
+                try:
+                    skipped, wall, cpu = future.result()
+                    done.add(node)
+                    results[node] = ("skipped" if skipped else "done", wall, cpu)
+                    print(f"[{'跳过' if skipped else '完成'}] {jobs[i].name} / {stage} ({wall:.1f}秒)")
+                except Exception as e:
+                    failed.add(node)
+                    results[node] = ("failed", 0.0, 0.0)
+                    print(f"[失败] {jobs[i].name} / {stage}: {e}")
+
+    print_summary(jobs, results, time.time() - start_wall, workers)
+
+    from render_driver import prune_partial_movie_files
+    prune_partial_movie_files()
+    return results
+
+
+def print_summary(jobs, results, wall_time, workers):
+    """打印每个阶段的耗时以及整体 CPU 利用率"""
+    total_cpu = sum(cpu for _, _, cpu in results.values())
+    print("\n批量任务汇总:")
+    print(f"  {'任务':<48}" + "".join(f"{stage:>14}" for stage in stage_names))
+    for i, (job, owner) in enumerate(zip(jobs, render_owners(jobs))):
+        cells = []
+        for stage in stage_names:
+            if stage == "render" and owner != i:
+                cells.append(f"同#{owner + 1}")
+                continue
+            status, wall, _ = results.get((i, stage), ("-", 0.0, 0.0))
+            cells.append(f"{status}:{wall:.1f}s" if status in ("done", "skipped") else status)
+        print(f"  {job.name:<48}" + "".join(f"{c:>14}" for c in cells))
+    print(f"  总耗时: {wall_time:.1f}秒, CPU 时间: {total_cpu:.1f}秒, 进程数: {workers}")
+    if wall_time > 0:
+        print(f"  CPU 利用率: {total_cpu / (wall_time * workers):.0%}")
+
+
+def load_jobs(jobs_file):
+    with open(jobs_file, 'r', encoding='utf-8') as f:
+        return [Job(**item) for item in json.load(f)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量渲染和配音")
+    parser.add_argument("jobs_file", type=str, nargs="?", default=None, help="任务文件（JSON 列表）")
+    parser.add_argument("--scripts", type=str, nargs="*", default=[], help="直接指定脚本，与 --qualities 组合成任务")
+    parser.add_argument("--qualities", type=str, default="l", help="逗号分隔的质量列表，例如 l,m,h")
+    parser.add_argument("--voice", type=str, default="longlaotie", help="配音音色")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="进程数，默认等于 CPU 核数")
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.jobs_file) if args.jobs_file else []
+    for script in args.scripts:
+        for quality in args.qualities.split(","):
+            jobs.append(Job(script, quality=quality, voice=args.voice))
+    if not jobs:
+        parser.error("请提供任务文件或 --scripts")
+
+    run_batch(jobs, args.workers)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""场景性能基准
+
+对每个场景分别运行两种模式，每次运行都在独立的子进程中进行，以便测量峰值内存：
+    construct: 跳过所有动画，只执行 construct 中的对象构建和状态计算
+    render:    低质量完整渲染（使用临时的部分电影文件目录，不复用之前的缓存）
+记录耗时、峰值内存（RSS）和对象数，追加到 media/benchmark/history.json，并与保存的基线比较，
+耗时或内存超过基线一定比例时标记为退化，此时脚本以非零状态退出。
+
+    python3 benchmark.py                       # 运行全部场景
+    python3 benchmark.py --scenes RiemannSphere --modes construct
+    python3 benchmark.py --save-baseline       # 把本次结果保存为基线
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import subprocess
+
+# 基准场景：(脚本, 场景类名)
+benchmark_scenes = [
+    ("template.py", "Template"),
+    ("C01-Riemann_sphere.py", "RiemannSphere"),
+    ("C02-complex_function_visualization.py", "ComplexFunctionVisualization"),
+    ("C03-power_series_fourier.py", "PowerFunctionFourierSeries"),
+    ("C04-TopologyTransformation.py", "TopologyTransformation"),
+    ("C05-bird.py", "LineArtAnimation"),
+]
+
+benchmark_modes = ["construct", "render"]
+
+benchmark_dir = os.path.join("media", "benchmark")
+history_file = os.path.join(benchmark_dir, "history.json")
+baseline_file = os.path.join(benchmark_dir, "baseline.json")
+
+# 超过基线的比例达到该值时视为退化
+regression_threshold = 0.15
+
+# 子进程输出结果时使用的前缀
+result_prefix = "BENCHMARK_RESULT "
+
+
+def run_worker(script_file, scene_name, mode):
+    """在当前进程中运行一次基准，返回结果字典"""
+    from batch_render import load_script
+    from render_driver import render_scene
+
+    scene_class = getattr(load_script(script_file), scene_name)
+    work_dir = os.path.join(benchmark_dir, f"{scene_name}_{mode}")
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir, exist_ok=True)
+
+    def prepare(scene):
+        if mode == "construct":
+            scene.renderer._original_skipping_status = True
+            scene.renderer.skip_animations = True
+
+    extra_config = {"output_file": f"{scene_name}_benchmark",
+                    "partial_movie_dir": os.path.abspath(os.path.join(work_dir, "partial_movie_files"))}
+    if mode == "construct":
+        extra_config["write_to_movie"] = False
+
+    start = time.perf_counter()
+    # 字幕写到临时文件，不覆盖正式渲染的字幕时间线
+    scene, video_file = render_scene(scene_class, script_file, "l", extra_config=extra_config, prepare_scene=prepare,
+                                     subtitle_file=os.path.join(work_dir, "subtitles.jsonl"))
+    wall_time = time.perf_counter() - start
+
+    result = {
+        "wall_time": wall_time,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "num_plays": scene.renderer.num_plays,
+        "top_level_mobjects": len(scene.mobjects),
+        "family_mobjects": len(scene.get_mobject_family_members()),
+    }
+    shutil.rmtree(work_dir, ignore_errors=True)
+    if mode == "render" and os.path.exists(video_file):
+        os.remove(video_file)
+    return result
+
+
+def run_benchmark(script_file, scene_name, mode, env=None):
+    """在子进程中运行一次基准，失败时返回 None；env 为子进程的环境变量，例如 MANIM_RENDERER"""
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", script_file, scene_name, mode]
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(result_prefix):
+            return json.loads(line[len(result_prefix):])
+    print(f"[失败] {scene_name} / {mode}\n{proc.stderr[-2000:]}")
+    return None
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def compare_with_baseline(results, baseline, threshold=None):
+    """返回退化项列表 [(场景, 模式, 指标, 基线值, 本次值)]"""
+    threshold = regression_threshold if threshold is None else threshold
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None or result is None:
+            continue
+        scene_name, mode = key.split("/")
+        for metric in ("wall_time", "peak_rss_mb"):
+            if result[metric] > base[metric] * (1 + threshold):
+                regressions.append((scene_name, mode, metric, base[metric], result[metric]))
+    return regressions
+
+
+def print_results(results, baseline):
+    print(f"\n{'场景/模式':<42}{'耗时':>10}{'基线':>10}{'峰值内存':>12}{'对象数':>8}{'play数':>8}")
+    for key, r in results.items():
+        if r is None:
+            print(f"{key:<42}{'失败':>10}")
+            continue
+        base = baseline.get(key)
+        base_time = f"{base['wall_time']:.2f}s" if base else "-"
+        print(f"{key:<42}{r['wall_time']:9.2f}s{base_time:>10}{r['peak_rss_mb']:10.0f}MB"
+              f"{r['family_mobjects']:8d}{r['num_plays']:8d}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="运行场景性能基准")
+    parser.add_argument("--scenes", type=str, nargs="*", default=None, help="只运行这些场景（类名）")
+    parser.add_argument("--modes", type=str, nargs="*", choices=benchmark_modes, default=benchmark_modes,
+                        help="运行的模式")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=regression_threshold, help="判定退化的比例")
+    parser.add_argument("--worker", type=str, nargs=3, default=None, metavar=("SCRIPT", "SCENE", "MODE"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(result_prefix + json.dumps(run_worker(*args.worker)))
+        sys.exit(0)
+
+    results = {}
+    for script_file, scene_name in benchmark_scenes:
+        if args.scenes and scene_name not in args.scenes:
+            continue
+        for mode in args.modes:
+            print(f"正在运行 {scene_name} / {mode} ...")
+            results[f"{scene_name}/{mode}"] = run_benchmark(script_file, scene_name, mode)
+
+    history = load_json(history_file, [])
+    history.append({"time": time.strftime("%Y-%m-%d %H:%M:%S"), "revision": git_revision(), "results": results})
+    save_json(history_file, history)
+
+    baseline = load_json(baseline_file, {})
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        baseline.update({k: v for k, v in results.items() if v is not None})
+        save_json(baseline_file, baseline)
+        print(f"\n已保存基线: {baseline_file}")
+        sys.exit(0)
+
+    regressions = compare_with_baseline(results, baseline, args.threshold)
+    for scene_name, mode, metric, base, value in regressions:
+        print(f"[退化] {scene_name} / {mode}: {metric} {base:.2f} -> {value:.2f} (+{value / base - 1:.0%})")
+    if regressions:
+        sys.exit(1)
+    print("\n未发现性能退化" if baseline else "\n尚无基线，可以使用 --save-baseline 保存")
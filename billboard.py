@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""ThreeDScene 中的轻量点和线段
+
+Dot3D 是一个 8×8 的球面（64 个面），Line3D 是一个圆柱加两个端面，每个面都是单独的子对象，
+每一帧都要着色、按深度排序、逐个描边。这里的点和线段只投影端点，在屏幕上直接描边：
+    BillboardDot:  一个长度为零的路径，用圆形线帽描边，在屏幕上总是一个固定半径的圆点
+    BillboardLine: 普通的直线段，线宽固定
+每个对象只有一个子对象，参数与 Dot3D、Line3D 一致，可以直接替换。
+它们不参与 ThreeDCamera 的深度排序（总是画在三维着色的对象之后），也不受光照影响。
+OpenGL 渲染器（opengl_render.py）没有线帽，BillboardDot 改为画一个同样半径的填充圆（位于 xy 平面内，倾斜视角下为椭圆）。
+"""
+
+import numpy as np
+from manim import *
+
+# manim 的 cairo 相机中线宽 1 对应的画面长度（Camera 的 cairo_line_width_multiple）
+cairo_line_width_multiple = 0.01
+
+
+def radius_to_stroke_width(radius):
+    """屏幕上半径为 radius（画面单位）的圆点或线宽为 2·radius 的线段所需的描边宽度"""
+    return 2 * radius / cairo_line_width_multiple
+
+
+class BillboardDot(VMobject):
+    """在屏幕上始终显示为圆点的三维点，可替代 Dot3D
+
+    参数:
+        point: 点的位置
+        radius: 屏幕上的半径（画面单位），不随深度和视角变化
+        color: 颜色
+        resolution: 仅为与 Dot3D 的参数一致，不使用
+    """
+
+    def __init__(self, point=ORIGIN, radius=DEFAULT_DOT_RADIUS, color=WHITE, resolution=None, **kwargs):
+        self.radius = radius
+        point = np.array(point, dtype=float)
+        if config.renderer == RendererType.OPENGL:
+            super().__init__(fill_color=color, fill_opacity=1.0, stroke_width=0, **kwargs)
+            self.points = Circle(radius=radius).points + point
+            return
+        kwargs.setdefault("fill_opacity", 0)
+        super().__init__(stroke_color=color, stroke_width=radius_to_stroke_width(radius),
+                         cap_style=CapStyleType.ROUND, **kwargs)
+        self.points = np.repeat(point.reshape(1, 3), 4, axis=0)
+
+    def consider_points_equals_2d(self, p0, p1):
+        # 不闭合路径：cairo 对未闭合的零长度路径按圆形线帽画出一个圆点，闭合后则什么都不画
+        return False
+
+    def set_radius(self, radius):
+        if config.renderer == RendererType.OPENGL:
+            self.scale(radius / self.radius)
+            self.radius = radius
+            return self
+        self.radius = radius
+        return self.set_stroke(width=radius_to_stroke_width(radius))
+
+
+class BillboardLine(Line):
+    """屏幕上线宽固定的三维线段，可替代 Line3D
+
+    参数:
+        start, end: 端点
+        thickness: 与 Line3D 相同的半径，屏幕上的线宽为 2·thickness；给出 stroke_width 时以 stroke_width 为准
+        color: 颜色
+        resolution: 仅为与 Line3D 的参数一致，不使用
+    """
+
+    def __init__(self, start=LEFT, end=RIGHT, thickness=0.02, color=None, resolution=None, **kwargs):
+        kwargs.setdefault("stroke_width", radius_to_stroke_width(thickness))
+        kwargs.setdefault("cap_style", CapStyleType.ROUND)
+        if color is not None:
+            kwargs["color"] = color
+        super().__init__(start, end, **kwargs)
+        self.thickness = thickness
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""阶段检查点：从长场景的某个阶段直接开始渲染
+
+修改 C01 的 phase5_infinity_point 时，原来必须先把第一到第四阶段完整地执行一遍，
+因为后面的阶段依赖 self.z_dot、self.complex_plane、self.axes_3d 等属性和相机的朝向。
+
+PhasedSceneMixin 的场景在 save_checkpoints 为真时（render_driver 的 --checkpoint），
+每个阶段开始前把场景状态保存到 media/checkpoints/场景名_质量/phase序号.pkl：
+场景中的对象、场景对象的属性（包括 animation_timer）、固定在画面上的对象和相机朝向，
+放在同一个 pickle 中，对象之间的引用关系保持不变。--from-phase 时直接读取对应阶段的检查点，
+之前的阶段完全不执行。
+
+场景属性中有无法序列化的对象（例如保存了 lambda 的 ParametricFunction）时，检查点仍然保存，
+但记录下这些属性，从该检查点开始渲染时直接报错，而不是在缺少对象的场景上继续渲染。
+
+检查点记录保存时的渲染指纹，源码修改后仍然可以读取（通常正是在修改后面的阶段），
+但会给出提示：如果修改的是之前的阶段，需要重新完整渲染一次并保存检查点。
+
+    python3 checkpoint.py list
+    python3 checkpoint.py clear --scene RiemannSphere
+"""
+
+import os
+import sys
+import time
+import glob
+import shutil
+import pickle
+import argparse
+
+checkpoint_dir = os.path.join("media", "checkpoints")
+
+# 不保存的场景属性：渲染器、被包装的方法、静止等待的缓冲、阶段渲染的控制参数，
+# 以及由本次运行的命令行参数决定的设置（字幕文件、字幕模式、每个字的朗读时间）
+excluded_attributes = {
+    "renderer", "play", "wait", "_pending_hold", "_hold_stats",
+    "render_phase", "phase_start_timer", "phase_end_timer",
+    "resume_phase", "save_checkpoints", "checkpoint_quality", "checkpoint_fingerprint",
+    "subtitle_file", "subtitle_mode", "time_per_char",
+}
+
+# 对象图很深时 pickle 需要更大的递归深度
+recursion_limit = 20000
+
+
+def get_checkpoint_file(scene_name, quality, index):
+    return os.path.join(checkpoint_dir, f"{scene_name}_{quality}", f"phase{index}.pkl")
+
+
+def _picklable(value):
+    try:
+        pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        return True
+    except Exception:
+        return False
+
+
+def _camera_state(scene):
+    camera = scene.renderer.camera
+    if not hasattr(camera, "get_phi"):
+        return None
+    return {
+        "phi": camera.get_phi(), "theta": camera.get_theta(), "gamma": camera.get_gamma(),
+        "zoom": camera.get_zoom(), "focal_distance": camera.get_focal_distance(),
+        "frame_center": camera.frame_center.copy(),
+    }
+
+
+def save_checkpoint(scene, index, quality):
+    """保存场景在第 index 个阶段开始时的状态"""
+    old_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(old_limit, recursion_limit))
+    try:
+        skipped = []
+        attributes = {}
+        for name, value in scene.__dict__.items():
+            if name in excluded_attributes:
+                continue
+            if _picklable(value):
+                attributes[name] = value
+            else:
+                skipped.append(name)
+        camera = scene.renderer.camera
+        state = {
+            "scene_name": type(scene).__name__,
+            "phase": scene.phases[index],
+            "index": index,
+            "fingerprint": getattr(scene, "checkpoint_fingerprint", None),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "attributes": attributes,
+            "skipped": skipped,
+            "fixed_in_frame": list(getattr(camera, "fixed_in_frame_mobjects", ())),
+            "camera": _camera_state(scene),
+        }
+        checkpoint_file = get_checkpoint_file(type(scene).__name__, quality, index)
+        os.makedirs(os.path.dirname(checkpoint_file), exist_ok=True)
+        tmp_file = checkpoint_file + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, checkpoint_file)
+    finally:
+        sys.setrecursionlimit(old_limit)
+
+    size_mb = os.path.getsize(checkpoint_file) / 1024 / 1024
+    print(f"已保存检查点 {scene.phases[index]}（{size_mb:.1f} MB）: {checkpoint_file}")
+    if skipped:
+        print(f"  以下属性无法序列化，未保存，该检查点不能用于 --from-phase: {', '.join(skipped)}")
+    if getattr(camera, "fixed_orientation_mobjects", None):
+        print("  注意：固定朝向的对象（add_fixed_orientation_mobjects）不会保存")
+
+
+def load_checkpoint(scene, index, quality):
+    """把第 index 个阶段开始时的状态恢复到新创建的场景上"""
+    checkpoint_file = get_checkpoint_file(type(scene).__name__, quality, index)
+    if not os.path.exists(checkpoint_file):
+        raise FileNotFoundError(f"没有找到检查点 {checkpoint_file}，请先加上 --checkpoint 完整渲染一次")
+    old_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(old_limit, recursion_limit))
+    try:
+        with open(checkpoint_file, 'rb') as f:
+            state = pickle.load(f)
+    finally:
+        sys.setrecursionlimit(old_limit)
+
+    if state.get("skipped"):
+        raise RuntimeError(f"检查点 {checkpoint_file} 缺少无法序列化的属性 {', '.join(state['skipped'])}，"
+                           f"从这里开始的场景状态不完整；请改为可序列化的对象后重新加上 --checkpoint 完整渲染")
+    scene.__dict__.update(state["attributes"])
+    camera = scene.renderer.camera
+    if state["fixed_in_frame"]:
+        camera.add_fixed_in_frame_mobjects(*state["fixed_in_frame"])
+    if state["camera"] is not None and hasattr(scene, "set_camera_orientation"):
+        scene.set_camera_orientation(**state["camera"])
+
+    print(f"已读取检查点 {state['phase']}（保存于 {state['time']}，animation_timer = {scene.animation_timer:.2f}）")
+    current = getattr(scene, "checkpoint_fingerprint", None)
+    if current and state["fingerprint"] and current != state["fingerprint"]:
+        print("  提示：源码或配置在保存检查点后有修改；如果修改了之前的阶段，请重新加上 --checkpoint 完整渲染")
+    return state
+
+
+def list_checkpoints():
+    return sorted(glob.glob(os.path.join(checkpoint_dir, "*", "phase*.pkl")))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="查看或删除阶段检查点")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="列出所有检查点")
+    clear_parser = sub.add_parser("clear", help="删除检查点")
+    clear_parser.add_argument("--scene", type=str, default=None, help="只删除该场景（类名）的检查点")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for path in list_checkpoints():
+            st = os.stat(path)
+            print(f"{path}  {st.st_size / 1024 / 1024:.1f} MB  {time.strftime('%Y-%m-%d %H:%M', time.localtime(st.st_mtime))}")
+    else:
+        pattern = f"{args.scene}_*" if args.scene else "*"
+        removed = 0
+        for path in glob.glob(os.path.join(checkpoint_dir, pattern)):
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+        print(f"已删除 {removed} 个场景的检查点")
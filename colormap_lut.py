@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""颜色映射查找表
+
+C02 原来对每条线段调用一次 cm.viridis(t) 和 rgb_to_color（每个测试点 5760 次）。
+ColormapLUT 预先把颜色映射表展开成 (N, 4) 的 RGBA 数组，之后任意长度的数组一次向量化查表即可得到全部颜色。
+颜色映射表可以是 matplotlib 的名称或对象（表的大小与 matplotlib 相同，查表结果与逐个调用完全一致），
+也可以是一组 manim 颜色，按等间距的色标线性插值（与 set_color_by_gradient 的色标相同）。
+
+set_submobject_colors、set_point_colors 把查表结果直接交给按子对象或按色标着色的对象，
+分别用于 SegmentRing 一类按颜色分组的对象和沿对象的渐变。
+"""
+
+import numpy as np
+from manim import color_to_rgba, rgb_to_color
+
+# 由颜色列表生成的查找表的默认大小
+default_lut_size = 256
+
+# 已生成的查找表，键为（颜色映射表的标识, 大小）
+_luts = {}
+
+
+class ColormapLUT:
+    """颜色映射查找表
+
+    参数:
+        cmap: matplotlib 颜色映射表的名称或对象，或者一组 manim 颜色
+        size: 表的大小，默认与 matplotlib 的颜色映射表相同（颜色列表为 default_lut_size）
+    """
+
+    def __init__(self, cmap="viridis", size=None):
+        if isinstance(cmap, (list, tuple)):
+            size = size or default_lut_size
+            stops = np.array([color_to_rgba(c) for c in cmap])
+            positions = np.linspace(0, 1, len(stops))
+            samples = np.linspace(0, 1, size)
+            self.table = np.stack([np.interp(samples, positions, stops[:, i]) for i in range(4)], axis=-1)
+            self.name = "gradient"
+        else:
+            if isinstance(cmap, str):
+                import matplotlib
+                cmap = matplotlib.colormaps[cmap]
+            if size is None or size == cmap.N:
+                self.table = cmap(np.arange(cmap.N))
+            else:
+                self.table = cmap(np.linspace(0, 1, size))
+            self.name = cmap.name
+        self.N = len(self.table)
+
+    def index(self, values, vmin=0.0, vmax=1.0):
+        """把 [vmin, vmax] 中的值映射到表的索引，与 matplotlib 对浮点数的取色方式相同（t * N 向下取整）"""
+        t = (np.asarray(values, dtype=float) - vmin) / (vmax - vmin)
+        return np.clip((t * self.N).astype(int), 0, self.N - 1)
+
+    def __call__(self, values, vmin=0.0, vmax=1.0):
+        """返回 RGBA 数组，形状为 values 的形状加上最后一维 4"""
+        return self.table[self.index(values, vmin, vmax)]
+
+    def colors(self, values, vmin=0.0, vmax=1.0):
+        """返回 manim 颜色列表"""
+        return [rgb_to_color(rgba[:3]) for rgba in self(np.ravel(values), vmin, vmax)]
+
+
+def get_colormap_lut(cmap="viridis", size=None):
+    """返回缓存的查找表，同一颜色映射表只展开一次"""
+    if isinstance(cmap, (list, tuple)):
+        name = tuple(str(c) for c in cmap)
+    elif isinstance(cmap, str):
+        name = cmap
+    else:
+        # matplotlib 的 Colormap 对象不能作为字典的键，按名称和颜色数区分
+        name = (cmap.name, cmap.N)
+    key = (name, size)
+    if key not in _luts:
+        _luts[key] = ColormapLUT(cmap, size)
+    return _luts[key]
+
+
+def set_submobject_colors(mobject, values, lut, vmin=0.0, vmax=1.0, stroke=True, fill=False):
+    """按 values 给 mobject 的每个子对象着色，values 的长度与子对象数相同"""
+    for submob, color in zip(mobject.submobjects, lut.colors(values, vmin, vmax)):
+        if stroke:
+            submob.set_stroke(color=color)
+        if fill:
+            submob.set_fill(color=color)
+    return mobject
+
+
+def set_point_colors(vmobject, values, lut, vmin=0.0, vmax=1.0, stroke=True, fill=False):
+    """把 values 对应的颜色作为 vmobject 的一组色标（cairo 中为沿对象的线性渐变）"""
+    colors = lut.colors(values, vmin, vmax)
+    if stroke:
+        vmobject.set_stroke(color=colors, family=False)
+    if fill:
+        vmobject.set_fill(color=colors, family=False)
+    return vmobject
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""ThreeDScene 中相机静止时的投影和深度排序缓存
+
+ThreeDCamera 每一帧都要对所有对象重新计算：按到相机的距离排序（每个对象求一次包围盒中心）、
+把点投影到屏幕上、根据光源给三维对象着色。字幕等待期间相机和对象都不动，这些结果每一帧都相同。
+
+CachedThreeDCamera 为每个对象保存上一次的点坐标、投影结果和着色结果，只有当相机的朝向
+（phi、theta、gamma、焦距、缩放、画面中心）、光源位置或对象的点发生变化时才重新计算；
+对象都没有变化时直接复用上一帧的绘制顺序。判断点是否变化只需要一次数组比较，比投影和着色便宜得多，
+静止的三维对象每一帧的开销接近二维对象（只剩 cairo 的绘制）。
+
+缓存不保存在相机的属性中：manim 计算 play() 的哈希时会序列化相机的 __dict__，
+缓存的数组和计数器会使部分电影文件的文件名依赖于之前渲染过的所有帧。
+
+DepthSortCacheMixin 让 ThreeDScene 使用该相机，并在渲染结束时打印命中率。
+设置 MANIM_DEPTH_CACHE=0 可以关闭缓存。
+"""
+
+import os
+import weakref
+import numpy as np
+from manim import ThreeDCamera
+from manim.camera.camera import Camera
+
+enabled = os.environ.get("MANIM_DEPTH_CACHE", "1") != "0"
+
+# 相机 -> 该相机的缓存，放在模块中而不是相机的属性中，不参与 play() 的哈希
+_camera_caches = weakref.WeakKeyDictionary()
+
+
+class CameraCache:
+    """一个相机的逐帧缓存"""
+
+    def __init__(self):
+        self.frame_index = 0
+        self.state = None
+        self.records = weakref.WeakKeyDictionary()  # 对象 -> 点坐标、投影、着色的缓存
+        self.draw_order = None                     # (相机状态, 对象 id 列表, 排序后的对象列表)
+        self.stats = {name: [0, 0] for name in ("sort", "projection", "shading")}  # [命中, 未命中]
+
+
+class CachedThreeDCamera(ThreeDCamera):
+    """缓存投影、着色和绘制顺序的 ThreeDCamera"""
+
+    @property
+    def cache(self):
+        cache = _camera_caches.get(self)
+        if cache is None:
+            cache = _camera_caches[self] = CameraCache()
+        return cache
+
+    def camera_state(self):
+        """影响投影和排序的相机参数"""
+        return (self.get_phi(), self.get_theta(), self.get_gamma(), self.get_focal_distance(),
+                self.get_zoom(), tuple(self.frame_center), self.exponential_projection)
+
+    def capture_mobjects(self, mobjects, **kwargs):
+        cache = self.cache
+        cache.frame_index += 1
+        cache.state = self.camera_state()
+        super().capture_mobjects(mobjects, **kwargs)
+
+    def _record(self, mobject):
+        """返回对象的缓存记录；每帧第一次访问时检查点和相机是否变化，有变化则清空缓存的结果"""
+        cache = self.cache
+        record = cache.records.get(mobject)
+        if record is None:
+            record = cache.records[mobject] = {"frame": -1}
+        if record["frame"] != cache.frame_index:
+            record["frame"] = cache.frame_index
+            points = mobject.points
+            cached = record.get("points")
+            if cached is None or cached.shape != points.shape or not np.array_equal(cached, points):
+                record.clear()
+                record.update(frame=cache.frame_index, points=points.copy(), changed=True)
+            else:
+                record["changed"] = False
+            if record.get("state") != cache.state:
+                record.pop("projected", None)
+                record["state"] = cache.state
+        return record
+
+    def get_mobjects_to_display(self, *args, **kwargs):
+        if not enabled:
+            return super().get_mobjects_to_display(*args, **kwargs)
+        mobjects = Camera.get_mobjects_to_display(self, *args, **kwargs)
+        ids = [id(m) for m in mobjects]
+        changed = [self._record(m)["changed"] for m in mobjects]
+        cache = self.cache
+        stats = cache.stats["sort"]
+        if cache.draw_order is not None and not any(changed):
+            state, cached_ids, order = cache.draw_order
+            if state == cache.state and cached_ids == ids:
+                stats[0] += 1
+                return order
+        stats[1] += 1
+
+        # 与 ThreeDCamera.get_mobjects_to_display 相同的排序
+        rot_matrix = self.get_rotation_matrix()
+
+        def z_key(mob):
+            if not (hasattr(mob, "shade_in_3d") and mob.shade_in_3d):
+                return np.inf
+            return np.dot(mob.get_z_index_reference_point(), rot_matrix.T)[2]
+
+        order = sorted(mobjects, key=z_key)
+        cache.draw_order = (cache.state, ids, order)
+        return order
+
+    def transform_points_pre_display(self, mobject, points):
+        if (not enabled or points is not mobject.points
+                or mobject in self.fixed_in_frame_mobjects or mobject in self.fixed_orientation_mobjects):
+            return super().transform_points_pre_display(mobject, points)
+        record = self._record(mobject)
+        stats = self.cache.stats["projection"]
+        if "projected" in record:
+            stats[0] += 1
+            return record["projected"]
+        stats[1] += 1
+        record["projected"] = super().transform_points_pre_display(mobject, points)
+        return record["projected"]
+
+    def modified_rgbas(self, vmobject, rgbas):
+        if not enabled or not self.should_apply_shading or not vmobject.shade_in_3d:
+            return super().modified_rgbas(vmobject, rgbas)
+        # 着色只与点、颜色和光源有关，与相机朝向无关
+        record = self._record(vmobject)
+        key = (rgbas.tobytes(), tuple(self.light_source.points[0]))
+        shading = record.setdefault("shading", {})
+        stats = self.cache.stats["shading"]
+        if key in shading:
+            stats[0] += 1
+            return shading[key]
+        stats[1] += 1
+        shading[key] = super().modified_rgbas(vmobject, rgbas)
+        return shading[key]
+
+    def print_cache_stats(self):
+        parts = []
+        for name, label in (("sort", "排序"), ("projection", "投影"), ("shading", "着色")):
+            hits, misses = self.cache.stats[name]
+            if hits + misses:
+                parts.append(f"{label} {hits / (hits + misses):.0%}（{hits}/{hits + misses}）")
+        if parts:
+            print("三维缓存命中率：" + "，".join(parts))
+
+
+class DepthSortCacheMixin:
+    """让 ThreeDScene 使用 CachedThreeDCamera，需放在 ThreeDScene 之前继承"""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("camera_class", CachedThreeDCamera)
+        super().__init__(*args, **kwargs)
+
+    def tear_down(self):
+        super().tear_down()
+        if isinstance(self.renderer.camera, CachedThreeDCamera):
+            self.renderer.camera.print_cache_stats()
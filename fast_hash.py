@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""play() 调用的快速指纹
+
+manim 在每次 play() 时把相机、动画和场景中的所有对象序列化成 JSON 再计算哈希，用作部分电影文件的文件名。
+对于 C04 中连续 200 次的短 Transform、C05 中一万个点的 VMobject、C02 中 2880 条 Line 组成的 VGroup，
+这一步的耗时可以和渲染画面相当。
+
+快速模式不生成 JSON，而是直接计算结构签名：点坐标、颜色等 numpy 数组按原始字节求摘要，
+其余属性只记录标量、函数的字节码和闭包变量，普通对象按属性递归（同一个对象只展开一次）。
+每次 play() 都重新计算所有对象的摘要，原地修改点坐标或颜色的对象不会复用过期的结果。
+
+签名中不能出现内存地址：字典的键和集合的元素一样按内容求摘要再排序，弱引用和弱引用容器（运行时的缓存）只记录类型，
+相同的场景在不同的进程中得到相同的文件名。
+
+无论是否启用快速模式，install() 都会记录每次 play() 的哈希耗时，渲染结束后由 print_hash_report() 打印。
+
+    python3 fast_hash.py check     # 在两个独立进程中计算同一组对象的快速指纹，检查结果是否相同
+"""
+
+import sys
+import time
+import types
+import hashlib
+import weakref
+import argparse
+import subprocess
+import numpy as np
+from manim import Mobject, Scene
+from manim.camera.camera import Camera
+from manim.renderer import cairo_renderer
+from manim.utils.hashing import KEYS_TO_FILTER_OUT, get_hash_from_play_call
+
+# 不参与指纹的属性：与 manim 相同的过滤项，子对象由 get_family() 单独遍历
+_skip_keys = set(KEYS_TO_FILTER_OUT) | {"submobjects"}
+
+# 弱引用和以对象身份为键的容器，内容是运行时的缓存，只记录类型
+_weak_types = (weakref.ReferenceType, weakref.ProxyType, weakref.CallableProxyType,
+               weakref.WeakKeyDictionary, weakref.WeakValueDictionary, weakref.WeakSet)
+
+# 每次 play() 的哈希耗时记录
+hash_stats = []
+
+
+def _update(hasher, value, memo):
+    """把任意值的结构签名写入 hasher"""
+    if value is None or isinstance(value, (bool, int, float, complex, str, np.generic)):
+        hasher.update(repr(value).encode("utf-8"))
+    elif isinstance(value, np.ndarray):
+        if value.dtype == object:
+            hasher.update(b"O")
+            for item in value.flat:
+                _update(hasher, item, memo)
+        else:
+            arr = np.ascontiguousarray(value)
+            hasher.update(f"{arr.dtype}{arr.shape}".encode("utf-8"))
+            hasher.update(arr.data)
+    elif isinstance(value, _weak_types):
+        hasher.update(type(value).__name__.encode("utf-8"))
+    elif isinstance(value, Mobject):
+        hasher.update(mobject_digest(value, memo))
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b"[")
+        for item in value:
+            _update(hasher, item, memo)
+        hasher.update(b"]")
+    elif isinstance(value, (set, frozenset)):
+        digests = []
+        for item in value:
+            h = hashlib.blake2b(digest_size=16)
+            _update(h, item, memo)
+            digests.append(h.digest())
+        hasher.update(b"{" + b"".join(sorted(digests)) + b"}")
+    elif isinstance(value, dict):
+        # 键可能是对象（repr 中含有内存地址），与集合一样按内容求摘要后排序
+        digests = []
+        for k, v in value.items():
+            if isinstance(k, str) and k in _skip_keys:
+                continue
+            h = hashlib.blake2b(digest_size=16)
+            _update(h, k, memo)
+            _update(h, v, memo)
+            digests.append(h.digest())
+        hasher.update(b"{" + b"".join(sorted(digests)) + b"}")
+    elif isinstance(value, (types.FunctionType, types.MethodType)):
+        hasher.update(function_digest(value, memo))
+    elif isinstance(value, (Scene, Camera, types.ModuleType, type)) or not hasattr(value, "__dict__") \
+            or id(value) in memo:
+        # 场景、相机、模块等只记录类型，避免把整个场景卷进来；已经展开过的对象不再重复展开
+        hasher.update(type(value).__name__.encode("utf-8"))
+    else:
+        memo[id(value)] = None
+        hasher.update(type(value).__name__.encode("utf-8"))
+        _update(hasher, vars(value), memo)
+
+
+def function_digest(func, memo):
+    """函数的摘要：字节码、常量和闭包变量（绑定方法只记录所属对象的类型）"""
+    hasher = hashlib.blake2b(digest_size=16)
+    if isinstance(func, types.MethodType):
+        hasher.update(type(func.__self__).__name__.encode("utf-8"))
+        func = func.__func__
+    code = func.__code__
+    hasher.update(code.co_code)
+    hasher.update(repr([c for c in code.co_consts if not isinstance(c, types.CodeType)]).encode("utf-8"))
+    hasher.update(repr(code.co_names).encode("utf-8"))
+    for cell in func.__closure__ or ():
+        try:
+            _update(hasher, cell.cell_contents, memo)
+        except ValueError:  # 尚未赋值的闭包变量
+            hasher.update(b"empty")
+    return hasher.digest()
+
+
+def mobject_digest(mobject, memo):
+    """对象及其所有子对象的摘要，同一次 play() 中每个对象只计算一次"""
+    key = id(mobject)
+    if key in memo:
+        return memo[key] or b"cycle"
+    memo[key] = None
+
+    hasher = hashlib.blake2b(digest_size=16)
+    for mob in mobject.get_family():
+        hasher.update(type(mob).__name__.encode("utf-8"))
+        hasher.update(str(len(mob.submobjects)).encode("utf-8"))
+        for k, v in vars(mob).items():
+            if k in _skip_keys:
+                continue
+            hasher.update(k.encode("utf-8"))
+            _update(hasher, v, memo)
+
+    memo[key] = hasher.digest()
+    return memo[key]
+
+
+def fast_hash_from_play_call(scene_object, camera_object, animations_list, current_mobjects_list):
+    """与 manim 的 get_hash_from_play_call 接口相同的快速版本"""
+    memo = {}
+    parts = []
+    for group in ([camera_object], sorted(animations_list, key=str), current_mobjects_list):
+        hasher = hashlib.blake2b(digest_size=8)
+        for obj in group:
+            _update(hasher, obj if isinstance(obj, Mobject) else vars(obj), memo)
+        parts.append(hasher.hexdigest())
+    # 加前缀以免与 manim 原有的文件名混淆
+    return "fast_" + "_".join(parts)
+
+
+def _timed(hash_func, mode):
+    """记录每次哈希的耗时"""
+    def wrapper(scene_object, camera_object, animations_list, current_mobjects_list):
+        start = time.perf_counter()
+        result = hash_func(scene_object, camera_object, animations_list, current_mobjects_list)
+        hash_stats.append({
+            "play": len(hash_stats),
+            "mode": mode,
+            "seconds": time.perf_counter() - start,
+            "animations": [type(anim).__name__ for anim in animations_list],
+        })
+        return result
+    return wrapper
+
+
+def install(fast=False):
+    """替换 manim 渲染器使用的哈希函数；fast 为 False 时只记录原有哈希函数的耗时"""
+    hash_func = fast_hash_from_play_call if fast else get_hash_from_play_call
+    cairo_renderer.get_hash_from_play_call = _timed(hash_func, "fast" if fast else "manim")
+    hash_stats.clear()
+
+
+def print_hash_report(top=5):
+    """打印本次渲染中 play() 的哈希耗时"""
+    if not hash_stats:
+        return
+    seconds = [s["seconds"] for s in hash_stats]
+    print(f"play() 哈希（{hash_stats[0]['mode']}）：{len(seconds)} 次，共 {sum(seconds):.3f}秒，"
+          f"平均 {sum(seconds) / len(seconds) * 1000:.2f}毫秒，最长 {max(seconds) * 1000:.2f}毫秒")
+    for s in sorted(hash_stats, key=lambda s: s["seconds"], reverse=True)[:top]:
+        print(f"  第 {s['play']} 次 play: {s['seconds'] * 1000:.2f}毫秒  {', '.join(s['animations'])}")
+
+
+def _check_fixture():
+    """构建一组与 C01 类似的对象（三维相机、带 lambda 的曲线、弱引用缓存），返回它们的快速指纹"""
+    from manim import ParametricFunction, Dot3D, Sphere, Create, VGroup
+    from depth_cache import CachedThreeDCamera
+
+    camera = CachedThreeDCamera()
+    curve = ParametricFunction(lambda t: np.array([np.cos(t), np.sin(t), t / 4]), t_range=[0, 6])
+    mobjects = [Sphere(resolution=(8, 8)), curve, Dot3D([1, 0, 1]), VGroup(curve.copy(), Dot3D())]
+    camera.set_euler_angles(phi=1.2, theta=-0.8)
+    camera.capture_mobjects(mobjects)  # 填充相机的逐帧缓存
+    camera.weak_cache = weakref.WeakKeyDictionary({mobjects[0]: 1})
+    camera.keyed_by_object = {weakref.ref(mobjects[1]): 2}
+    return fast_hash_from_play_call(None, camera, [Create(curve)], mobjects)
+
+
+def check_determinism(runs=2):
+    """在 runs 个独立进程中计算 _check_fixture 的指纹，全部相同时返回 True"""
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, __file__, "check", "--worker"], check=True,
+                                capture_output=True, text=True).stdout
+        results.append(output.strip().splitlines()[-1])
+    for i, result in enumerate(results):
+        print(f"第 {i + 1} 次: {result}")
+    return len(set(results)) == 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="play() 调用的快速指纹")
+    sub = parser.add_subparsers(dest="command", required=True)
+    check_parser = sub.add_parser("check", help="检查相同的对象在不同进程中是否得到相同的指纹")
+    check_parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(_check_fixture())
+        sys.exit(0)
+    if check_determinism():
+        print("快速指纹在不同进程中一致")
+        sys.exit(0)
+    print("快速指纹在不同进程中不一致，请检查是否有属性的签名中含有内存地址")
+    sys.exit(1)
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import os
+import re
 import av
 import json
 import shutil
@@ -13,6 +14,7 @@ from pydub import AudioSegment
 video_file      = "media/videos/template/480p15/Template.mp4"
 subtitles_file  = "media/subtitles.jsonl"
 voice_name      = "longlaotie" # 可选 "loongbella" 或 "longmiao" 等
+subtitle_mode   = "mobject"    # 字幕模式：mobject(画面内对象), sidecar(字幕轨), burn(合并时烧录)
 
 # 一般不修改的默认配置
 cache_dir       = "media/audio"
@@ -46,9 +48,10 @@ def read_subtitles(subtitle_file):
         first_line = f.readline()
         try:
             config = json.loads(first_line)
-            global video_file, voice_name
+            global video_file, voice_name, subtitle_mode
             video_file = config.get("video_file", video_file)
             voice_name = config.get("voice_name", voice_name)
+            subtitle_mode = config.get("subtitle_mode", subtitle_mode)
         except json.JSONDecodeError:
             print("警告: 字幕文件第一行不是配置信息！")
             exit(1)
@@ -158,24 +161,93 @@ def verify_time(video_file):
     
     return is_synced
 
-def merge_video_audio(video_file, verbose=True):
+def format_timestamp(seconds, sep=","):
+    """把秒数转换为字幕时间戳，SRT 使用逗号分隔毫秒，WebVTT 使用点号"""
+    ms = int(round(seconds * 1000))
+    h, ms = divmod(ms, 3600000)
+    m, ms = divmod(ms, 60000)
+    s, ms = divmod(ms, 1000)
+    return f"{h:02d}:{m:02d}:{s:02d}{sep}{ms:03d}"
+
+
+# 字幕轨中常见 LaTeX 符号的替换，其余命令只去掉反斜杠
+latex_symbols = {
+    r"\pi": "π", r"\infty": "∞", r"\cdot": "·", r"\times": "×", r"\pm": "±",
+    r"\to": "→", r"\rightarrow": "→", r"\leq": "≤", r"\geq": "≥", r"\neq": "≠",
+    r"\approx": "≈", r"\sum": "∑", r"\int": "∫", r"\,": " ", r"\quad": " ",
+}
+
+
+def subtitle_plain_text(text):
+    """把 MathTex 字幕转换为字幕轨中显示的纯文本，例如 \\text{以} f(x) = x^2 转换为 以 f(x) = x^2"""
+    text = re.sub(r"\\(?:text|mathrm|mathbf|textbf|mathit|operatorname)\{([^{}]*)\}", r"\1", text)
+    for command, symbol in latex_symbols.items():
+        text = re.sub(re.escape(command) + r"(?![A-Za-z])", symbol, text)
+    text = re.sub(r"\\([A-Za-z]+)", r"\1", text)
+    return text.replace("$", "").replace("{", "").replace("}", "").strip()
+
+
+def write_subtitle_file(subtitles, subtitle_file, total_duration):
+    """根据字幕的开始时间写出 SRT 或 WebVTT 文件（按扩展名判断）
+    每条字幕持续到下一条字幕开始，最后一条持续到视频结束。
+    """
+    is_vtt = subtitle_file.endswith('.vtt')
+    sep = "." if is_vtt else ","
+    lines = ["WEBVTT", ""] if is_vtt else []
+
+    N = len(subtitles)
+    for i in range(N):
+        sub = subtitles[i]
+        start = sub['start_time']
+        end = subtitles[i+1]['start_time'] if i < N - 1 else total_duration
+        if not is_vtt:
+            lines.append(str(i + 1))
+        lines.append(f"{format_timestamp(start, sep)} --> {format_timestamp(end, sep)}")
+        # 优先使用画面字幕文本（MathTex 字幕转换为纯文本），没有时使用语音文本
+        lines.append(subtitle_plain_text(sub.get('subtitle', sub['text'])))
+        lines.append("")
+
+    with open(subtitle_file, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
+    print(f"已生成字幕文件: {subtitle_file}")
+    return subtitle_file
+
+
+def merge_video_audio(video_file, verbose=True, subtitle_mode="mobject", output_file=None):
     """合并视频和音频
     Args:
         video_file: 视频文件路径
         verbose: 是否显示ffmpeg输出，默认为True
+        subtitle_mode: sidecar 时把字幕作为 mov_text 轨道封装，burn 时用 subtitles 滤镜烧录到画面
+        output_file: 输出文件路径，默认为视频文件名加 _WithAudio
     """
     full_audio_file = os.path.join(cache_dir, "full_audio.mp3")
+    srt_file = os.path.join(cache_dir, "subtitles.srt")
 
     # 使用ffmpeg合并视频和音频
-    output_file = video_file.replace('.mp4', '_WithAudio.mp4')
+    output_file = output_file or video_file.replace('.mp4', '_WithAudio.mp4')
     cmd = [
         'ffmpeg',
         '-i', video_file,
         '-i', full_audio_file,
-        '-c:v', 'copy',
+    ]
+    if subtitle_mode == "sidecar":
+        # 字幕作为独立轨道，视频流直接复制
+        cmd += ['-i', srt_file, '-c:v', 'copy', '-c:s', 'mov_text']
+    elif subtitle_mode == "burn":
+        # 烧录字幕需要重新编码视频
+        cmd += ['-vf', f"subtitles={srt_file}:force_style='FontName=Noto Sans CJK SC'",
+                '-c:v', 'libx264', '-pix_fmt', 'yuv420p']
+    else:
+        cmd += ['-c:v', 'copy']
+    cmd += [
         '-c:a', 'aac',
         '-map', '0:v:0',
         '-map', '1:a:0',
+    ]
+    if subtitle_mode == "sidecar":
+        cmd += ['-map', '2:s:0', '-metadata:s:s:0', 'language=chi']
+    cmd += [
         '-shortest',
         output_file,
         '-y'  # 覆盖已存在的文件
@@ -197,16 +269,10 @@ def clean_cache(cache_dir):
     print("已清理临时文件")
 
 
-def generate_speech(subtitles_file, verbose=False):
+def dub_video(video_file, voice_name, subtitles, subtitle_mode="mobject", verbose=False):
+    """根据字幕时间线为视频配音，可由渲染程序直接传入内存中的字幕列表"""
     os.makedirs(cache_dir, exist_ok=True)
 
-    # 读取字幕文件，其中包含字幕的编号、开始时间、文本内容
-    video_file, voice_name, subtitles = read_subtitles(subtitles_file)
-
-    print(f"开始生成语音，使用音色：{voice_name}")
-    print(f"视频文件：{video_file}")
-    print(f"字幕文件：{subtitles_file}")
-
     # 对所有字幕生成语音
     audio_files, duration_list = run_tts_4all(subtitles, voice_name)
 
@@ -218,9 +284,25 @@ def generate_speech(subtitles_file, verbose=False):
     
     # 验证视频和音频的同步性
     verify_time(video_file)
-    
+
+    # 字幕轨模式下生成 SRT（用于封装或烧录）和 WebVTT（用于网页播放）
+    if subtitle_mode in ("sidecar", "burn"):
+        write_subtitle_file(subtitles, os.path.join(cache_dir, "subtitles.srt"), total_time)
+        write_subtitle_file(subtitles, video_file.replace('.mp4', '_WithAudio.vtt'), total_time)
+
     # 合并视频和音频
-    merge_video_audio(video_file, verbose)
+    merge_video_audio(video_file, verbose, subtitle_mode)
+
+
+def generate_speech(subtitles_file, verbose=False):
+    # 读取字幕文件，其中包含字幕的编号、开始时间、文本内容
+    video_file, voice_name, subtitles = read_subtitles(subtitles_file)
+
+    print(f"开始生成语音，使用音色：{voice_name}，字幕模式：{subtitle_mode}")
+    print(f"视频文件：{video_file}")
+    print(f"字幕文件：{subtitles_file}")
+
+    dub_video(video_file, voice_name, subtitles, subtitle_mode, verbose)
 
 if __name__ == "__main__":
     import argparse
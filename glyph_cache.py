@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Pango 文字的字形缓存
+
+manim 的 Text 每次都会把整句话交给 Pango 生成 svg 再解析，字幕里反复出现的汉字会被一次次重新生成轮廓。
+这里按（字体、字号、字重、斜体）分别缓存每个字符的轮廓和步进宽度，GlyphText 直接用缓存的轮廓拼出文字，
+因此创建字幕的开销只与不同字符的数量有关，而与总字数无关。缓存可以保存到磁盘，供下次渲染直接加载。
+轮廓点的格式取决于渲染器（cairo 为三次贝塞尔曲线，OpenGL 为二次），两种渲染器的缓存分开保存。
+"""
+
+import os
+import atexit
+import hashlib
+import numpy as np
+from manim import *
+
+# 可以修改的默认配置，也可以通过环境变量覆盖
+glyph_cache_dir = os.environ.get("MANIM_GLYPH_CACHE_DIR", os.path.join("media", "glyph_cache"))
+
+# 用于测量步进宽度的参照字符，其墨迹底部与基线对齐
+reference_char = "I"
+
+
+class GlyphCache:
+    """单个（字体、字号、字重、斜体）组合下的字形缓存"""
+
+    def __init__(self, font="", font_size=DEFAULT_FONT_SIZE, weight=NORMAL, slant=NORMAL, persist=True):
+        self.font = font
+        self.font_size = float(font_size)
+        self.weight = weight
+        self.slant = slant
+        self.persist = persist
+        self.glyphs = {}        # 字符 -> (步进宽度, 相对于笔位置和基线的轮廓点)
+        self.reference_advance = None
+        self.dirty = False
+        self.stats = {"hits": 0, "misses": 0}
+
+        self.renderer = config.renderer.value
+        key = f"{font}|{self.font_size}|{weight}|{slant}|{self.renderer}"
+        self.cache_file = os.path.join(glyph_cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest()[:16] + ".npz")
+        if persist:
+            self.load()
+
+        # 参照字符的步进宽度：两个参照字符左边缘之间的距离
+        if self.reference_advance is None:
+            pair = self._render(reference_char * 2)
+            self.reference_advance = pair[1].get_left()[0] - pair[0].get_left()[0]
+            self.dirty = True
+
+    def _render(self, text):
+        return Text(text, font=self.font, font_size=self.font_size, weight=self.weight, slant=self.slant)
+
+    def _build_glyph(self, char):
+        """把字符夹在两个参照字符之间渲染，得到它的轮廓和步进宽度"""
+        framed = self._render(reference_char + char + reference_char)
+        left, right = framed[0], framed[-1]
+        pen = np.array([left.get_left()[0] + self.reference_advance, left.get_bottom()[1], 0])
+        advance = right.get_left()[0] - pen[0]
+
+        middle = framed.submobjects[1:-1]
+        if len(middle) == 0:
+            return advance, None  # 空白字符没有轮廓
+        points = np.concatenate([mob.points for mob in middle]) - pen
+        return advance, points
+
+    def get(self, char):
+        """返回 (步进宽度, 轮廓点)，未缓存时先生成"""
+        if char in self.glyphs:
+            self.stats["hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            self.glyphs[char] = self._build_glyph(char)
+            self.dirty = True
+        return self.glyphs[char]
+
+    def load(self):
+        if not os.path.exists(self.cache_file):
+            return
+        data = np.load(self.cache_file, allow_pickle=False)
+        self.reference_advance = float(data["reference_advance"])
+        for char, advance in zip(data["chars"], data["advances"]):
+            name = f"g_{ord(char):x}"
+            self.glyphs[str(char)] = (float(advance), data[name] if name in data.files else None)
+
+    def save(self):
+        """以原子方式把缓存写入磁盘"""
+        if not (self.persist and self.dirty):
+            return
+        os.makedirs(glyph_cache_dir, exist_ok=True)
+        chars = list(self.glyphs.keys())
+        arrays = {
+            "chars": np.array(chars),
+            "advances": np.array([self.glyphs[c][0] for c in chars]),
+            "reference_advance": np.array(self.reference_advance),
+        }
+        for c in chars:
+            if self.glyphs[c][1] is not None:
+                arrays[f"g_{ord(c):x}"] = self.glyphs[c][1]
+        tmp_file = f"{self.cache_file}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_file, **arrays)
+        os.replace(tmp_file, self.cache_file)
+        self.dirty = False
+
+
+# 全局缓存表，键为（字体、字号、字重、斜体、渲染器）
+_glyph_caches = {}
+
+
+def get_glyph_cache(font="", font_size=DEFAULT_FONT_SIZE, weight=NORMAL, slant=NORMAL, persist=True):
+    key = (font, float(font_size), weight, slant, config.renderer.value)
+    if key not in _glyph_caches:
+        _glyph_caches[key] = GlyphCache(font, font_size, weight, slant, persist)
+    return _glyph_caches[key]
+
+
+def save_glyph_caches():
+    for cache in _glyph_caches.values():
+        cache.save()
+
+
+atexit.register(save_glyph_caches)
+
+
+class GlyphText(VGroup):
+    """用缓存字形拼成的单行文字，可替代字幕和标签中的 Text
+
+    参数:
+        text: 文字内容（不支持换行）
+        font_size, font, weight, slant: 与 Text 相同
+        color: 文字颜色
+        persist: 是否把字形缓存保存到磁盘
+    """
+
+    def __init__(self, text, font_size=DEFAULT_FONT_SIZE, font="", weight=NORMAL, slant=NORMAL,
+                 color=WHITE, persist=True, **kwargs):
+        super().__init__(**kwargs)
+        self.text = text
+        cache = get_glyph_cache(font, font_size, weight, slant, persist)
+
+        pen = np.zeros(3)
+        for char in text:
+            advance, points = cache.get(char)
+            if points is not None:
+                glyph = VMobject(fill_color=color, fill_opacity=1.0, stroke_width=0)
+                glyph.points = points + pen
+                self.add(glyph)
+            pen[0] += advance
+
+        if len(self.submobjects) > 0:
+            self.center()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""按输出质量选择几何细节（采样数）
+
+各场景的采样密度原来都是写死的，-ql 的 480p 草稿和 4K 成片要计算同样多的几何。
+这里集中规定每种质量（l/m/h/k）下的采样数，场景中用 lod("名称") 查询当前质量对应的值。
+h 和 k 与原来写死的数值相同，成片效果不变；l 和 m 在低分辨率下看不出差别的前提下减少采样。
+细节等级只改变采样密度，不改变动画时长（例如 C04 的展开步数减少时每一步相应变长），草稿与成片的时间线相同。
+
+当前质量取自 manim 的 config（render_scene 中已按 -q 设置）。设置 MANIM_LOD（或 render_driver 的 --lod）
+可以单独指定细节等级，例如用 -ql --lod h 快速检查成片的几何。
+
+    python3 lod.py        # 打印各质量下的采样数和几何规模
+"""
+
+import os
+import math
+import argparse
+
+lod_qualities = ["l", "m", "h", "k"]
+
+# 名称 -> {质量: 值}
+lod_table = {
+    # C01 球面网格的经线数、纬线等分数，以及每条纬线的折线段数（经线为一半）
+    # 原来的 ParametricFunction 按默认步长 0.01 采样，纬线（2π）约 628 段、经线（π）约 314 段
+    "c01_longitude_count":  {"l": 48,   "m": 72,   "h": 120,   "k": 120},
+    "c01_latitude_count":   {"l": 24,   "m": 36,   "h": 60,    "k": 60},
+    "c01_graticule_samples": {"l": 72,  "m": 120,  "h": 628,   "k": 628},
+    # C01 抬升到球面上、做莫比乌斯变换的直线和圆的采样数
+    "c01_curve_samples":    {"l": 80,   "m": 160,  "h": 240,   "k": 240},
+    # C02 导数圆环的线段数
+    "c02_num_segments":     {"l": 360,  "m": 720,  "h": 2880,  "k": 2880},
+    # C04 螺线展开的步数
+    "c04_step_count":       {"l": 50,   "m": 100,  "h": 200,   "k": 200},
+    # C05 参数曲线的采样点数
+    "c05_k_values":         {"l": 2000, "m": 5000, "h": 10000, "k": 10000},
+    # ParametricFunction 和 axes.plot 的步长倍数
+    "parametric_step_scale": {"l": 4,   "m": 2,    "h": 1,     "k": 1},
+}
+
+# 场景 -> 几何规模（贝塞尔控制点数）的估算，参数为查询函数 v(名称)
+geometry_size = {
+    "C01 球面网格": lambda v: 4 * (v("c01_longitude_count") * v("c01_graticule_samples") // 2
+                                + (v("c01_latitude_count") - 2) * v("c01_graticule_samples")),
+    "C01 直线族和圆族": lambda v: 4 * 36 * v("c01_curve_samples"),
+    "C02 导数圆环": lambda v: 2 * 4 * v("c02_num_segments"),
+    "C03 傅里叶部分和": lambda v: 7 * 4 * int(2 * math.pi / (0.1 * v("parametric_step_scale"))),
+    "C04 螺线展开": lambda v: v("c04_step_count") * 4 * int(6 * math.pi / (0.01 * v("parametric_step_scale"))),
+    "C05 参数曲线": lambda v: 4 * (v("c05_k_values") - 1),
+}
+
+
+def current_quality():
+    """当前的细节等级：MANIM_LOD 优先，否则按 config 的分辨率对应到 l/m/h/k"""
+    level = os.environ.get("MANIM_LOD")
+    if level in lod_qualities:
+        return level
+    from manim import config
+    from manim.constants import QUALITIES
+    for quality in QUALITIES.values():
+        if quality["flag"] in lod_qualities and quality["pixel_height"] == config.pixel_height:
+            return quality["flag"]
+    return "h"
+
+
+def lod(name, quality=None):
+    """查询当前质量（或指定质量）下的采样数"""
+    return lod_table[name][quality or current_quality()]
+
+
+def parametric_step(base_step, quality=None):
+    """按细节等级放大 ParametricFunction 或 axes.plot 的步长，base_step 为成片使用的步长"""
+    return base_step * lod("parametric_step_scale", quality)
+
+
+def print_report():
+    print(f"{'名称':<26}" + "".join(f"{q:>10}" for q in lod_qualities))
+    for name, values in lod_table.items():
+        print(f"{name:<26}" + "".join(f"{values[q]:>10}" for q in lod_qualities))
+
+    print("\n几何规模（贝塞尔控制点数）：")
+    print(f"{'场景':<24}" + "".join(f"{q:>10}" for q in lod_qualities))
+    totals = dict.fromkeys(lod_qualities, 0)
+    for name, size in geometry_size.items():
+        sizes = {q: size(lambda key, q=q: lod_table[key][q]) for q in lod_qualities}
+        for q in lod_qualities:
+            totals[q] += sizes[q]
+        print(f"{name:<24}" + "".join(f"{sizes[q]:>10}" for q in lod_qualities))
+    print(f"{'合计':<24}" + "".join(f"{totals[q]:>10}" for q in lod_qualities))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="打印各质量下的采样数和几何规模")
+    parser.parse_args()
+    print_report()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""场景中数值计算部分的微基准
+
+分别计时各场景中的标量热点循环，规模与场景中实际使用的一致：
+    C01 复平面上的点到黎曼球面的投影（120×60 个网格采样点），以及 120 条经线、58 条纬线的球面网格，
+        抬升 14 条直线、对整张球面网格做莫比乌斯变换时 15 帧（低质量下 1 秒）的点更新，
+        第四阶段 16 次更新中创建的点和连线（Dot3D/Line3D 与 BillboardDot/BillboardLine）
+    C02 2880 个方向上的数值微分，每个线段的 viridis 着色（逐个调用与查找表），以及一个导数圆环的构建（逐条 Line 与 SegmentRing）
+    C03 傅里叶系数，以及 S_n(x) 在 ParametricFunction 默认步长下的采样
+    C04 螺线展开的 200 个步骤，每步按 ParametricFunction 默认步长采样
+    C05 一万个 k 值上的 param_a/param_b
+结果追加到 media/benchmark/kernels_history.json，并与基线比较，用于证明向量化改写的效果。
+同一个计算的不同实现以 “名称/实现” 命名，例如 c01_projection/scalar。
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from benchmark import load_json, save_json, git_revision, regression_threshold, benchmark_dir
+
+kernels_history_file = os.path.join(benchmark_dir, "kernels_history.json")
+kernels_baseline_file = os.path.join(benchmark_dir, "kernels_baseline.json")
+
+# 名称 -> 准备函数，准备函数加载脚本并返回一个无参数的可调用对象
+kernels = {}
+
+
+def kernel(name):
+    """注册一个微基准"""
+    def decorator(setup):
+        kernels[name] = setup
+        return setup
+    return decorator
+
+
+# 已加载的脚本，同一脚本只导入一次
+_modules = {}
+
+
+def _script(script_file):
+    from batch_render import load_script
+    if script_file not in _modules:
+        _modules[script_file] = load_script(script_file)
+    return _modules[script_file]
+
+
+def _reference_viridis_color(t):
+    """C02 原来对每条线段调用一次 matplotlib 的 viridis，保留在这里作为对比基准"""
+    import matplotlib.cm as cm
+    from manim import rgb_to_color
+    return rgb_to_color(cm.viridis(t)[:3])
+
+
+def _projection_grid():
+    x, y = np.meshgrid(np.linspace(-6, 6, 120), np.linspace(-4, 4, 60))
+    return np.stack([x.ravel(), y.ravel(), np.zeros(x.size)], axis=1)
+
+
+def _reference_projection(z_point, sphere_radius):
+    """C01 原来的逐点投影（解射线与球面的二次方程），保留在这里作为对比基准"""
+    north = np.array([0, 0, 2 * sphere_radius])
+    if z_point[0] ** 2 + z_point[1] ** 2 > 1000:
+        return np.array([0, 0, 2 * sphere_radius - 0.01])
+    direction = np.array([z_point[0], z_point[1], 0]) - north
+    unit_direction = direction / np.sqrt(np.sum(direction ** 2))
+    b = 2 * np.sum(unit_direction * (north - np.array([0, 0, sphere_radius])))
+    c = np.sum((north - np.array([0, 0, sphere_radius])) ** 2) - sphere_radius ** 2
+    discriminant = b * b - 4 * c
+    t1 = (-b + np.sqrt(discriminant)) / 2
+    t2 = (-b - np.sqrt(discriminant)) / 2
+    t = t1 if t1 > 0 and (t2 <= 0 or t1 < t2) else t2
+    return north + t * unit_direction
+
+
+@kernel("c01_projection/scalar")
+def _c01_projection_scalar():
+    points = _projection_grid()
+    return lambda: [_reference_projection(p, 1.0) for p in points]
+
+
+@kernel("c01_projection/vectorized")
+def _c01_projection_vectorized():
+    from stereographic import stereographic_projection
+    points = _projection_grid()
+    return lambda: stereographic_projection(points, 1.0)
+
+
+@kernel("c01_graticule/parametric")
+def _c01_graticule_parametric():
+    from manim import ParametricFunction, VGroup, PI
+
+    def build():
+        lines = VGroup()
+        for phi in np.linspace(0, 2 * PI, 120, endpoint=False):
+            lines.add(ParametricFunction(lambda t: np.array([np.sin(t) * np.cos(phi), np.sin(t) * np.sin(phi), np.cos(t) + 1]),
+                                         t_range=[0, PI]))
+        for theta in np.linspace(0, PI, 60)[1:-1]:
+            lines.add(ParametricFunction(lambda t: np.array([np.sin(theta) * np.cos(t), np.sin(theta) * np.sin(t), np.cos(theta) + 1]),
+                                         t_range=[0, 2 * PI]))
+        return lines
+    return build
+
+
+@kernel("c01_graticule/vectorized")
+def _c01_graticule_vectorized():
+    from sphere_mesh import SphereGraticule
+    return lambda: SphereGraticule(radius=1.0, longitude_count=120, latitude_count=60)
+
+
+@kernel("c01_lift_frame/vectorized")
+def _c01_lift_frame():
+    from sphere_mesh import ProjectedCurves, plane_line
+    curves = ProjectedCurves([plane_line(k * 1j, 0) for k in range(-3, 4)] + [plane_line(k, np.pi / 2) for k in range(-3, 4)])
+    return lambda: [curves.set_lift(alpha) for alpha in np.linspace(0, 1, 15)]
+
+
+@kernel("c01_mobius_frame/vectorized")
+def _c01_mobius_frame():
+    from sphere_mesh import sphere_graticule_lines
+    from mobius import scaling, mobius_power, apply_mobius
+    from stereographic import stereographic_projection, inverse_stereographic_projection
+    longitudes, latitudes = sphere_graticule_lines(1.0, 120, 60)
+    w = inverse_stereographic_projection(np.concatenate([longitudes.reshape(-1, 3), latitudes.reshape(-1, 3)]))
+    matrix = scaling(2)
+    return lambda: [stereographic_projection(apply_mobius(mobius_power(matrix, t), w)) for t in np.linspace(0, 1, 15)]
+
+
+@kernel("c01_ray/surface")
+def _c01_ray_surface():
+    from manim import Dot3D, Line3D, RED, YELLOW
+    return lambda: [(Dot3D([1, 0, 0], color=RED), Dot3D([0.8, 0, 0.4], color=RED), Line3D([0, 0, 2], [1, 0, 0], color=YELLOW))
+                    for _ in range(16)]
+
+
+@kernel("c01_ray/billboard")
+def _c01_ray_billboard():
+    from manim import RED, YELLOW
+    from billboard import BillboardDot, BillboardLine
+    return lambda: [(BillboardDot([1, 0, 0], color=RED), BillboardDot([0.8, 0, 0.4], color=RED), BillboardLine([0, 0, 2], [1, 0, 0], color=YELLOW))
+                    for _ in range(16)]
+
+
+@kernel("c02_derivative/scalar")
+def _c02_derivative():
+    module = _script("C02-complex_function_visualization.py")
+    return lambda: module.numerical_derivative(0.5 + 0.5j, module.complex_function2)
+
+
+@kernel("c02_ring_colors/scalar")
+def _c02_ring_colors_scalar():
+    module = _script("C02-complex_function_visualization.py")
+    dz_angles, _ = module.numerical_derivative(0.5 + 0.5j, module.complex_function2)
+    return lambda: [_reference_viridis_color(angle / (2 * np.pi)) for angle in dz_angles]
+
+
+@kernel("c02_ring_colors/lut")
+def _c02_ring_colors_lut():
+    from colormap_lut import get_colormap_lut
+    module = _script("C02-complex_function_visualization.py")
+    dz_angles, _ = module.numerical_derivative(0.5 + 0.5j, module.complex_function2)
+    viridis_lut = get_colormap_lut("viridis")
+    return lambda: viridis_lut(dz_angles / (2 * np.pi))
+
+
+@kernel("c02_ring/lines")
+def _c02_ring_lines():
+    from manim import Line, VGroup
+    module = _script("C02-complex_function_visualization.py")
+    dz_angles, _ = module.numerical_derivative(0.5 + 0.5j, module.complex_function2)
+    ends = 0.5 * np.stack([np.cos(dz_angles), np.sin(dz_angles), np.zeros_like(dz_angles)], axis=-1)
+    return lambda: VGroup(*[Line(0.75 * end, end, stroke_width=3, color=_reference_viridis_color(angle / (2 * np.pi)))
+                            for angle, end in zip(dz_angles, ends)])
+
+
+@kernel("c02_ring/buckets")
+def _c02_ring_buckets():
+    from segment_ring import SegmentRing
+    module = _script("C02-complex_function_visualization.py")
+    dz_angles, _ = module.numerical_derivative(0.5 + 0.5j, module.complex_function2)
+    return lambda: SegmentRing([0, 0, 0], 0.5 * np.exp(1j * dz_angles), dz_angles / (2 * np.pi), stroke_width=3)
+
+
+@kernel("c03_fourier_coefficients/scalar")
+def _c03_coefficients():
+    module = _script("C03-power_series_fourier.py")
+    scene_class = module.PowerFunctionFourierSeries
+    return lambda: [scene_class.calculate_fourier_coefficients(None, 20, power) for power in range(1, 6)]
+
+
+@kernel("c03_fourier_x2/scalar")
+def _c03_fourier_x2():
+    module = _script("C03-power_series_fourier.py")
+    xs = np.arange(-np.pi, np.pi, 0.01)
+    return lambda: [[module.fourier_x2(x, n) for x in xs] for n in [1, 2, 3, 4, 8, 12, 20]]
+
+
+@kernel("c04_spiral/scalar")
+def _c04_spiral():
+    module = _script("C04-TopologyTransformation.py")
+    ts = np.arange(0, 6 * np.pi, 0.01)
+    return lambda: [[module.spiral_func(t, k) for t in ts] for k in np.linspace(1.0, 0.0, 200)]
+
+
+@kernel("c05_bird/scalar")
+def _c05_bird():
+    module = _script("C05-bird.py")
+    k_values = np.linspace(-10000, 10000, 10000)
+    return lambda: [(module.param_a(k), module.param_b(k)) for k in k_values]
+
+
+def time_kernel(func, repeat=5):
+    """返回多次运行中最短的耗时（秒）"""
+    func()  # 预热
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="数值计算微基准")
+    parser.add_argument("names", type=str, nargs="*", help="只运行名称以这些前缀开头的基准")
+    parser.add_argument("--repeat", type=int, default=5, help="每个基准的重复次数，取最短耗时")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果保存为基线")
+    parser.add_argument("--threshold", type=float, default=regression_threshold, help="判定退化的比例")
+    args = parser.parse_args()
+
+    baseline = load_json(kernels_baseline_file, {})
+    results = {}
+    print(f"{'基准':<36}{'耗时':>12}{'基线':>12}{'变化':>10}")
+    for name, setup in kernels.items():
+        if args.names and not any(name.startswith(prefix) for prefix in args.names):
+            continue
+        results[name] = time_kernel(setup(), args.repeat)
+        base = baseline.get(name)
+        change = f"{results[name] / base:.2f}x" if base else "-"
+        base_str = f"{base * 1000:.2f}ms" if base else "-"
+        print(f"{name:<36}{results[name] * 1000:10.2f}ms{base_str:>12}{change:>10}")
+
+    history = load_json(kernels_history_file, [])
+    history.append({"time": time.strftime("%Y-%m-%d %H:%M:%S"), "revision": git_revision(), "results": results})
+    save_json(kernels_history_file, history)
+
+    if args.save_baseline:
+        baseline.update(results)
+        save_json(kernels_baseline_file, baseline)
+        print(f"\n已保存基线: {kernels_baseline_file}")
+        sys.exit(0)
+
+    regressions = [name for name, value in results.items()
+                   if name in baseline and value > baseline[name] * (1 + args.threshold)]
+    for name in regressions:
+        print(f"[退化] {name}: {baseline[name] * 1000:.2f}ms -> {results[name] * 1000:.2f}ms")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""黎曼球面上的莫比乌斯变换
+
+莫比乌斯变换 f(w) = (aw + b) / (cw + d) 用行列式为 1 的 2×2 复矩阵 [[a, b], [c, d]] 表示。
+动画中的中间状态取矩阵的 t 次幂 M^t = exp(t·log M)，因此从恒等变换出发连续地变到 M：
+旋转 w → e^{iθ}w 是球面绕竖直轴转动，平移是球面沿着经过北极点的圆流动，反演 w → 1/w 是球面翻转半周。
+
+MobiusTransform 在动画开始时把对象族中所有锚点收集到一个复数数组中（球面上的点先反投影到复平面），
+每一帧对整个数组做一次向量化的变换（球面上的点再投影回球面），原地写回各对象的点数组，
+控制点均匀分布在相邻锚点之间（见 sphere_mesh.line_bezier_points），不重新创建对象。适用于由直线段组成的网格（SphereGraticule、ProjectedCurves 等）。
+"""
+
+import numpy as np
+from manim import Animation
+from stereographic import to_complex, stereographic_projection, inverse_stereographic_projection
+from sphere_mesh import line_bezier_points
+
+
+def mobius_matrix(a, b, c, d):
+    """归一化为行列式 1 的变换矩阵"""
+    m = np.array([[a, b], [c, d]], dtype=complex)
+    det = np.linalg.det(m)
+    if abs(det) < 1e-12:
+        raise ValueError("莫比乌斯变换的矩阵必须可逆（ad - bc ≠ 0）")
+    return m / np.sqrt(det)
+
+
+def rotation(theta):
+    """w → e^{iθ}w"""
+    return mobius_matrix(np.exp(1j * theta), 0, 0, 1)
+
+
+def translation(b):
+    """w → w + b"""
+    return mobius_matrix(1, b, 0, 1)
+
+
+def scaling(k):
+    """w → k·w，k 可以是复数"""
+    return mobius_matrix(k, 0, 0, 1)
+
+
+def inversion():
+    """w → 1/w"""
+    return mobius_matrix(0, 1, 1, 0)
+
+
+def mobius_log(m):
+    """矩阵对数（取主值），结果的迹为 0"""
+    trace, det = m[0, 0] + m[1, 1], np.linalg.det(m)
+    root = np.sqrt(trace * trace / 4 - det + 0j)
+    lam, mu = trace / 2 + root, trace / 2 - root
+    eye = np.eye(2, dtype=complex)
+    if abs(lam - mu) > 1e-9:
+        # 特征值不同：log M = (log λ - log μ)/(λ - μ)·M + (λ log μ - μ log λ)/(λ - μ)·I
+        log_m = (np.log(lam) - np.log(mu)) / (lam - mu) * m + (lam * np.log(mu) - mu * np.log(lam)) / (lam - mu) * eye
+    else:
+        # 抛物型（平移一类）：M = λ(I + N)，N 幂零，log M = log λ·I + N
+        log_m = np.log(lam) * eye + (m - lam * eye) / lam
+    return log_m - np.trace(log_m) / 2 * eye
+
+
+def mobius_exp(log_m, t=1.0):
+    """exp(t·L)，L 的迹为 0，此时 L² = δ²I"""
+    delta = np.sqrt(-np.linalg.det(log_m) + 0j)
+    if abs(delta * t) < 1e-12:
+        return np.eye(2, dtype=complex) + t * log_m
+    return np.cosh(delta * t) * np.eye(2) + np.sinh(delta * t) / delta * log_m
+
+
+def mobius_power(m, t):
+    """M^t，t 从 0 到 1 时从恒等变换连续变到 M"""
+    return mobius_exp(mobius_log(m), t)
+
+
+def apply_mobius(m, w):
+    """对复数数组做变换，正确处理无穷远点（np.inf）"""
+    (a, b), (c, d) = m
+    w = np.asarray(w, dtype=complex)
+    infinite = np.isinf(w)
+    finite_w = np.where(infinite, 0, w)
+    num, den = a * finite_w + b, c * finite_w + d
+    at_pole = np.abs(den) < 1e-12
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        result = num / np.where(at_pole, 1, den)
+    result = np.where(at_pole, complex(np.inf, 0), result)
+    # f(∞) = a/c，c = 0 时仍为无穷远点
+    at_infinity = complex(np.inf, 0) if abs(c) < 1e-12 else a / c
+    return np.where(infinite, at_infinity, result)
+
+
+class MobiusTransform(Animation):
+    """对球面或复平面上的网格做莫比乌斯变换
+
+    参数:
+        mobject: 由直线段组成的 VMobject 或 VGroup，对其中所有带点的子对象一起变换
+        matrix: 变换矩阵，可由 mobius_matrix、rotation、translation、scaling、inversion 生成
+        surface: "sphere" 表示点在黎曼球面上，"plane" 表示点在复平面上（z 坐标置 0）
+        radius: 球面半径
+        plane_limit: 复平面上的点离原点的最大距离，超过的点（包括无穷远点）截取到该距离
+    """
+
+    def __init__(self, mobject, matrix, surface="sphere", radius=1.0, plane_limit=50.0, **kwargs):
+        if surface not in ("sphere", "plane"):
+            raise ValueError(f"未知的 surface: {surface}")
+        self.matrix = np.asarray(matrix, dtype=complex)
+        self.log_matrix = mobius_log(self.matrix)
+        self.surface = surface
+        self.radius = radius
+        self.plane_limit = plane_limit
+        super().__init__(mobject, **kwargs)
+
+    def begin(self):
+        # 所有子对象的锚点（每段曲线的起点和终点）合并为一个复数数组
+        self.members = [m for m in self.mobject.get_family()
+                        if len(m.points) > 0 and len(m.points) % m.n_points_per_curve == 0]
+        anchors = [m.points.reshape(-1, m.n_points_per_curve, 3)[:, [0, -1]].reshape(-1, 3) for m in self.members]
+        sizes = [len(a) for a in anchors]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)])
+        anchors = np.concatenate(anchors) if anchors else np.zeros((0, 3))
+        if self.surface == "sphere":
+            self.start_w = inverse_stereographic_projection(anchors, self.radius)
+        else:
+            self.start_w = to_complex(anchors)
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        m = mobius_exp(self.log_matrix, self.rate_func(alpha))
+        w = apply_mobius(m, self.start_w)
+        if self.surface == "sphere":
+            anchors = stereographic_projection(w, self.radius)
+        else:
+            # 截取到 plane_limit 以内，无穷远点沿原来的方向截取
+            magnitude = np.abs(w)
+            w = np.where(np.isfinite(magnitude), w, self.plane_limit * np.exp(1j * np.angle(self.start_w)))
+            scale = np.minimum(1.0, self.plane_limit / np.maximum(np.abs(w), 1e-12))
+            w = w * scale
+            anchors = np.stack([w.real, w.imag, np.zeros_like(w.real)], axis=-1)
+
+        for member, start, end in zip(self.members, self.offsets[:-1], self.offsets[1:]):
+            ends = anchors[start:end].reshape(-1, 2, 3)
+            member.points[:] = line_bezier_points(ends[:, 0], ends[:, 1], member.n_points_per_curve).reshape(-1, 3)
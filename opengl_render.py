@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""无窗口的软件 OpenGL 渲染模式
+
+所有场景默认使用 cairo 渲染，ThreeDScene 中的曲面和大量三维曲线在 cairo 下要逐个投影、着色、排序和描边。
+设置 MANIM_RENDERER=opengl（或 render_driver 的 --renderer opengl）后，同一个场景改用 manim 的 OpenGL 渲染器，
+在没有显示器、没有 GPU 的机器上通过 EGL（surfaceless 平台）和 Mesa 的 llvmpipe 软件光栅化运行。
+moderngl 没有 OSMesa 后端，Docker 镜像中已经安装的 Mesa 同时提供了 EGL 和 llvmpipe；
+有 X 服务器时也可以设置 MANIM_GL_BACKEND=x11。
+
+install() 对 manim 做以下兼容处理：
+    1. OpenGLRenderer 在场景创建时直接建立指定后端的离屏上下文，不再先尝试 X11
+    2. add_fixed_in_frame_mobjects 对整个对象族调用 fix_in_frame()：OpenGL 渲染器按子对象读取该属性，
+       只固定 VGroup 本身时 GlyphText 字幕和复数读数中的字形仍会随相机转动
+    3. 固定在画面上的对象最后绘制，与 cairo 的 ThreeDCamera 一样总是位于三维对象之上
+
+    python3 opengl_render.py info                  # 检查离屏上下文和渲染器（应为 llvmpipe）
+    python3 opengl_render.py compare               # 在 C01 上比较 cairo 和 OpenGL 的渲染耗时
+"""
+
+import os
+import sys
+import time
+import argparse
+from manim import config, ThreeDScene
+from manim.constants import RendererType
+from manim.renderer.opengl_renderer import OpenGLRenderer
+
+# 离屏上下文的后端：egl（无需 X 服务器）或 x11
+gl_backend = os.environ.get("MANIM_GL_BACKEND", "egl")
+
+# 使用 Mesa 的软件光栅化；已经设置的环境变量不会被覆盖，例如有 GPU 时可以设置 LIBGL_ALWAYS_SOFTWARE=0
+software_gl_env = {
+    "LIBGL_ALWAYS_SOFTWARE": "1",
+    "GALLIUM_DRIVER": "llvmpipe",
+    "EGL_PLATFORM": "surfaceless",
+}
+
+# install() 替换前的原始方法
+_originals = {}
+
+
+def create_headless_context(backend=None):
+    """建立离屏的 OpenGL 上下文"""
+    import moderngl
+    for key, value in software_gl_env.items():
+        os.environ.setdefault(key, value)
+    return moderngl.create_context(standalone=True, backend=backend or gl_backend)
+
+
+def _init_scene(self, scene):
+    if not hasattr(self, "window") and not self.should_create_window():
+        self.window = None
+        self.context = create_headless_context()
+        self.frame_buffer_object = self.get_frame_buffer_object(self.context, 0)
+        self.frame_buffer_object.use()
+        # 以下与 OpenGLRenderer.init_scene 中的设置相同
+        import moderngl
+        self.context.enable(moderngl.BLEND)
+        self.context.wireframe = config["enable_wireframe"]
+        self.context.blend_func = (moderngl.SRC_ALPHA, moderngl.ONE_MINUS_SRC_ALPHA, moderngl.ONE, moderngl.ONE)
+    _originals["init_scene"](self, scene)
+
+
+def _update_frame(self, scene):
+    """与 OpenGLRenderer.update_frame 相同，但固定在画面上的对象最后绘制"""
+    self.frame_buffer_object.clear(*self.background_color)
+    self.refresh_perspective_uniforms(scene.camera)
+
+    mobjects = [mob for mob in scene.mobjects if mob.should_render]
+    for mobject in sorted(mobjects, key=lambda mob: bool(mob.is_fixed_in_frame)):
+        self.render_mobject(mobject)
+
+    for obj in scene.meshes:
+        for mesh in obj.get_meshes():
+            mesh.set_uniforms(self)
+            mesh.render()
+
+    self.animation_elapsed_time = time.time() - self.animation_start_time
+
+
+def _add_fixed_in_frame_mobjects(self, *mobjects):
+    if config.renderer != RendererType.OPENGL:
+        return _originals["add_fixed_in_frame_mobjects"](self, *mobjects)
+    for mob in mobjects:
+        for member in mob.get_family():
+            member.fix_in_frame()
+        self.add(mob)
+
+
+def _remove_fixed_in_frame_mobjects(self, *mobjects):
+    if config.renderer != RendererType.OPENGL:
+        return _originals["remove_fixed_in_frame_mobjects"](self, *mobjects)
+    for mob in mobjects:
+        for member in mob.get_family():
+            member.unfix_from_frame()
+
+
+def install():
+    """替换 manim 中与离屏上下文和固定对象有关的方法，可以重复调用"""
+    if _originals:
+        return
+    _originals["init_scene"] = OpenGLRenderer.init_scene
+    _originals["add_fixed_in_frame_mobjects"] = ThreeDScene.add_fixed_in_frame_mobjects
+    _originals["remove_fixed_in_frame_mobjects"] = ThreeDScene.remove_fixed_in_frame_mobjects
+    OpenGLRenderer.init_scene = _init_scene
+    OpenGLRenderer.update_frame = _update_frame
+    ThreeDScene.add_fixed_in_frame_mobjects = _add_fixed_in_frame_mobjects
+    ThreeDScene.remove_fixed_in_frame_mobjects = _remove_fixed_in_frame_mobjects
+
+
+def print_context_info(backend=None):
+    ctx = create_headless_context(backend)
+    print(f"后端: {backend or gl_backend}")
+    for key in ("GL_VENDOR", "GL_RENDERER", "GL_VERSION"):
+        print(f"{key}: {ctx.info[key]}")
+    if "llvmpipe" not in ctx.info["GL_RENDERER"]:
+        print("注意：当前上下文不是 llvmpipe 软件渲染")
+    ctx.release()
+
+
+def compare_renderers(script_file, scene_name, mode="render"):
+    """分别用 cairo 和 OpenGL 运行一次场景基准，返回 {渲染器: 结果}"""
+    from benchmark import run_benchmark
+    results = {}
+    for renderer in ("cairo", "opengl"):
+        print(f"正在运行 {scene_name} / {mode} / {renderer} ...")
+        env = dict(os.environ, MANIM_RENDERER=renderer)
+        results[renderer] = run_benchmark(script_file, scene_name, mode, env=env)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="无窗口的软件 OpenGL 渲染模式")
+    sub = parser.add_subparsers(dest="command", required=True)
+    info_parser = sub.add_parser("info", help="检查离屏上下文")
+    info_parser.add_argument("--backend", type=str, default=None, help="egl 或 x11")
+    compare_parser = sub.add_parser("compare", help="比较 cairo 和 OpenGL 的渲染耗时")
+    compare_parser.add_argument("--script", type=str, default="C01-Riemann_sphere.py", help="场景脚本")
+    compare_parser.add_argument("--scene", type=str, default="RiemannSphere", help="场景类名")
+    compare_parser.add_argument("--mode", type=str, choices=["construct", "render"], default="render",
+                                help="基准模式，与 benchmark.py 相同")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        print_context_info(args.backend)
+        sys.exit(0)
+
+    results = compare_renderers(args.script, args.scene, args.mode)
+    print(f"\n{'渲染器':<10}{'耗时':>10}{'峰值内存':>12}{'play数':>8}")
+    for renderer, r in results.items():
+        if r is None:
+            print(f"{renderer:<10}{'失败':>10}")
+            continue
+        print(f"{renderer:<10}{r['wall_time']:9.2f}s{r['peak_rss_mb']:10.0f}MB{r['num_plays']:8d}")
+    if all(results.values()):
+        print(f"\nOpenGL 相对 cairo：{results['cairo']['wall_time'] / results['opengl']['wall_time']:.2f} 倍速度")
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""分阶段并行渲染长场景
+
+场景通过 phases 声明阶段边界（每个阶段是一个方法），并在 construct 中调用 run_phases()。
+并行渲染时每个阶段在独立的进程中渲染：之前的阶段以跳过动画的方式重放（与 manim 的 -n 参数相同，
+只计算每个动画的最终状态，不输出画面），从而得到本阶段开始时的完整场景状态；本阶段结束后立即结束场景。
+各阶段的视频最后用 ffmpeg 的 concat 分离器直接拼接，不重新编码。
+
+字幕时间按实际拼接的视频时长重新计算：某条字幕的时间 = 之前各阶段视频的总时长 + 它在本阶段内的相对时间。
+
+阶段边界也是保存检查点的位置（见 checkpoint.py），可以从某个阶段的检查点直接开始渲染。
+"""
+
+import os
+import json
+import subprocess
+import argparse
+from manim.utils.exceptions import EndSceneEarlyException
+
+
+class PhasedSceneMixin:
+    """为场景提供阶段边界，需与 Scene 一起继承，并在 construct 中调用 run_phases()"""
+
+    phases = []             # 按顺序执行的阶段方法名
+    render_phase = None     # 只输出该阶段的画面，None 表示正常渲染所有阶段
+    phase_start_timer = 0.0 # 输出阶段开始时的动画计时器
+    phase_end_timer = None  # 输出阶段结束时的动画计时器
+    resume_phase = None     # 从该阶段的检查点开始，之前的阶段不执行
+    save_checkpoints = False  # 是否在每个阶段开始前保存检查点
+    checkpoint_quality = "l"
+    checkpoint_fingerprint = None
+
+    def run_phases(self):
+        from checkpoint import save_checkpoint, load_checkpoint
+
+        base_skipping = self.renderer._original_skipping_status
+        start = 0
+        if self.resume_phase is not None:
+            start = self.phase_index(self.resume_phase)
+            # 第 0 个阶段之前只有 construct 中的准备工作，直接正常执行
+            if start > 0:
+                load_checkpoint(self, start, self.checkpoint_quality)
+            self.phase_start_timer = self.animation_timer
+
+        for i, name in enumerate(self.phases):
+            if i < start:
+                continue
+            if self.save_checkpoints and i > start and self.render_phase is None:
+                save_checkpoint(self, i, self.checkpoint_quality)
+            if self.render_phase is not None:
+                # 之前的阶段只重放状态，不输出画面
+                self.renderer._original_skipping_status = base_skipping or i != self.render_phase
+                if i == self.render_phase:
+                    self.phase_start_timer = self.animation_timer
+
+            getattr(self, name)()
+
+            if i == self.render_phase:
+                self.phase_end_timer = self.animation_timer
+                raise EndSceneEarlyException()
+
+    def phase_index(self, phase):
+        """阶段序号或方法名 -> 序号"""
+        if isinstance(phase, str) and not phase.isdigit():
+            if phase not in self.phases:
+                raise ValueError(f"未知的阶段 {phase}，可选: {', '.join(self.phases)}")
+            return self.phases.index(phase)
+        index = int(phase)
+        if not 0 <= index < len(self.phases):
+            raise ValueError(f"阶段序号应在 0 到 {len(self.phases) - 1} 之间")
+        return index
+
+
+def render_phase_worker(script_file, scene_name, quality, index, force=False, subtitle_mode="mobject"):
+    """在独立进程中渲染一个阶段，返回视频文件、阶段起止计时和本阶段的字幕"""
+    from batch_render import load_script
+    from render_driver import render_scene, read_timeline
+
+    os.environ["MANIM_SUBTITLE_MODE"] = subtitle_mode
+    scene_class = getattr(load_script(script_file), scene_name)
+    phase_subtitle_file = os.path.join("media", f"subtitles_{scene_name}_phase{index}.jsonl")
+
+    def prepare(scene):
+        scene.render_phase = index
+
+    # 每个阶段使用独立的输出文件和部分电影文件目录，避免多个进程同时写同一个文件列表
+    scene, video_file = render_scene(scene_class, script_file, quality, force=force, extra_config={
+        "output_file": f"{scene_name}_phase{index}",
+        "partial_movie_dir": f"{{video_dir}}/partial_movie_files/{{scene_name}}_phase{index}",
+    }, prepare_scene=prepare, subtitle_file=phase_subtitle_file)
+
+    # 只保留本阶段内记录的字幕，之前阶段重放时写入的字幕丢弃
+    start, end = scene.phase_start_timer, scene.phase_end_timer
+    subtitles = [sub for sub in read_timeline(phase_subtitle_file)
+                 if sub['start_time'] >= start and (end is None or sub['start_time'] < end)]
+    os.remove(phase_subtitle_file)
+    return {"video_file": video_file, "start_timer": start, "subtitles": subtitles}
+
+
+def read_phases(script_file, scene_name):
+    """在独立进程中读取场景声明的阶段，父进程不导入脚本"""
+    from batch_render import load_script
+    return list(getattr(getattr(load_script(script_file), scene_name), "phases", None) or [])
+
+
+def concat_videos(video_files, output_file):
+    """用 ffmpeg concat 分离器拼接视频，不重新编码"""
+    list_file = output_file.replace('.mp4', '_phases.txt')
+    with open(list_file, 'w', encoding='utf-8') as f:
+        for video in video_files:
+            f.write(f"file '{os.path.abspath(video)}'\n")
+    cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', list_file, '-c', 'copy', output_file]
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.remove(list_file)
+    print(f"已拼接 {len(video_files)} 个阶段: {output_file}")
+
+
+def render_phases_parallel(script_file, scene_name, quality="l", workers=None, force=False, subtitle_mode="mobject",
+                           phases=None):
+    """按阶段并行渲染场景，返回 (拼接后的视频文件, 字幕文件)
+
+    phases 为场景类的 phases，已经导入了脚本的调用方（如 render_driver）直接传入；
+    为 None 时在一个新进程中读取，当前进程不重复导入脚本。
+    """
+    from batch_render import FreshProcessPool
+    from render_driver import get_video_file, get_subtitle_file
+    from generate_speech import get_video_duration
+
+    if phases is None:
+        with FreshProcessPool(1) as pool:
+            phases = pool.submit(read_phases, script_file, scene_name).result()
+    if not phases:
+        raise ValueError(f"{scene_name} 没有声明 phases，无法分阶段渲染")
+    num_phases = len(phases)
+    print(f"{scene_name} 共 {num_phases} 个阶段，开始并行渲染...")
+
+    # 每个阶段使用新进程，避免脚本重复导入时在同一进程中叠加 TeX 导言区
+    with FreshProcessPool(workers or min(num_phases, os.cpu_count() or 1)) as pool:
+        futures = [pool.submit(render_phase_worker, script_file, scene_name, quality, i, force, subtitle_mode)
+                   for i in range(num_phases)]
+        results = [future.result() for future in futures]
+
+    # 拼接视频
+    video_file = get_video_file(script_file, scene_name, quality)
+    concat_videos([r["video_file"] for r in results], video_file)
+
+    # 按各阶段视频的实际时长平移字幕时间
+    subtitles, offset = [], 0.0
+    for r in results:
+        for sub in r["subtitles"]:
+            sub['start_time'] = offset + sub['start_time'] - r["start_timer"]
+            subtitles.append(sub)
+        offset += get_video_duration(r["video_file"])
+    for i, sub in enumerate(subtitles):
+        sub['id'] = i + 1
+
+    subtitle_file = get_subtitle_file(scene_name)
+    with open(subtitle_file, 'w', encoding='utf-8') as f:
+        for sub in subtitles:
+            f.write(json.dumps(sub, ensure_ascii=False) + '\n')
+    print(f"已合并 {len(subtitles)} 条字幕: {subtitle_file}")
+    return video_file, subtitle_file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="分阶段并行渲染场景（不配音）")
+    parser.add_argument("script_file", type=str, help="场景脚本")
+    parser.add_argument("scene_name", type=str, help="场景类名")
+    parser.add_argument("--quality", "-q", type=str, choices=["l", "m", "h", "k"], default="l",
+                        help="动画质量：l(低), m(中), h(高), k(4K)")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="进程数")
+    parser.add_argument("--force", "-f", action="store_true", help="是否强制重新渲染")
+    args = parser.parse_args()
+
+    render_phases_parallel(args.script_file, args.scene_name, args.quality, args.workers, args.force)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""按动画统计渲染耗时
+
+渲染一个场景要几十分钟时，很难看出是哪一次 play() 最慢。启用后（--profile 或 MANIM_PROFILE=1），
+每次 play()/wait() 记录：场景脚本中的调用位置、帧数、每帧的平均和最长耗时、场景中的对象数，
+以及其中用于哈希和编码（写入 ffmpeg）的时间。静止等待的画面在下一次 play() 或场景结束时才编码，
+这段时间单独记为一条 hold，不计入触发它的 play()。渲染结束后按耗时排序打印，
+并输出 Chrome trace 格式的 JSON，可以在 chrome://tracing 或 https://ui.perfetto.dev 中查看。
+"""
+
+import os
+import sys
+import json
+import time
+import inspect
+import fast_hash
+from manim import config
+
+# 报告中列出的条目数
+report_top = 15
+
+
+class PlayProfiler:
+    """挂在一个场景对象上，记录它的每次 play()/wait()"""
+
+    def __init__(self, scene):
+        self.scene = scene
+        self.scene_file = os.path.abspath(inspect.getfile(type(scene)))
+        self.records = []
+        self.current = None
+        self.t0 = time.perf_counter()
+
+        # 用实例属性覆盖方法，只影响这一个场景
+        scene.play = self._wrap_call(scene.play, "play")
+        scene.wait = self._wrap_call(scene.wait, "wait")
+        renderer, file_writer = scene.renderer, scene.renderer.file_writer
+        renderer.render = self._wrap_frame(renderer.render)
+        renderer.add_frame = self._wrap_add_frame(renderer.add_frame)
+        for name in ("write_frame", "begin_animation", "end_animation"):
+            setattr(file_writer, name, self._wrap_timer(getattr(file_writer, name), "encode_time"))
+        if hasattr(scene, "flush_static_hold"):
+            scene.flush_static_hold = self._wrap_hold(scene.flush_static_hold)
+            scene._encode_hold = self._wrap_timer(scene._encode_hold, "encode_time")
+
+    def _call_site(self):
+        """场景脚本中最内层的调用位置，以及它在场景脚本中的上一层调用位置"""
+        sites = []
+        frame = sys._getframe(2)
+        while frame is not None and len(sites) < 2:
+            if os.path.abspath(frame.f_code.co_filename) == self.scene_file:
+                sites.append(f"{os.path.basename(self.scene_file)}:{frame.f_lineno} ({frame.f_code.co_name})")
+            frame = frame.f_back
+        return sites[0] if sites else "?", sites[1] if len(sites) > 1 else ""
+
+    def _wrap_call(self, func, kind):
+        def wrapper(*args, **kwargs):
+            if self.current is not None:  # wait() 内部调用的 play()
+                return func(*args, **kwargs)
+            site, caller = self._call_site()
+            hash_count = len(fast_hash.hash_stats)
+            self.current = record = {
+                "kind": kind, "site": site, "caller": caller,
+                "animations": [type(a).__name__ for a in args] if kind == "play" else [],
+                "start": time.perf_counter() - self.t0, "frames": 0, "frame_times": [],
+                "hash_time": 0.0, "encode_time": 0.0,
+            }
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record["duration"] = time.perf_counter() - self.t0 - record["start"]
+                record["hash_time"] = sum(s["seconds"] for s in fast_hash.hash_stats[hash_count:])
+                record["mobjects"] = len(self.scene.get_mobject_family_members())
+                record["skipped"] = bool(self.scene.renderer.skip_animations)
+                if kind == "wait" and record["frames"] == 0 and not record["skipped"]:
+                    # 静止等待的快速路径不逐帧输出，按等待时长折算帧数
+                    duration = args[0] if args else kwargs.get("duration", 1.0)
+                    record["frames"] = int(duration * config.frame_rate)
+                    record["held"] = True
+                times = record.pop("frame_times")
+                record["frame_mean"] = sum(times) / len(times) if times else 0.0
+                record["frame_max"] = max(times) if times else 0.0
+                record["index"] = len(self.records)
+                self.records.append(record)
+                self.current = None
+        return wrapper
+
+    def _wrap_hold(self, func):
+        def wrapper():
+            pending = getattr(self.scene, "_pending_hold", None)
+            if pending is None or pending[1] == 0:
+                return func()
+            site, caller = self._call_site()
+            outer = self.current
+            self.current = record = {
+                "kind": "hold", "site": site, "caller": caller, "animations": [],
+                # 这些帧已经计入对应的 wait()，这里只记录编码的帧数
+                "start": time.perf_counter() - self.t0, "frames": 0, "hold_frames": pending[1],
+                "hash_time": 0.0, "encode_time": 0.0, "frame_mean": 0.0, "frame_max": 0.0,
+            }
+            try:
+                return func()
+            finally:
+                record["duration"] = time.perf_counter() - self.t0 - record["start"]
+                record["mobjects"] = len(self.scene.get_mobject_family_members())
+                record["skipped"] = False
+                record["index"] = len(self.records)
+                self.records.append(record)
+                self.current = outer
+                if outer is not None:
+                    # 触发编码的 play() 从编码结束后开始计时
+                    outer["start"] += record["duration"]
+        return wrapper
+
+    def _wrap_frame(self, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            if self.current is not None:
+                self.current["frame_times"].append(time.perf_counter() - start)
+            return result
+        return wrapper
+
+    def _wrap_add_frame(self, func):
+        def wrapper(frame, num_frames=1):
+            if self.current is not None and not self.scene.renderer.skip_animations:
+                self.current["frames"] += num_frames
+            return func(frame, num_frames)
+        return wrapper
+
+    def _wrap_timer(self, func, key):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if self.current is not None:
+                    self.current[key] += time.perf_counter() - start
+        return wrapper
+
+    def print_report(self, top=None):
+        """按耗时排序打印单次调用和按调用位置汇总的结果"""
+        top = top or report_top
+        if not self.records:
+            return
+        total = sum(r["duration"] for r in self.records)
+        print(f"\n动画耗时（共 {len(self.records)} 次 play/wait/hold，{total:.2f}秒）：")
+        print(f"  {'耗时':>8} {'帧数':>6} {'平均帧':>8} {'最长帧':>8} {'哈希':>7} {'编码':>7} {'对象数':>7}  调用位置")
+        for r in sorted(self.records, key=lambda r: r["duration"], reverse=True)[:top]:
+            label = ", ".join(r["animations"]) or r["kind"]
+            print(f"  {r['duration']:8.2f} {r['frames']:6d} {r['frame_mean'] * 1000:7.1f}ms {r['frame_max'] * 1000:7.1f}ms "
+                  f"{r['hash_time']:7.2f} {r['encode_time']:7.2f} {r['mobjects']:7d}  {r['site']} ← {r['caller']}  [{label}]")
+
+        by_site = {}
+        for r in self.records:
+            entry = by_site.setdefault(r["site"], {"count": 0, "duration": 0.0, "frames": 0})
+            entry["count"] += 1
+            entry["duration"] += r["duration"]
+            entry["frames"] += r["frames"]
+        print("\n按调用位置汇总：")
+        for site, entry in sorted(by_site.items(), key=lambda kv: kv[1]["duration"], reverse=True)[:top]:
+            print(f"  {entry['duration']:8.2f}秒 {entry['count']:5d} 次 {entry['frames']:7d} 帧  {site}")
+
+    def write_trace(self, trace_file):
+        """输出 Chrome trace 格式的 JSON"""
+        events = []
+        for r in self.records:
+            name = ", ".join(r["animations"]) or r["kind"]
+            args = {k: v for k, v in r.items() if k not in ("start", "duration")}
+            events.append({"name": name, "cat": r["kind"], "ph": "X", "pid": 0, "tid": 0,
+                           "ts": r["start"] * 1e6, "dur": r["duration"] * 1e6, "args": args})
+            if r["hash_time"] > 0:
+                events.append({"name": "hash", "cat": "hash", "ph": "X", "pid": 0, "tid": 1,
+                               "ts": r["start"] * 1e6, "dur": r["hash_time"] * 1e6})
+        os.makedirs(os.path.dirname(trace_file) or ".", exist_ok=True)
+        with open(trace_file, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        print(f"Chrome trace 已保存: {trace_file}")
+
+
+def is_profiling_enabled():
+    return os.environ.get("MANIM_PROFILE") == "1"
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""不经过 LaTeX 的复数读数
+
+C01 原来每次改变复数的值都用 format_complex_number 生成新的 MathTex（每一帧或每一步一次 LaTeX 编译或缓存查找），
+再替换掉原来的对象并重新加入 add_fixed_in_frame_mobjects。
+
+ComplexReadout 由 glyph_cache 中缓存的字形拼成，支持极坐标 z = re^{(n/d)πi} 和直角坐标 z = x + yi 两种形式。
+创建时预先分配固定数量的字形槽位，改变数值时只按新的排版把缓存的字形轮廓写进这些槽位，
+对象本身（以及它在 fixed_in_frame_mobjects 中的登记）保持不变；数字的格式与 DecimalNumber 相同。
+每个字符只在第一次出现时由 Pango 生成一次轮廓，之后改变数值不涉及 LaTeX，也不涉及 Pango。
+"""
+
+import numpy as np
+from manim import *
+from glyph_cache import get_glyph_cache
+
+# 上标相对于正文的字号比例
+script_scale = 0.6
+
+
+def format_number(value, num_decimal_places=None):
+    """整数直接显示；否则按 num_decimal_places 位小数显示，未指定时去掉多余的 0"""
+    if num_decimal_places is None:
+        if float(value).is_integer():
+            return str(int(value))
+        return f"{value:g}"
+    text = f"{value:.{num_decimal_places}f}"
+    return "0" if float(text) == 0 and num_decimal_places == 0 else text
+
+
+class ComplexReadout(VGroup):
+    """原地更新的复数读数
+
+    参数:
+        form: "polar" 或 "cartesian"
+        font_size: 字号，与 MathTex 的 font_size 相当
+        color: 颜色
+        num_decimal_places: 直角坐标形式的小数位数，None 表示整数不带小数、小数去掉末尾的 0
+        capacity: 字形槽位数，需不少于最长读数的字符数
+        aligned_edge: 数值改变后保持位置不变的边，默认右边（与 to_corner(UR) 一致）
+    """
+
+    def __init__(self, form="polar", font_size=48, color=WHITE, num_decimal_places=None,
+                 capacity=32, aligned_edge=RIGHT, **kwargs):
+        super().__init__(**kwargs)
+        self.form = form
+        self.num_decimal_places = num_decimal_places
+        self.aligned_edge = aligned_edge
+        self.font_size = font_size
+        # 数字高度，用于上标和分数的排版
+        self.digit_height = np.max(self._cache("text").get("0")[1][:, 1])
+        self.script_height = np.max(self._cache("script").get("0")[1][:, 1])
+
+        self.slots = [VMobject(fill_color=color, fill_opacity=1.0, stroke_width=0) for _ in range(capacity)]
+        self.add(*self.slots)
+        self._placed = False
+        if form == "polar":
+            self.set_polar(1, 0)
+        else:
+            self.set_cartesian(0, 0)
+
+    def _cache(self, kind):
+        """字形缓存不保存在对象上，copy() 和检查点不会复制整张字形表"""
+        if kind == "text":
+            return get_glyph_cache(font_size=self.font_size)
+        if kind == "italic":
+            return get_glyph_cache(font_size=self.font_size, slant=ITALIC)
+        if kind == "script":
+            return get_glyph_cache(font_size=self.font_size * script_scale)
+        return get_glyph_cache(font_size=self.font_size * script_scale, weight=BOLD)
+
+    def _write(self, pieces):
+        """pieces: [(字形缓存名或 "bar", 字符或 (宽, 高), 左下角 x, 基线 y)]，写入槽位并保持对齐边的位置"""
+        if len(pieces) > len(self.slots):
+            raise ValueError(f"读数需要 {len(pieces)} 个字形，超过了 capacity={len(self.slots)}")
+        anchor = self.get_critical_point(self.aligned_edge) if self._placed else None
+
+        for slot, (kind, content, x, y) in zip(self.slots, pieces):
+            offset = np.array([x, y, 0])
+            if kind == "bar":
+                width, height = content
+                slot.set_points_as_corners([offset, offset + [width, 0, 0], offset + [width, height, 0],
+                                            offset + [0, height, 0], offset])
+            else:
+                slot.points = self._cache(kind).get(content)[1] + offset
+        for slot in self.slots[len(pieces):]:
+            slot.points = np.zeros((0, 3))
+
+        if anchor is not None:
+            self.move_to(anchor, aligned_edge=self.aligned_edge)
+        else:
+            self.center()
+            self._placed = True
+        return self
+
+    def _run(self, kind, text, pen, y=0.0, pieces=None):
+        """把一串字符排在 pen 处，返回新的笔位置"""
+        cache = self._cache(kind)
+        for char in text:
+            advance, points = cache.get(char)
+            if points is not None:
+                pieces.append((kind, char, pen, y))
+            pen += advance
+        return pen
+
+    def _width(self, kind, text):
+        return sum(self._cache(kind).get(char)[0] for char in text)
+
+    def set_polar(self, r, numerator, denominator=16):
+        """显示 z = r·e^{(numerator/denominator)πi}，分子至少两位（与原来的 format_complex_number 一致）"""
+        self.form = "polar"
+        pieces = []
+        pen = self._run("italic", "z", 0.0, pieces=pieces)
+        pen = self._run("text", " = " + format_number(r), pen, pieces=pieces)
+        pen = self._run("italic", "e", pen, pieces=pieces)
+
+        # 上标中的分数，分数线位于正文数字高度附近
+        num_text, den_text = f"{numerator:02d}", str(denominator)
+        hs = self.script_height
+        axis = 0.95 * self.digit_height
+        thickness = 0.08 * hs
+        pen += 0.08 * hs
+        frac_width = max(self._width("script", num_text), self._width("script", den_text)) + 0.2 * hs
+        num_x = pen + (frac_width - self._width("script", num_text)) / 2
+        den_x = pen + (frac_width - self._width("script", den_text)) / 2
+        self._run("script", num_text, num_x, axis + thickness / 2 + 0.2 * hs, pieces)
+        pieces.append(("bar", (frac_width, thickness), pen, axis - thickness / 2))
+        self._run("script", den_text, den_x, axis - thickness / 2 - 1.2 * hs, pieces)
+        pen += frac_width + 0.08 * hs
+
+        pen = self._run("script", "π", pen, axis - hs / 2, pieces)
+        self._run("script_bold", "i", pen, axis - hs / 2, pieces)
+        return self._write(pieces)
+
+    def set_cartesian(self, x, y):
+        """显示 z = x + yi（y 为负时显示为减号）"""
+        self.form = "cartesian"
+        x_text = format_number(x, self.num_decimal_places)
+        y_text = format_number(abs(y), self.num_decimal_places)
+        sign = "−" if y < 0 and float(y_text) != 0 else "+"
+        pieces = []
+        pen = self._run("italic", "z", 0.0, pieces=pieces)
+        pen = self._run("text", f" = {x_text.replace('-', '−')} {sign} {y_text}", pen, pieces=pieces)
+        self._run("italic", "i", pen, pieces=pieces)
+        return self._write(pieces)
+
+    def set_value(self, z):
+        """按当前形式显示复数 z；极坐标形式下辐角取最接近的 π/16 的整数倍"""
+        z = complex(z)
+        if self.form == "cartesian":
+            return self.set_cartesian(z.real, z.imag)
+        numerator = int(round(np.angle(z) % (2 * PI) / PI * 16)) % 32
+        return self.set_polar(abs(z), numerator)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""渲染结果缓存
+
+只修改了配音文本时，重新运行脚本仍然要完整渲染一遍。这里为每次渲染计算指纹：
+场景脚本和它导入的本地辅助模块的源码、TeX 模板、质量参数、字幕模式以及 manim 版本。
+指纹相同的视频和字幕时间线已经存在时直接取用，跳过渲染，直接进入配音。
+"""
+
+import os
+import ast
+import json
+import time
+import shutil
+import hashlib
+import argparse
+
+# 渲染结果缓存目录，每个指纹一个子目录
+render_cache_dir = os.path.join("media", "render_cache")
+
+
+def local_source_files(script_file):
+    """返回脚本及其递归导入的本地模块（与脚本位于同一目录的 .py 文件）"""
+    base_dir = os.path.dirname(os.path.abspath(script_file))
+    found, pending = [], [os.path.abspath(script_file)]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.append(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                candidate = os.path.join(base_dir, name.split(".")[0] + ".py")
+                if os.path.exists(candidate):
+                    pending.append(candidate)
+    return sorted(found)
+
+
+def render_fingerprint(script_file, scene_name, quality, subtitle_mode="mobject", tex_template_body=None):
+    """计算渲染指纹"""
+    import manim
+    from manim.constants import QUALITIES
+    from render_driver import quality_to_config
+
+    hasher = hashlib.sha256()
+    for path in local_source_files(script_file):
+        hasher.update(os.path.basename(path).encode("utf-8"))
+        with open(path, 'rb') as f:
+            hasher.update(f.read())
+    q = QUALITIES[quality_to_config[quality]]
+    for part in (scene_name, q["pixel_width"], q["pixel_height"], q["frame_rate"],
+                 subtitle_mode, manim.__version__, tex_template_body or "",
+                 os.environ.get("MANIM_LOD", ""),  # 单独指定的几何细节等级
+                 os.environ.get("MANIM_RENDERER", "cairo")):
+        hasher.update(str(part).encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()[:32]
+
+
+def restore_render(fingerprint, video_file, subtitle_file):
+    """缓存命中时把视频和字幕时间线复制到输出位置，返回是否命中"""
+    entry_dir = os.path.join(render_cache_dir, fingerprint)
+    cached_video = os.path.join(entry_dir, "video.mp4")
+    cached_timeline = os.path.join(entry_dir, "timeline.jsonl")
+    if not (os.path.exists(cached_video) and os.path.exists(cached_timeline)):
+        return False
+
+    os.makedirs(os.path.dirname(video_file), exist_ok=True)
+    if not (os.path.exists(video_file) and os.path.getsize(video_file) == os.path.getsize(cached_video)):
+        shutil.copyfile(cached_video, video_file)
+    shutil.copyfile(cached_timeline, subtitle_file)
+    os.utime(entry_dir)
+    return True
+
+
+def store_render(fingerprint, video_file, subtitle_file, script_file, scene_name, quality):
+    """把渲染完成的视频和字幕时间线保存到缓存"""
+    entry_dir = os.path.join(render_cache_dir, fingerprint)
+    tmp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+    os.makedirs(tmp_dir, exist_ok=True)
+    shutil.copyfile(video_file, os.path.join(tmp_dir, "video.mp4"))
+    shutil.copyfile(subtitle_file, os.path.join(tmp_dir, "timeline.jsonl"))
+    with open(os.path.join(tmp_dir, "meta.json"), 'w', encoding='utf-8') as f:
+        json.dump({"script": os.path.basename(script_file), "scene": scene_name,
+                   "quality": quality, "created": time.time()}, f, ensure_ascii=False)
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir)
+
+
+def list_entries():
+    """返回 [(指纹, 元数据, 大小)]"""
+    entries = []
+    if not os.path.isdir(render_cache_dir):
+        return entries
+    for name in sorted(os.listdir(render_cache_dir)):
+        meta_file = os.path.join(render_cache_dir, name, "meta.json")
+        if not os.path.exists(meta_file):
+            continue
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        entry_dir = os.path.join(render_cache_dir, name)
+        size = sum(os.path.getsize(os.path.join(entry_dir, f)) for f in os.listdir(entry_dir))
+        entries.append((name, meta, size))
+    return entries
+
+
+def invalidate(script=None, scene=None):
+    """删除缓存条目，可按脚本或场景筛选，返回删除的条目数"""
+    removed = 0
+    for fingerprint, meta, _ in list_entries():
+        if script is not None and meta["script"] != os.path.basename(script):
+            continue
+        if scene is not None and meta["scene"] != scene:
+            continue
+        shutil.rmtree(os.path.join(render_cache_dir, fingerprint), ignore_errors=True)
+        removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="管理渲染结果缓存")
+    parser.add_argument("command", choices=["list", "invalidate"], help="list 查看缓存，invalidate 删除缓存")
+    parser.add_argument("--script", type=str, default=None, help="只处理该脚本的缓存")
+    parser.add_argument("--scene", type=str, default=None, help="只处理该场景的缓存")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for fingerprint, meta, size in list_entries():
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(meta["created"]))
+            print(f"{fingerprint}  {meta['script']} {meta['scene']} -q{meta['quality']}  {size / 1024 / 1024:.1f} MB  {created}")
+    else:
+        print(f"已删除 {invalidate(args.script, args.scene)} 个渲染缓存")
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""在当前进程内渲染场景并配音
+
+原来每个脚本的主函数先创建一个虚的场景对象获取字幕文件路径，再通过 subprocess 调用 manim 命令行，
+manim 会重新导入一遍 manim 和脚本本身。这里直接通过 manim 的 config 和 Scene.render() 在当前进程内渲染，
+输出路径按 manim 的目录规则计算，无需实例化场景，渲染完成后把字幕时间线直接交给配音模块。
+"""
+
+import os
+import glob
+import json
+import time
+import argparse
+from manim import config, tempconfig
+from generate_speech import dub_video
+import render_cache
+import fast_hash
+from play_profiler import PlayProfiler, is_profiling_enabled
+
+# 将质量参数转换为 manim 的输出质量
+quality_to_str = {
+    "l": "480p15",
+    "m": "720p30",
+    "h": "1080p60",
+    "k": "2160p60"
+}
+
+# 部分电影文件缓存的保留策略，也可以通过环境变量覆盖
+partial_cache_mb = float(os.environ.get("MANIM_PARTIAL_CACHE_MB", 2048))  # 所有场景和质量合计的大小上限
+partial_cache_days = float(os.environ.get("MANIM_PARTIAL_CACHE_DAYS", 14))  # 超过该天数未使用的文件会被删除
+
+# 质量参数对应的 manim 配置名
+quality_to_config = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "k": "fourk_quality"
+}
+
+
+def get_video_file(script_file, class_name, quality):
+    """根据 manim 的输出结构确定视频文件路径：media/videos/脚本名/质量标识/类名.mp4"""
+    script_name = os.path.splitext(os.path.basename(script_file))[0]
+    return f"media/videos/{script_name}/{quality_to_str[quality]}/{class_name}.mp4"
+
+
+def get_subtitle_file(class_name):
+    """场景写出的字幕文件路径，与各脚本中的设定一致"""
+    return os.path.join("media", f"subtitles_{class_name}.jsonl")
+
+
+def render_scene(scene_class, script_file, quality="l", preview=False, force=False,
+                 extra_config=None, prepare_scene=None, subtitle_file=None):
+    """在当前进程内渲染场景
+
+    参数:
+        scene_class: 场景类
+        script_file: 场景所在的脚本文件，用于确定输出目录
+        quality: l, m, h, k
+        preview: 渲染完成后是否自动预览
+        force: 是否禁用 manim 的部分电影文件缓存，强制重新渲染
+        extra_config: 额外的 manim 配置，例如 output_file
+        prepare_scene: 在场景创建后、渲染前调用的函数，参数为场景对象
+        subtitle_file: 字幕时间线文件，默认为 media/subtitles_场景名.jsonl；
+            场景在 __init__ 中就会清空字幕文件，因此通过 MANIM_SUBTITLE_FILE 在创建场景前传入
+
+    返回:
+        tuple: (场景对象, 视频文件路径)
+    """
+    temp_config = {
+        "input_file": os.path.abspath(script_file),
+        "preview": preview,
+        "disable_caching": force,
+        "max_files_cached": -1,  # 由 prune_partial_movie_files 统一按大小和时间淘汰
+    }
+    # 设置 MANIM_RENDERER=opengl 时在离屏的软件 OpenGL 上下文中渲染
+    if os.environ.get("MANIM_RENDERER") == "opengl":
+        import opengl_render
+        opengl_render.install()
+        temp_config["renderer"] = "opengl"
+    temp_config.update(extra_config or {})
+    start_time = time.time()
+    # 设置 MANIM_FAST_HASH=1 时使用结构签名代替 manim 的 JSON 哈希，两种模式都记录每次 play() 的哈希耗时
+    fast_hash.install(fast=os.environ.get("MANIM_FAST_HASH") == "1")
+    with tempconfig(temp_config):
+        config.quality = quality_to_config[quality]
+        if subtitle_file is not None:
+            open(subtitle_file, 'w', encoding='utf-8').close()
+            os.environ["MANIM_SUBTITLE_FILE"] = subtitle_file
+        try:
+            scene = scene_class()
+        finally:
+            os.environ.pop("MANIM_SUBTITLE_FILE", None)
+        # 设置 MANIM_PROFILE=1 时记录每次 play()/wait() 的耗时
+        profiler = PlayProfiler(scene) if is_profiling_enabled() else None
+        if prepare_scene is not None:
+            prepare_scene(scene)
+        scene.render()
+    scene.partial_stats = touch_partial_movie_files(scene, start_time)
+    print(f"部分电影文件：复用 {scene.partial_stats['reused']} 个，新渲染 {scene.partial_stats['rendered']} 个")
+    fast_hash.print_hash_report()
+    output_name = temp_config.get("output_file") or scene_class.__name__
+    if profiler is not None:
+        profiler.print_report()
+        profiler.write_trace(os.path.join("media", f"profile_{output_name}.trace.json"))
+    return scene, get_video_file(script_file, output_name, quality)
+
+
+def read_timeline(subtitle_file):
+    """读取场景写出的字幕时间线（不含首行配置）"""
+    with open(subtitle_file, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_subtitle_header(subtitle_file, video_file, voice_name, subtitle_mode):
+    """在字幕文件第一行插入视频文件和音色信息，便于之后单独运行 generate_speech.py 重新配音"""
+    with open(subtitle_file, 'r+', encoding='utf-8') as f:
+        content = f.read()
+        f.seek(0, 0)
+        f.write(json.dumps({"video_file": video_file, "voice_name": voice_name, "subtitle_mode": subtitle_mode}, ensure_ascii=False) + '\n' + content)
+
+
+def touch_partial_movie_files(scene, since):
+    """统计本次渲染复用和新渲染的部分电影文件，并更新复用文件的修改时间，供 LRU 淘汰使用"""
+    stats = {"reused": 0, "rendered": 0}
+    for path in scene.renderer.file_writer.partial_movie_files:
+        if path is None or not os.path.exists(path):
+            continue
+        if os.path.getmtime(path) >= since:
+            stats["rendered"] += 1
+        else:
+            stats["reused"] += 1
+            os.utime(path)
+    return stats
+
+
+def prune_partial_movie_files(max_mb=None, max_days=None):
+    """按最近使用时间淘汰所有脚本和质量下的部分电影文件
+
+    先删除超过 max_days 天未使用的文件，再从最久未使用的文件开始删除，直到总大小不超过 max_mb。
+    """
+    max_mb = partial_cache_mb if max_mb is None else max_mb
+    max_days = partial_cache_days if max_days is None else max_days
+
+    files = []
+    for root in glob.glob(os.path.join("media", "videos", "*", "*", "partial_movie_files")):
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                if name == "partial_movie_file_list.txt":
+                    continue
+                path = os.path.join(dirpath, name)
+                st = os.stat(path)
+                files.append((st.st_mtime, st.st_size, path))
+    files.sort()
+
+    now = time.time()
+    total = sum(size for _, size, _ in files)
+    removed, freed = 0, 0
+    for mtime, size, path in files:
+        if now - mtime <= max_days * 86400 and total <= max_mb * 1024 * 1024:
+            break
+        os.remove(path)
+        total -= size
+        removed += 1
+        freed += size
+    print(f"部分电影文件缓存：保留 {len(files) - removed} 个（{total / 1024 / 1024:.1f} MB），"
+          f"淘汰 {removed} 个（{freed / 1024 / 1024:.1f} MB）")
+    return removed
+
+
+def build_parser(description):
+    """所有脚本共用的命令行参数"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--quality", "-q", type=str, choices=["l", "m", "h", "k"], default="l",
+                        help="动画质量：l(低), m(中), h(高), k(4K)")
+    parser.add_argument("--preview", "-p", action="store_true",
+                        help="是否自动预览")
+    parser.add_argument("--force", "-f", action="store_true",
+                        help="是否强制重新渲染（同时忽略渲染结果缓存）")
+    parser.add_argument("--keep-cache", "-k", action="store_true",
+                        help="本次不按保留策略淘汰部分电影文件")
+    parser.add_argument("--subtitle-mode", type=str, choices=["mobject", "sidecar", "burn"], default="mobject",
+                        help="字幕模式：mobject(画面内对象), sidecar(字幕轨), burn(合并时烧录)")
+    parser.add_argument("--voice", type=str, default=None,
+                        help="配音音色，例如 longlaotie, longbella")
+    parser.add_argument("--no-dub", action="store_true",
+                        help="只渲染动画，不配音")
+    parser.add_argument("--fast-hash", action="store_true",
+                        help="用结构签名代替 manim 的 JSON 哈希命名部分电影文件")
+    parser.add_argument("--lod", type=str, choices=["l", "m", "h", "k"], default=None,
+                        help="几何细节等级（采样数），默认与输出质量一致")
+    parser.add_argument("--renderer", type=str, choices=["cairo", "opengl"], default="cairo",
+                        help="渲染器：cairo，或无窗口的软件 OpenGL")
+    parser.add_argument("--profile", action="store_true",
+                        help="记录每次 play()/wait() 的耗时，输出报告和 Chrome trace")
+    parser.add_argument("--parallel-phases", action="store_true",
+                        help="按场景声明的阶段分进程并行渲染（场景需定义 phases）")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="在每个阶段开始前保存检查点（场景需定义 phases）")
+    parser.add_argument("--from-phase", type=str, default=None,
+                        help="从某个阶段（序号或方法名）的检查点开始渲染，之前的阶段完全跳过")
+    return parser
+
+
+def _render(scene_class, script_file, args):
+    """按命令行参数渲染场景，返回 (视频文件, 字幕文件, 场景对象)"""
+    if args.parallel_phases:
+        from phase_render import render_phases_parallel
+        video_file, subtitle_file = render_phases_parallel(script_file, scene_class.__name__, args.quality,
+                                                           force=args.force, subtitle_mode=args.subtitle_mode,
+                                                           phases=getattr(scene_class, "phases", None))
+        return video_file, subtitle_file, None
+    if args.checkpoint or args.from_phase is not None:
+        return _render_with_checkpoints(scene_class, script_file, args)
+    scene, video_file = render_scene(scene_class, script_file, args.quality, args.preview, args.force)
+    return video_file, scene.subtitle_file, scene
+
+
+def _render_with_checkpoints(scene_class, script_file, args):
+    """保存阶段检查点，或者从某个阶段的检查点开始渲染"""
+    if not getattr(scene_class, "phases", None):
+        raise ValueError(f"{scene_class.__name__} 没有声明 phases，无法使用检查点")
+    name = scene_class.__name__
+    fingerprint = render_cache.render_fingerprint(script_file, name, args.quality,
+                                                  args.subtitle_mode, config.tex_template.body)
+    extra_config = None
+    resumed_subtitle_file = None
+    if args.from_phase is not None:
+        # 从中间开始的视频单独输出，不覆盖完整的视频和字幕
+        extra_config = {"output_file": f"{name}_from_{args.from_phase}"}
+        resumed_subtitle_file = os.path.join("media", f"subtitles_{name}_from_{args.from_phase}.jsonl")
+
+    def prepare(scene):
+        scene.save_checkpoints = args.checkpoint
+        scene.resume_phase = args.from_phase
+        scene.checkpoint_quality = args.quality
+        scene.checkpoint_fingerprint = fingerprint
+
+    scene, video_file = render_scene(scene_class, script_file, args.quality, args.preview, args.force,
+                                     extra_config=extra_config, prepare_scene=prepare,
+                                     subtitle_file=resumed_subtitle_file)
+    if resumed_subtitle_file is not None:
+        # 字幕时间从检查点的 animation_timer 开始，平移到视频开头
+        subtitles = read_timeline(resumed_subtitle_file)
+        with open(resumed_subtitle_file, 'w', encoding='utf-8') as f:
+            for sub in subtitles:
+                sub['start_time'] -= scene.phase_start_timer
+                f.write(json.dumps(sub, ensure_ascii=False) + '\n')
+    return video_file, scene.subtitle_file, scene
+
+
+def run_from_command_line(scene_class, script_file, description, voice_name="longlaotie", dub=True):
+    """脚本主函数：解析命令行参数，渲染动画，然后配音
+
+    参数:
+        scene_class: 场景类
+        script_file: 脚本文件，一般传入 __file__
+        description: 命令行帮助中的说明
+        voice_name: 默认音色
+        dub: 默认是否配音
+    """
+    args = build_parser(description).parse_args()
+    voice_name = args.voice or voice_name
+
+    # 场景在初始化时读取字幕模式
+    os.environ["MANIM_SUBTITLE_MODE"] = args.subtitle_mode
+    if args.fast_hash:
+        os.environ["MANIM_FAST_HASH"] = "1"
+    if args.profile:
+        os.environ["MANIM_PROFILE"] = "1"
+    if args.lod:
+        os.environ["MANIM_LOD"] = args.lod
+    if args.renderer == "opengl":
+        os.environ["MANIM_RENDERER"] = "opengl"
+
+    # 源码、TeX 模板和质量都没有变化时直接使用上次的渲染结果
+    scene = None
+    video_file = get_video_file(script_file, scene_class.__name__, args.quality)
+    subtitle_file = get_subtitle_file(scene_class.__name__)
+    fingerprint = render_cache.render_fingerprint(script_file, scene_class.__name__, args.quality,
+                                                  args.subtitle_mode, config.tex_template.body)
+    start_time = time.time()
+    # 保存检查点需要实际执行各阶段；从中间开始的渲染只是部分视频，都不使用渲染结果缓存
+    use_render_cache = not (args.checkpoint or args.from_phase is not None)
+    if use_render_cache and not args.force and render_cache.restore_render(fingerprint, video_file, subtitle_file):
+        print(f"命中渲染缓存 {fingerprint[:12]}，跳过渲染")
+    else:
+        print("正在渲染动画，请耐心等待...")
+        video_file, subtitle_file, scene = _render(scene_class, script_file, args)
+        if args.from_phase is None:
+            render_cache.store_render(fingerprint, video_file, subtitle_file, script_file, scene_class.__name__, args.quality)
+    render_time = time.time() - start_time
+    print(f"渲染完成！总耗时：{render_time:.2f}秒")
+
+    # 字幕时间线直接交给配音模块
+    subtitles = read_timeline(subtitle_file)
+    write_subtitle_header(subtitle_file, video_file, voice_name, args.subtitle_mode)
+    if dub and not args.no_dub:
+        dub_video(video_file, voice_name, subtitles, args.subtitle_mode)
+        print(f"动画已渲染完成，带配音的文件为：{video_file.replace('.mp4', '_WithAudio.mp4')}")
+    else:
+        print(f"动画已渲染完成（未配音）：{video_file}")
+
+    # 按大小和时间淘汰部分电影文件，保留最近使用的以便增量渲染
+    if not args.keep_cache:
+        prune_partial_movie_files()
+    else:
+        print("根据设置保留了缓存文件")
+
+    return scene, video_file
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""按方向着色的线段圆环
+
+C02 的 demonstrate_derivative 对每个测试点在 2880 个方向上各创建一条 dz 线段和一条 df 线段，
+每条都是单独的 Line 并单独调用一次 viridis 着色，Create 和 FadeOut 也要逐个处理上千个对象。
+
+cairo 中一个 VMobject 只能有一种描边颜色，因此 SegmentRing 按颜色映射表的条目把线段分组：
+matplotlib 的 viridis 只有 256 种颜色，原来的 2880 条线段中相邻的十几条本来就是同一种颜色，
+分组后颜色与逐条着色完全相同。所有线段的端点和颜色索引都用 numpy 一次算出，
+每组线段作为一个 VMobject 的若干段独立的子路径，对象数与线段数无关。
+
+GrowSegmentRing 与 Create 在 VGroup 上的效果相同（默认 lag_ratio=1，按原来的顺序一条接一条地从内端长出），
+每一帧只做一次向量化的端点计算。
+"""
+
+import numpy as np
+from manim import *
+from colormap_lut import ColormapLUT, get_colormap_lut
+from sphere_mesh import line_bezier_points
+
+
+class SegmentRing(VGroup):
+    """从 center 出发、沿 vectors 方向的一圈线段，颜色由 values 经颜色映射表决定
+
+    参数:
+        center: 圆环中心
+        vectors: 每条线段外端相对中心的位移，复数数组或 (n, 3) 数组
+        values: 每条线段的颜色值，0 到 1 之间
+        cmap: ColormapLUT，或者 get_colormap_lut 接受的颜色映射表，默认 viridis
+        stroke_width: 线宽
+        inner_fraction: 线段内端在中心到外端之间的位置（原来的 (start + 3*end)/4 对应 0.75）
+    """
+
+    def __init__(self, center, vectors, values, cmap=None, stroke_width=3, inner_fraction=0.75, **kwargs):
+        super().__init__(**kwargs)
+        lut = cmap if isinstance(cmap, ColormapLUT) else get_colormap_lut(cmap or "viridis")
+        center = np.array(center, dtype=float)
+        vectors = np.asarray(vectors)
+        if np.iscomplexobj(vectors):
+            vectors = np.stack([vectors.real, vectors.imag, np.zeros(len(vectors))], axis=-1)
+
+        index = lut.index(values)
+        self.order = np.argsort(index, kind="stable")
+        buckets, counts = np.unique(index[self.order], return_counts=True)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.starts = (center + inner_fraction * vectors)[self.order]
+        self.ends = (center + vectors)[self.order]
+        self.num_segments = len(vectors)
+
+        for rgba in lut.table[buckets]:
+            self.add(VMobject(stroke_color=rgb_to_color(rgba[:3]), stroke_width=stroke_width, fill_opacity=0))
+        self.set_growth(np.ones(self.num_segments))
+
+    def set_growth(self, growth):
+        """growth[k] 为第 k 条线段（按传入顺序）画出的比例，0 表示尚未出现"""
+        growth = np.asarray(growth, dtype=float)[self.order]
+        tips = self.starts + growth[:, None] * (self.ends - self.starts)
+        for mob, start, end in zip(self.submobjects, self.offsets[:-1], self.offsets[1:]):
+            mob.points = line_bezier_points(self.starts[start:end], tips[start:end],
+                                            mob.n_points_per_curve).reshape(-1, 3)
+        return self
+
+
+class GrowSegmentRing(Animation):
+    """逐条画出 SegmentRing 中的线段，与 Create 的效果相同
+
+    参数:
+        ring: SegmentRing
+        lag_ratio: 与 Create 相同，1 表示一条画完再画下一条，0 表示所有线段同时长出
+    """
+
+    def __init__(self, ring, lag_ratio=1.0, **kwargs):
+        super().__init__(ring, lag_ratio=lag_ratio, introducer=True, **kwargs)
+
+    def interpolate_mobject(self, alpha):
+        n = self.mobject.num_segments
+        full_length = (n - 1) * self.lag_ratio + 1
+        growth = np.clip(alpha * full_length - np.arange(n) * self.lag_ratio, 0, 1)
+        # rate_func 只接受标量，只对正在生长的线段调用（lag_ratio=1 时每帧只有一两条）
+        partial = np.flatnonzero((growth > 0) & (growth < 1))
+        growth[partial] = [self.rate_func(t) for t in growth[partial]]
+        self.mobject.set_growth(growth)
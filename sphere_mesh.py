@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""黎曼球面上的网格线
+
+原来每条经线、纬线都是一个 ParametricFunction：逐点调用 Python 函数采样，每条线单独描边，
+ThreeDScene 每一帧还要对这些对象逐个排序。这里一次性用 NumPy 生成所有线的顶点，
+放进同一个点数组，线与线之间靠端点不相连自然断开成不同的子路径，整张网格作为一个对象描边。
+
+cairo 渲染时一个 VMobject 只能使用一种描边颜色和透明度，因此颜色和透明度相同的线合并成一个对象，
+默认的统一样式下整张网格只有一个对象。
+"""
+
+import numpy as np
+from manim import *
+
+
+def line_bezier_points(starts, ends, n_points_per_curve=4):
+    """把 starts → ends 的若干条线段写成贝塞尔曲线，形状为 (线段数, n_points_per_curve, 3)
+
+    控制点均匀分布在线段上：cairo 的三次曲线（每段 4 个点）为三等分点，OpenGL 的二次曲线（每段 3 个点）为中点。
+    """
+    t = np.linspace(0, 1, n_points_per_curve)[None, :, None]
+    return starts[:, None] + t * (ends - starts)[:, None]
+
+
+def polylines_to_bezier(lines, n_points_per_curve=4):
+    """把若干条折线转换为 manim 的贝塞尔点数组，每段直线为一段曲线
+
+    参数:
+        lines: 折线列表，每条为 (n, 3) 数组；也可以是形状为 (线数, n, 3) 的数组
+        n_points_per_curve: 每段曲线的点数，与对象的 n_points_per_curve 相同（cairo 为 4，OpenGL 为 3）
+
+    返回:
+        (段数 × n_points_per_curve, 3) 的点数组
+    """
+    curves = []
+    for line in lines:
+        line = np.asarray(line, dtype=float)
+        curves.append(line_bezier_points(line[:-1], line[1:], n_points_per_curve))
+    if not curves:
+        return np.zeros((0, 3))
+    return np.concatenate(curves).reshape(-1, 3)
+
+
+class PolylineMesh(VMobject):
+    """多条折线组成的单个 VMobject
+
+    Create 等逐步显示的动画对每条线同时按比例显示（与 VGroup 中的多条线一致），
+    而不是沿整个点数组从第一条线画到最后一条线。
+    """
+
+    def __init__(self, lines=(), **kwargs):
+        super().__init__(**kwargs)
+        self.set_polylines(lines)
+
+    def set_polylines(self, lines):
+        self.line_curve_counts = np.array([len(line) - 1 for line in lines], dtype=int)
+        self.points = polylines_to_bezier(lines, self.n_points_per_curve)
+        return self
+
+    def pointwise_become_partial(self, vmobject, a, b):
+        counts = getattr(vmobject, "line_curve_counts", None)
+        # 点数组被其他方法（如 Transform 中的 align_points）改写后各条线的段数不再可靠，按普通 VMobject 处理
+        if counts is None or len(counts) == 0 or counts.sum() != vmobject.get_num_curves():
+            return super().pointwise_become_partial(vmobject, a, b)
+        line_of = np.repeat(np.arange(len(counts)), counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        keep = (local >= np.floor(a * counts)[line_of]) & (local < np.ceil(b * counts)[line_of])
+        self.points = vmobject.points.reshape(-1, self.n_points_per_curve, 3)[keep].reshape(-1, 3)
+        return self
+
+
+def sphere_graticule_lines(radius=1.0, longitude_count=120, latitude_count=60,
+                           longitude_samples=314, latitude_samples=628):
+    """一次计算所有经线和纬线的顶点
+
+    球心为 (0, 0, radius)。经线的经度为 [0, 2π) 上等分的 longitude_count 个值，
+    纬线的极角为 [0, π] 上等分的 latitude_count 个值（去掉两个极点）。
+
+    返回:
+        (经线顶点 (经线数, longitude_samples + 1, 3), 纬线顶点 (纬线数, latitude_samples + 1, 3))
+    """
+    phi = np.linspace(0, 2 * PI, longitude_count, endpoint=False)[:, None]
+    t = np.linspace(0, PI, longitude_samples + 1)[None, :]
+    longitudes = np.stack(np.broadcast_arrays(
+        radius * np.sin(t) * np.cos(phi),
+        radius * np.sin(t) * np.sin(phi),
+        radius * np.cos(t) + radius,
+    ), axis=-1)
+
+    theta = np.linspace(0, PI, latitude_count, endpoint=True)[1:-1, None]
+    t = np.linspace(0, 2 * PI, latitude_samples + 1)[None, :]
+    latitudes = np.stack(np.broadcast_arrays(
+        radius * np.sin(theta) * np.cos(t),
+        radius * np.sin(theta) * np.sin(t),
+        radius * np.cos(theta) + radius,
+    ), axis=-1)
+    return longitudes, latitudes
+
+
+class SphereGraticule(VGroup):
+    """黎曼球面的经纬网格，可替代逐条创建的 ParametricFunction
+
+    参数:
+        radius: 球面半径，球心为 (0, 0, radius)
+        longitude_count, latitude_count: 经线数；纬线等分数（包括两个极点，极点不画）
+        longitude_samples, latitude_samples: 每条经线、纬线的折线段数，默认值与原来 ParametricFunction
+            按步长 0.01 采样的点数相同（经线 π/0.01 ≈ 314 段，纬线 2π/0.01 ≈ 628 段）
+        stroke_width, color, opacity: 统一的线宽、颜色和透明度
+        line_colors, line_opacities: 每条线的颜色和透明度（先经线后纬线），未指定时使用统一样式
+    """
+
+    def __init__(self, radius=1.0, longitude_count=120, latitude_count=60,
+                 longitude_samples=314, latitude_samples=628,
+                 stroke_width=1, color=BLUE_D, opacity=0.6,
+                 line_colors=None, line_opacities=None, **kwargs):
+        super().__init__(**kwargs)
+        longitudes, latitudes = sphere_graticule_lines(radius, longitude_count, latitude_count,
+                                                       longitude_samples, latitude_samples)
+        lines = list(longitudes) + list(latitudes)
+        self.longitude_count = len(longitudes)
+        self.latitude_count = len(latitudes)
+
+        colors = [ManimColor(c) for c in line_colors] if line_colors is not None else [ManimColor(color)] * len(lines)
+        opacities = list(line_opacities) if line_opacities is not None else [opacity] * len(lines)
+
+        # 样式相同的线合并为一个对象
+        buckets = {}
+        for line, c, o in zip(lines, colors, opacities):
+            buckets.setdefault((c.to_hex(), float(o)), []).append(line)
+        for (hex_color, o), bucket in buckets.items():
+            self.add(PolylineMesh(bucket, stroke_width=stroke_width, stroke_color=hex_color,
+                                  stroke_opacity=o, fill_opacity=0))
+
+
+def _line_interval_in_box(point, direction, x_extent, y_extent):
+    """直线 point + s·direction 位于矩形 |x| ≤ x_extent, |y| ≤ y_extent 内的参数区间"""
+    lo, hi = -np.inf, np.inf
+    for p, d, e in ((point.real, direction.real, x_extent), (point.imag, direction.imag, y_extent)):
+        if abs(d) < 1e-12:
+            continue
+        a, b = sorted(((-e - p) / d, (e - p) / d))
+        lo, hi = max(lo, a), min(hi, b)
+    return lo, hi
+
+
+def plane_line(point, angle, radius=1.0, samples=240, extent=(5, 5)):
+    """复平面上过 point、方向角为 angle 的直线的采样
+
+    参数 s = 2R·tan(πt/2)（t 在 [-1, 1] 上等分），对过原点的直线恰好在球面上等距分布；两端为无穷远点。
+
+    返回:
+        (复数采样点, 平面上显示的顶点)，平面顶点截取在 extent 给出的矩形范围内
+    """
+    point, direction = complex(point), np.exp(1j * angle)
+    t = np.linspace(-1, 1, samples + 1)
+    with np.errstate(over="ignore"):
+        s = 2 * radius * np.tan(PI / 2 * t)
+    w = point + direction * s
+    w[0] = w[-1] = np.inf
+
+    lo, hi = _line_interval_in_box(point, direction, *extent)
+    plane = point + direction * np.clip(s, lo, hi)
+    return w, np.stack([plane.real, plane.imag, np.zeros_like(plane.real)], axis=-1)
+
+
+def plane_circle(center, r, samples=180):
+    """复平面上圆心为 center、半径为 r 的圆的采样，返回 (复数采样点, 平面顶点)"""
+    w = complex(center) + r * np.exp(1j * np.linspace(0, 2 * PI, samples + 1))
+    return w, np.stack([w.real, w.imag, np.zeros_like(w.real)], axis=-1)
+
+
+class ProjectedCurves(PolylineMesh):
+    """复平面上的一族曲线，可以整体抬升到黎曼球面上
+
+    每条曲线的采样点只在创建时投影一次：平面上和球面上的贝塞尔点都预先算好，
+    抬升过程中的点是两者的线性插值，直接原地写入点数组。平面顶点就是采样点本身时，
+    插值的路径位于从北极点出发的投影射线上；被截取到显示范围边界上的采样点（包括直线两端的无穷远点）
+    则沿截取后的平面顶点到球面上投影点的直线移动，不在投影射线上。
+
+    参数:
+        curves: [(复数采样点, 平面顶点), ...]，可由 plane_line、plane_circle 生成
+        radius: 球面半径
+    """
+
+    def __init__(self, curves, radius=1.0, **kwargs):
+        from stereographic import stereographic_projection
+
+        kwargs.setdefault("fill_opacity", 0)
+        super().__init__([plane for _, plane in curves], **kwargs)
+        self.plane_bezier = self.points.copy()
+        self.sphere_bezier = polylines_to_bezier([stereographic_projection(w, radius) for w, _ in curves],
+                                                 self.n_points_per_curve)
+        self._buffer = np.empty_like(self.plane_bezier)
+        self.lift = 0.0
+
+    def set_lift(self, alpha):
+        """原地更新点坐标，alpha = 0 在复平面上，alpha = 1 在球面上"""
+        if self.points.shape != self.plane_bezier.shape:
+            self.points = np.empty_like(self.plane_bezier)
+        np.multiply(self.plane_bezier, 1 - alpha, out=self.points)
+        np.multiply(self.sphere_bezier, alpha, out=self._buffer)
+        self.points += self._buffer
+        self.lift = alpha
+        return self
+
+
+class LiftToSphere(Animation):
+    """把 ProjectedCurves 从当前位置抬升到球面（target=1）或放回复平面（target=0）"""
+
+    def __init__(self, curves, target=1.0, **kwargs):
+        self.start_lift = curves.lift
+        self.target_lift = target
+        super().__init__(curves, **kwargs)
+
+    def interpolate_mobject(self, alpha):
+        alpha = self.rate_func(alpha)
+        self.mobject.set_lift(self.start_lift + (self.target_lift - self.start_lift) * alpha)
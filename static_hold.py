@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""静止等待的快速路径
+
+视频的大部分时间来自 update_subtitle 中的 self.wait()，这期间画面没有任何变化。manim 虽然只绘制一次画面，
+但仍然把同一帧的原始像素逐帧写进 ffmpeg 管道，而且每次等待都单独生成一个部分电影文件。
+
+StaticHoldMixin 在场景中没有任何更新函数时接管 wait()：只绘制一帧，与上一次等待的画面相同则直接延长，
+不同或遇到下一个动画时再用 ffmpeg 从这一帧生成一段视频（编码参数与 manim 的部分电影文件相同，便于直接拼接）。
+生成的文件以画面内容和帧数命名，再次渲染时可以直接复用。
+"""
+
+import os
+import hashlib
+import subprocess
+import numpy as np
+from PIL import Image
+from manim import config, DEFAULT_WAIT_TIME
+from manim.constants import RendererType
+
+# 设置 MANIM_STATIC_HOLD=0 可以关闭快速路径，恢复 manim 原来的等待方式
+enabled = os.environ.get("MANIM_STATIC_HOLD", "1") != "0"
+
+
+class StaticHoldMixin:
+    """为场景的静止等待提供快速路径，需放在 Scene 之前继承"""
+
+    def wait(self, duration=DEFAULT_WAIT_TIME, stop_condition=None, frozen_frame=None):
+        if not self._is_static_hold(duration, stop_condition, frozen_frame):
+            return super().wait(duration, stop_condition=stop_condition, frozen_frame=frozen_frame)
+
+        renderer = self.renderer
+        renderer.skip_animations = renderer._original_skipping_status
+        renderer.update_skipping_status()
+        if renderer.skip_animations:
+            return super().wait(duration, stop_condition=stop_condition, frozen_frame=frozen_frame)
+
+        # 只绘制一帧，帧数的计算方式与 manim 的 freeze_current_frame 相同
+        renderer.static_image = None
+        renderer.update_frame(self)
+        frame = renderer.get_frame()
+        num_frames = int(duration * config.frame_rate)
+
+        pending = getattr(self, "_pending_hold", None)
+        if pending is not None and np.array_equal(pending[0], frame):
+            pending[1] += num_frames
+            self.hold_stats["coalesced"] += 1
+        else:
+            self.flush_static_hold()
+            self._pending_hold = [frame, num_frames]
+
+    def play(self, *args, **kwargs):
+        self.flush_static_hold()
+        return super().play(*args, **kwargs)
+
+    def tear_down(self):
+        self.flush_static_hold()
+        stats = self.hold_stats
+        if stats["holds"]:
+            print(f"静止等待：{stats['holds']} 段（合并 {stats['coalesced']} 次等待，共 {stats['frames']} 帧，"
+                  f"复用 {stats['reused']} 段）")
+        super().tear_down()
+
+    @property
+    def hold_stats(self):
+        if not hasattr(self, "_hold_stats"):
+            self._hold_stats = {"holds": 0, "coalesced": 0, "frames": 0, "reused": 0}
+        return self._hold_stats
+
+    def _is_static_hold(self, duration, stop_condition, frozen_frame):
+        """没有任何更新函数、也没有停止条件的等待才能走快速路径"""
+        if not enabled or config.renderer != RendererType.CAIRO or config.disable_caching:
+            return False
+        if not config.write_to_movie or config.transparent or config.movie_file_extension != ".mp4":
+            return False  # 只生成与 manim 默认编码相同的 mp4（不输出视频时部分电影文件列表不会增加）
+        if duration <= 0 or stop_condition is not None or frozen_frame is False:
+            return False
+        if frozen_frame:
+            return True
+        return not (self.always_update_mobjects or self.updaters
+                    or any(mob.get_updaters() for mob in self.get_mobject_family_members()))
+
+    def flush_static_hold(self):
+        """把累积的静止画面写成一个部分电影文件"""
+        pending = getattr(self, "_pending_hold", None)
+        if pending is None:
+            return
+        self._pending_hold = None
+        frame, num_frames = pending
+        if num_frames == 0:
+            return
+
+        renderer, file_writer = self.renderer, self.renderer.file_writer
+        hasher = hashlib.blake2b(digest_size=12)
+        hasher.update(np.ascontiguousarray(frame).data)
+        hasher.update(f"{frame.shape}|{num_frames}|{config.frame_rate}".encode("utf-8"))
+        hold_name = f"hold_{hasher.hexdigest()}"
+
+        file_writer.add_partial_movie_file(hold_name)
+        partial_file = file_writer.partial_movie_files[-1]
+        if partial_file is not None:
+            if os.path.exists(partial_file):
+                self.hold_stats["reused"] += 1
+            else:
+                self._encode_hold(frame, num_frames, partial_file)
+        renderer.animations_hashes.append(hold_name)
+        renderer.time += num_frames / config.frame_rate
+        renderer.num_plays += 1
+
+        self.hold_stats["holds"] += 1
+        self.hold_stats["frames"] += num_frames
+
+    def _encode_hold(self, frame, num_frames, partial_file):
+        """用一张图片生成指定帧数的视频，编码参数与 manim 的部分电影文件一致"""
+        image_file = partial_file + ".png"
+        Image.fromarray(frame, "RGBA").save(image_file)
+        fps = config.frame_rate
+        fps = int(fps) if fps == int(fps) else fps
+        cmd = [config.ffmpeg_executable, '-y', '-loop', '1', '-framerate', str(fps), '-i', image_file,
+               '-frames:v', str(num_frames), '-an', '-loglevel', 'error',
+               '-vcodec', 'libx264', '-pix_fmt', 'yuv420p', partial_file]
+        subprocess.run(cmd, check=True)
+        os.remove(image_file)
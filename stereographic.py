@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""黎曼球面的立体投影
+
+球面半径为 R，球心在 (0, 0, R)，与复平面相切于原点，北极点为 (0, 0, 2R)。
+复平面上的点 w 与北极点的连线交球面于
+
+    P = (t·Re w, t·Im w, 2R(1 - t)),  t = 4R² / (|w|² + 4R²)
+
+反过来，球面上的点 (x, y, z) 对应 w = 2R(x + iy) / (2R - z)，北极点对应无穷远点。
+
+输入可以是复数（标量或任意形状的数组），也可以是最后一维为坐标的实数数组（(N, 2) 或 manim 的 (N, 3) 点，
+第三个坐标被忽略），整条曲线或整张网格可以一次投影。无穷远点（np.inf）精确地投影到北极点。
+"""
+
+import numpy as np
+
+
+def to_complex(points):
+    """把复数或最后一维为坐标的实数数组转换为复数数组"""
+    points = np.asarray(points)
+    if np.iscomplexobj(points):
+        return points.astype(complex)
+    points = points.astype(float)
+    return points[..., 0] + 1j * points[..., 1]
+
+
+def stereographic_projection(points, radius=1.0):
+    """把复平面上的点投影到黎曼球面上
+
+    参数:
+        points: 复数数组，或最后一维为 (x, y) 或 (x, y, z) 的实数数组
+        radius: 球面半径
+
+    返回:
+        形状为 points 的复数形状加上最后一维 3 的数组，例如 (N, 3)
+    """
+    w = to_complex(points)
+    infinite = np.isinf(w)
+    w = np.where(infinite, 0, w)
+    four_r2 = 4 * radius * radius
+    # 先算 t，|w| 很大时 t 趋于 0，避免出现 inf/inf
+    with np.errstate(over="ignore"):
+        t = four_r2 / (w.real * w.real + w.imag * w.imag + four_r2)
+    t = np.where(infinite, 0.0, t)
+    return np.stack([t * w.real, t * w.imag, 2 * radius * (1 - t)], axis=-1)
+
+
+def inverse_stereographic_projection(points, radius=1.0, eps=1e-12):
+    """把黎曼球面上的点投影回复平面，北极点返回 np.inf
+
+    参数:
+        points: 最后一维为 (x, y, z) 的数组
+        radius: 球面半径
+        eps: 与北极点的高度差小于 eps·R 时视为北极点
+
+    返回:
+        复数数组，形状为 points 去掉最后一维
+    """
+    points = np.asarray(points, dtype=float)
+    x, y, z = points[..., 0], points[..., 1], points[..., 2]
+    denom = 2 * radius - z
+    at_pole = denom <= eps * radius
+    scale = 2 * radius / np.where(at_pole, 1.0, denom)
+    w = (x + 1j * y) * scale
+    return np.where(at_pole, complex(np.inf, 0), w)
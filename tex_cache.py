@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""跨项目共享的 TeX/SVG 缓存
+
+manim 默认把公式编译结果放在 media/Tex 中，每个仓库副本或 Docker 容器都要从头编译。
+这里在 manim 的 tex_to_svg_file 外面包一层共享缓存：
+- 缓存键为完整 tex 源码（包含导言区）、编译器和输出格式的哈希
+- 缓存目录总大小有上限，超出后按最近使用时间（LRU）淘汰
+- 写入采用临时文件加原子替换，淘汰时加文件锁，可供多个渲染进程同时使用
+- 每次渲染结束时打印命中、未命中和读写字节数
+
+各场景脚本在导入时调用 enable_shared_tex_cache()，相同的公式（包括导言区）在所有项目中只编译一次。
+"""
+
+import os
+import time
+import atexit
+import shutil
+import hashlib
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，退化为无锁模式
+    fcntl = None
+
+# 可以修改的默认配置，也可以通过环境变量覆盖
+shared_tex_dir  = os.environ.get("MANIM_TEX_CACHE_DIR",
+                                 os.path.join(os.path.expanduser("~"), ".cache", "manim_template", "tex"))
+max_cache_mb    = float(os.environ.get("MANIM_TEX_CACHE_MB", "512"))
+
+# 本次渲染的统计信息
+cache_stats = {"hits": 0, "misses": 0, "bytes_read": 0, "bytes_written": 0, "evicted": 0}
+
+_original_tex_to_svg_file = None
+
+
+def tex_cache_key(expression, environment=None, tex_template=None):
+    """计算缓存键：哈希中包含完整的 tex 源码（含导言区）以及编译器和输出格式"""
+    from manim import config
+
+    if tex_template is None:
+        tex_template = config["tex_template"]
+    if environment is not None:
+        tex_code = tex_template.get_texcode_for_expression_in_env(expression, environment)
+    else:
+        tex_code = tex_template.get_texcode_for_expression(expression)
+
+    hasher = hashlib.sha256()
+    for part in (tex_code, tex_template.tex_compiler, tex_template.output_format):
+        hasher.update(str(part).encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()[:32]
+
+
+class _CacheLock:
+    """缓存目录级别的互斥锁，保护淘汰过程不被并行渲染打断"""
+
+    def __init__(self, cache_dir):
+        self.lock_file = os.path.join(cache_dir, ".lock")
+        self.handle = None
+
+    def __enter__(self):
+        self.handle = open(self.lock_file, "a")
+        if fcntl is not None:
+            fcntl.flock(self.handle, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.handle, fcntl.LOCK_UN)
+        self.handle.close()
+
+
+def evict_lru(cache_dir=None, max_mb=None):
+    """按最近使用时间淘汰缓存，直到总大小不超过上限，返回淘汰的文件数"""
+    cache_dir = cache_dir or shared_tex_dir
+    max_bytes = (max_cache_mb if max_mb is None else max_mb) * 1024 * 1024
+
+    with _CacheLock(cache_dir):
+        entries = []
+        for name in os.listdir(cache_dir):
+            if not name.endswith(".svg"):
+                continue
+            path = os.path.join(cache_dir, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue  # 其他进程刚刚删除
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+    cache_stats["evicted"] += removed
+    return removed
+
+
+def _store(svg_file, cached_svg):
+    """把新编译的 svg 以原子方式写入共享目录"""
+    tmp_file = f"{cached_svg}.{os.getpid()}.tmp"
+    shutil.copyfile(svg_file, tmp_file)
+    os.replace(tmp_file, cached_svg)
+    cache_stats["bytes_written"] += os.path.getsize(cached_svg)
+
+
+def cached_tex_to_svg_file(expression, environment=None, tex_template=None):
+    """替代 manim 的 tex_to_svg_file，先查共享缓存，未命中时再编译"""
+    from pathlib import Path
+    from manim import config
+
+    key = tex_cache_key(expression, environment, tex_template)
+    cached_svg = os.path.join(shared_tex_dir, key + ".svg")
+
+    if os.path.exists(cached_svg):
+        # 命中：复制到本地 Tex 目录，并刷新访问时间用于 LRU
+        tex_dir = config.get_dir("tex_dir")
+        tex_dir.mkdir(parents=True, exist_ok=True)
+        local_svg = tex_dir / (key + ".svg")
+        try:
+            if not local_svg.exists():
+                shutil.copyfile(cached_svg, local_svg)
+            os.utime(cached_svg, (time.time(), time.time()))
+            cache_stats["hits"] += 1
+            cache_stats["bytes_read"] += os.path.getsize(cached_svg)
+            return local_svg
+        except FileNotFoundError:
+            pass  # 恰好被其他进程淘汰，按未命中处理
+
+    cache_stats["misses"] += 1
+    svg_file = _original_tex_to_svg_file(expression, environment, tex_template)
+    _store(svg_file, cached_svg)
+    evict_lru()
+    return Path(svg_file)
+
+
+def print_tex_cache_report():
+    """打印本次渲染的缓存统计"""
+    total = cache_stats["hits"] + cache_stats["misses"]
+    if total == 0:
+        return
+    print(f"TeX 共享缓存统计 ({shared_tex_dir}):")
+    print(f"  命中: {cache_stats['hits']}/{total} ({cache_stats['hits'] / total:.0%})")
+    print(f"  未命中: {cache_stats['misses']}")
+    print(f"  读取: {cache_stats['bytes_read'] / 1024:.1f} KB, 写入: {cache_stats['bytes_written'] / 1024:.1f} KB")
+    print(f"  淘汰: {cache_stats['evicted']} 个文件")
+
+
+def enable_shared_tex_cache(cache_dir=None, max_mb=None):
+    """启用共享缓存：替换 manim 中对 tex_to_svg_file 的引用，并在进程退出时打印统计"""
+    global shared_tex_dir, max_cache_mb, _original_tex_to_svg_file
+    import manim.utils.tex_file_writing as tex_file_writing
+    import manim.mobject.text.tex_mobject as tex_mobject
+
+    if cache_dir is not None:
+        shared_tex_dir = cache_dir
+    if max_mb is not None:
+        max_cache_mb = max_mb
+    os.makedirs(shared_tex_dir, exist_ok=True)
+
+    if _original_tex_to_svg_file is None:
+        _original_tex_to_svg_file = tex_file_writing.tex_to_svg_file
+        tex_file_writing.tex_to_svg_file = cached_tex_to_svg_file
+        tex_mobject.tex_to_svg_file = cached_tex_to_svg_file
+        atexit.register(print_tex_cache_report)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="管理共享 TeX 缓存")
+    parser.add_argument("--max-mb", type=float, default=None, help="缓存大小上限（MB）")
+    parser.add_argument("--clear", action="store_true", help="清空共享缓存")
+    args = parser.parse_args()
+
+    os.makedirs(shared_tex_dir, exist_ok=True)
+    if args.clear:
+        shutil.rmtree(shared_tex_dir, ignore_errors=True)
+        print(f"已清空共享缓存: {shared_tex_dir}")
+    else:
+        removed = evict_lru(max_mb=args.max_mb)
+        files = [f for f in os.listdir(shared_tex_dir) if f.endswith(".svg")]
+        size = sum(os.path.getsize(os.path.join(shared_tex_dir, f)) for f in files)
+        print(f"共享缓存: {shared_tex_dir}")
+        print(f"  文件数: {len(files)}, 总大小: {size / 1024 / 1024:.2f} MB, 本次淘汰: {removed}")